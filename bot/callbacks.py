@@ -0,0 +1,237 @@
+"""Compact binary callback data and O(1) dispatch of callback queries by action.
+
+Callback data is ``base64url(version, action, *args)`` without padding. Integer
+arguments are varints: catalogue buttons carry the ``tag`` of the
+:class:`~bot.services.catalog_ids.CatalogIds` numbering they were made with and
+a category, filter or option ID, 6–10 characters whatever the category is
+called. SKUs go in as
+length-prefixed UTF-8: a product button then works in any process and after
+any catalogue reload, and still stays far below Telegram's 64-byte limit.
+
+Handlers register per :class:`Action` on :data:`callback_router`, which decodes
+the data once and picks the handler from a dict instead of running a chain of
+``F.data.startswith`` filters. Data that does not decode (plain strings such as
+``consent_yes``) is left to the other routers.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any, Callable
+
+from aiogram import Router
+from aiogram.dispatcher.event.bases import UNHANDLED, SkipHandler
+from aiogram.dispatcher.event.handler import CallbackType, FilterObject, HandlerObject
+from aiogram.dispatcher.event.telegram import TelegramEventObserver
+from aiogram.types import CallbackQuery, TelegramObject
+
+CODEC_VERSION = 1
+MAX_CALLBACK_BYTES = 64
+
+
+class Action(IntEnum):
+    CATALOG_CATEGORY = 1
+    CATALOG_FILTER = 2
+    CATALOG_SKIP = 3
+    CATALOG_FILTERS_BACK = 4
+    CATALOG_BACK = 5
+    SELECTION_ADD = 16
+    SELECTION_SAMPLES = 17
+    SELECTION_PASSPORT = 18
+    SELECTION_QUOTE = 19
+    SELECTION_CLEAR = 20
+    SELECTION_EXPORT = 21
+    SELECTION_SEND = 22
+
+
+# Argument types each action carries: ``int`` as a varint, ``str`` length-prefixed.
+ARGS: dict[Action, tuple[type, ...]] = {
+    Action.CATALOG_CATEGORY: (int, int),
+    Action.CATALOG_FILTER: (int, int),
+    Action.CATALOG_SKIP: (int, int),
+    Action.CATALOG_FILTERS_BACK: (),
+    Action.CATALOG_BACK: (),
+    Action.SELECTION_ADD: (str,),
+    Action.SELECTION_SAMPLES: (str,),
+    Action.SELECTION_PASSPORT: (str,),
+    Action.SELECTION_QUOTE: (str,),
+    Action.SELECTION_CLEAR: (),
+    Action.SELECTION_EXPORT: (),
+    Action.SELECTION_SEND: (),
+}
+_ACTIONS = {int(action): action for action in Action}
+
+
+@dataclass(slots=True, frozen=True)
+class CallbackPayload:
+    action: Action
+    args: tuple[int | str, ...] = ()
+
+
+# Codec ----------------------------------------------------------------------------
+
+
+def encode_callback(action: Action, *args: int | str) -> str:
+    """Encode ``action`` and its arguments (non-negative ints, strings) as callback data."""
+
+    kinds = ARGS[action]
+    if len(args) != len(kinds):
+        raise ValueError(f"{action.name} takes {len(kinds)} arguments, got {len(args)}")
+    raw = bytearray((CODEC_VERSION, action))
+    for kind, value in zip(kinds, args):
+        if not isinstance(value, kind):
+            raise TypeError(f"{action.name} takes {kind.__name__} arguments, got {value!r}")
+        if isinstance(value, str):
+            encoded = value.encode("utf-8")
+            _append_varint(raw, len(encoded))
+            raw += encoded
+            continue
+        if value < 0:
+            raise ValueError(f"Callback arguments must be non-negative, got {value}")
+        _append_varint(raw, value)
+    data = base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+    if len(data) > MAX_CALLBACK_BYTES:
+        raise ValueError(
+            f"Callback data is {len(data)} bytes, Telegram allows {MAX_CALLBACK_BYTES}"
+        )
+    return data
+
+
+def decode_callback(data: str | None) -> CallbackPayload | None:
+    """Decode data made by :func:`encode_callback`; ``None`` for anything else."""
+
+    if not data or len(data) > MAX_CALLBACK_BYTES:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+    except (binascii.Error, ValueError):
+        return None
+    if len(raw) < 2 or raw[0] != CODEC_VERSION:
+        return None
+    action = _ACTIONS.get(raw[1])
+    if action is None:
+        return None
+
+    args: list[int | str] = []
+    position = 2
+    for kind in ARGS[action]:
+        read = _read_varint(raw, position)
+        if read is None:
+            return None
+        value, position = read
+        if kind is str:
+            end = position + value
+            if end > len(raw):
+                return None
+            try:
+                args.append(raw[position:end].decode("utf-8"))
+            except UnicodeDecodeError:
+                return None
+            position = end
+        else:
+            args.append(value)
+    if position != len(raw):
+        return None
+    return CallbackPayload(action, tuple(args))
+
+
+def _append_varint(raw: bytearray, value: int) -> None:
+    while value > 0x7F:
+        raw.append(value & 0x7F | 0x80)
+        value >>= 7
+    raw.append(value)
+
+
+def _read_varint(raw: bytes, position: int) -> tuple[int, int] | None:
+    """Varint at ``position`` and the position after it; ``None`` if truncated."""
+
+    value = shift = 0
+    for index in range(position, len(raw)):
+        byte = raw[index]
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, index + 1
+        shift += 7
+    return None
+
+
+# Dispatch -------------------------------------------------------------------------
+
+
+class ActionObserver(TelegramEventObserver):
+    """Callback-query observer that routes on the decoded :class:`Action`.
+
+    The matched handler still goes through its own filters (e.g. an FSM state)
+    and the usual inner middlewares, and receives the decoded data as
+    ``payload``.
+    """
+
+    def __init__(self, router: Router) -> None:
+        super().__init__(router=router, event_name="callback_query")
+        self.routes: dict[Action, HandlerObject] = {}
+
+    def action(self, action: Action, *filters: CallbackType) -> Callable[[Any], Any]:
+        def decorator(callback: Any) -> Any:
+            if action in self.routes:
+                raise ValueError(f"{action.name} already has a handler")
+            handler = HandlerObject(
+                callback=callback, filters=[FilterObject(item) for item in filters]
+            )
+            # Kept in ``handlers`` as well so aiogram sees callback_query as used.
+            self.routes[action] = handler
+            self.handlers.append(handler)
+            return callback
+
+        return decorator
+
+    async def trigger(self, event: TelegramObject, **kwargs: Any) -> Any:
+        payload = decode_callback(event.data) if isinstance(event, CallbackQuery) else None
+        handler = self.routes.get(payload.action) if payload is not None else None
+        if handler is None:
+            return UNHANDLED
+        kwargs["handler"] = handler
+        kwargs["payload"] = payload
+        matched, data = await handler.check(event, **kwargs)
+        if not matched:
+            return UNHANDLED
+        kwargs.update(data)
+        try:
+            wrapped_inner = self.outer_middleware.wrap_middlewares(
+                self._resolve_middlewares(), handler.call
+            )
+            return await wrapped_inner(event, kwargs)
+        except SkipHandler:
+            return UNHANDLED
+
+
+class CallbackRouter(Router):
+    """Router whose callback queries are dispatched by :class:`ActionObserver`."""
+
+    def __init__(self, *, name: str | None = None) -> None:
+        super().__init__(name=name)
+        self.callback_query = self.observers["callback_query"] = ActionObserver(self)
+
+    def action(self, action: Action, *filters: CallbackType) -> Callable[[Any], Any]:
+        """Register the decorated function as the handler of ``action``."""
+
+        return self.callback_query.action(action, *filters)
+
+
+callback_router = CallbackRouter(name="callbacks")
+
+
+__all__ = [
+    "ARGS",
+    "Action",
+    "ActionObserver",
+    "CODEC_VERSION",
+    "CallbackPayload",
+    "CallbackRouter",
+    "MAX_CALLBACK_BYTES",
+    "callback_router",
+    "decode_callback",
+    "encode_callback",
+]
@@ -5,10 +5,10 @@ from __future__ import annotations
 import os
 from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
 from dotenv import load_dotenv
-from pydantic import BaseModel, Field, SecretStr
+from pydantic import BaseModel, Field, SecretStr, field_validator
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -18,20 +18,54 @@ class Settings(BaseModel):
 
     bot_token: SecretStr = Field(alias="BOT_TOKEN")
     manager_chat_id: int = Field(alias="MANAGER_CHAT_ID")
+    admin_ids: list[int] = Field(default_factory=list, alias="ADMIN_IDS")
     webhook_url: str | None = Field(default=None, alias="WEBHOOK_URL")
     webapp_host: str | None = Field(default=None, alias="WEBAPP_HOST")
     webapp_port: int | None = Field(default=None, alias="WEBAPP_PORT")
     use_webhook: bool = Field(default=False, alias="USE_WEBHOOK")
+    webhook_secret: str | None = Field(default=None, alias="WEBHOOK_SECRET")
+    webhook_workers: int = Field(default=1, alias="WEBHOOK_WORKERS")
+    webhook_inline_wait_ms: int = Field(default=50, alias="WEBHOOK_INLINE_WAIT_MS")
+    ingest_queue_size: int = Field(default=1000, alias="INGEST_QUEUE_SIZE")
+    ingest_concurrency: int = Field(default=32, alias="INGEST_CONCURRENCY")
+    ingest_max_per_user: int = Field(default=20, alias="INGEST_MAX_PER_USER")
+    ingest_overflow: Literal["retry", "drop"] = Field(default="retry", alias="INGEST_OVERFLOW")
+    update_concurrency: int = Field(default=64, alias="UPDATE_CONCURRENCY")
+    bot_api_url: str | None = Field(default=None, alias="BOT_API_URL")
+    bot_api_pool_size: int = Field(default=100, alias="BOT_API_POOL_SIZE")
+    bot_api_keepalive_s: float = Field(default=30.0, alias="BOT_API_KEEPALIVE_S")
+    bot_api_dns_ttl_s: int = Field(default=300, alias="BOT_API_DNS_TTL_S")
+    bot_api_timeout_s: float = Field(default=60.0, alias="BOT_API_TIMEOUT_S")
+    bot_api_connect_timeout_s: float | None = Field(default=5.0, alias="BOT_API_CONNECT_TIMEOUT_S")
+    bot_api_read_timeout_s: float | None = Field(default=None, alias="BOT_API_READ_TIMEOUT_S")
+    bot_api_proxies: list[str] = Field(default_factory=list, alias="BOT_API_PROXIES")
     data_dir: Path = Field(default=BASE_DIR / "data")
     tmp_dir: Path = Field(default=BASE_DIR / "tmp")
     locale: str = Field(default="ru")
     autosave_selection: bool = Field(default=True, alias="AUTOSAVE_SELECTION")
+    texts_watch_interval_s: float = Field(default=5.0, alias="TEXTS_WATCH_INTERVAL_S")
+    metrics_enabled: bool = Field(default=False, alias="METRICS_ENABLED")
+    metrics_host: str = Field(default="127.0.0.1", alias="METRICS_HOST")
+    metrics_port: int = Field(default=9101, alias="METRICS_PORT")
+    trace_sample_rate: float = Field(default=0.0, alias="TRACE_SAMPLE_RATE")
+    trace_slow_ms: float = Field(default=500.0, alias="TRACE_SLOW_MS")
+    trace_path: Path | None = Field(default=None, alias="TRACE_PATH")
+    record_updates: bool = Field(default=False, alias="RECORD_UPDATES")
+    record_path: Path | None = Field(default=None, alias="RECORD_PATH")
+    record_salt: str | None = Field(default=None, alias="RECORD_SALT")
 
     model_config = {
         "populate_by_name": True,
         "extra": "ignore",
     }
 
+    @field_validator("admin_ids", "bot_api_proxies", mode="before")
+    @classmethod
+    def _split_list(cls, value: Any) -> Any:
+        if isinstance(value, str):
+            return [item.strip() for item in value.replace(";", ",").split(",") if item.strip()]
+        return value
+
     def as_dict(self) -> dict[str, Any]:
         """Return a JSON-serializable dictionary of settings."""
         data = self.model_dump()
@@ -3,11 +3,16 @@
 from __future__ import annotations
 
 from contextvars import ContextVar
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from .config import Settings
+from .keyboards.cache import KeyboardCache
 from .services.inventory_port import InventoryPort
+from .services.message_edits import EditTracker
 from .services.pricing_port import PricingPort
+from .services.quotes import QuoteEngine
+from .services.responses import ResponseCache
+from .services.recommender import Recommender
 from .services.selection_store import SelectionStore
 from .services.text_templates import TextLibrary
 
@@ -21,6 +26,25 @@ class AppContext:
     pricing: PricingPort
     selection_store: SelectionStore
     settings: Settings
+    recommender: Recommender
+    quotes: QuoteEngine
+    keyboard_cache: KeyboardCache = field(default_factory=KeyboardCache)
+    edit_tracker: EditTracker = field(default_factory=EditTracker)
+    response_cache: ResponseCache = field(default_factory=ResponseCache)
+
+    @property
+    def keyboards(self) -> KeyboardCache:
+        """Keyboard cache, emptied first if the catalogue changed."""
+
+        self.keyboard_cache.sync(self.inventory.version)
+        return self.keyboard_cache
+
+    @property
+    def responses(self) -> ResponseCache:
+        """Pre-rendered section texts, emptied first if the text library changed."""
+
+        self.response_cache.sync(self.text_library.version)
+        return self.response_cache
 
 
 _context_var: ContextVar[AppContext] = ContextVar("app_context")
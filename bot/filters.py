@@ -13,15 +13,23 @@ def menu_choice(key: str) -> Callable[[Message], bool]:
     """Return a filter that matches message text against menu label."""
 
     async def _predicate(message: Message) -> bool:
-        ctx = get_app_context()
-        labels = ctx.text_library.menu_labels()
-        expected = labels.get(key)
-        if not expected:
-            return False
-        return (message.text or "").strip().lower() == expected.strip().lower()
+        return get_app_context().text_library.menu_route(message.text) == key
 
     return _predicate
 
 
-__all__ = ["menu_choice"]
+def is_admin() -> Callable[[Message], bool]:
+    """Return a filter that passes for ADMIN_IDS users and the manager chat."""
+
+    async def _predicate(message: Message) -> bool:
+        settings = get_app_context().settings
+        if message.chat.id == settings.manager_chat_id:
+            return True
+        user = message.from_user
+        return user is not None and user.id in settings.admin_ids
+
+    return _predicate
+
+
+__all__ = ["menu_choice", "is_admin"]
 
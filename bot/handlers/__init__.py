@@ -1,6 +1,7 @@
 """Aggregate all routers for import convenience."""
 
 from . import (
+    admin,
     cart_like_selection,
     catalog_browse,
     delivery_payment,
@@ -11,6 +12,7 @@ from . import (
 )
 
 __all__ = [
+    "admin",
     "start",
     "wizard_picker",
     "catalog_browse",
@@ -0,0 +1,106 @@
+"""Admin-only diagnostics commands."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime
+
+from aiogram import Bot, Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import BufferedInputFile, Message
+
+from ..context import get_app_context
+from ..filters import is_admin
+from ..services.profiling import MAX_DURATION_S, ProfilerBusyError, is_running, run_profile
+from ..services.text_reload import reload_texts
+
+logger = logging.getLogger(__name__)
+
+router = Router(name="admin")
+router.message.filter(is_admin())
+
+PROFILE_USAGE = (
+    "Использование: /profile [cpu|mem|all] [секунды]\n"
+    f"cpu — сэмплирующий профилировщик, mem — tracemalloc; до {MAX_DURATION_S:.0f} с."
+)
+PROFILE_MODES = {"cpu": (True, False), "mem": (False, True), "all": (True, True)}
+
+# Keeps references to running profile tasks so they are not garbage-collected.
+_background: set[asyncio.Task[None]] = set()
+
+
+@router.message(Command("profile"))
+async def profile_command(message: Message, command: CommandObject, bot: Bot) -> None:
+    args = (command.args or "").split()
+    mode = "cpu"
+    seconds = 10.0
+    try:
+        for arg in args:
+            if arg.lower() in PROFILE_MODES:
+                mode = arg.lower()
+            else:
+                seconds = float(arg.replace(",", "."))
+    except ValueError:
+        await message.answer(PROFILE_USAGE)
+        return
+    if is_running():
+        await message.answer("Профилирование уже запущено, дождитесь результата.")
+        return
+
+    seconds = min(max(seconds, 1.0), MAX_DURATION_S)
+    await message.answer(f"Профилирование ({mode}) на {seconds:g} с запущено.")
+    # The session runs in the background so the command does not hold the update.
+    task = asyncio.create_task(_send_profile(bot, message.chat.id, mode, seconds))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+async def _send_profile(bot: Bot, chat_id: int, mode: str, seconds: float) -> None:
+    cpu, memory = PROFILE_MODES[mode]
+    try:
+        report = await run_profile(seconds, cpu=cpu, memory=memory)
+    except ProfilerBusyError:
+        await bot.send_message(chat_id, "Профилирование уже запущено, дождитесь результата.")
+        return
+    except Exception:  # pragma: no cover - defensive
+        logger.exception("Profiling session failed")
+        await bot.send_message(chat_id, "Не удалось выполнить профилирование, см. логи.")
+        return
+
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    if cpu:
+        await bot.send_document(
+            chat_id,
+            BufferedInputFile(report.collapsed.encode("utf-8"), filename=f"cpu-{stamp}.folded"),
+            caption=(
+                f"CPU: {report.samples} сэмплов за {report.duration_s:g} с. "
+                "Формат collapsed stacks (flamegraph.pl, speedscope)."
+            ),
+        )
+    if memory:
+        text = report.allocations_text()
+        await bot.send_document(
+            chat_id,
+            BufferedInputFile(text.encode("utf-8"), filename=f"alloc-{stamp}.txt"),
+            caption="Топ аллокаций (tracemalloc).",
+        )
+
+
+@router.message(Command("reload"))
+async def reload_command(message: Message) -> None:
+    ctx = get_app_context()
+    try:
+        changed = await reload_texts(ctx)
+    except Exception:
+        logger.exception("Text library reload failed")
+        await message.answer("Не удалось перечитать тексты, см. логи. Работает прежняя версия.")
+        return
+    version = ctx.text_library.version
+    if changed:
+        await message.answer(f"Тексты обновлены, версия {version}.")
+    else:
+        await message.answer(f"Тексты не изменились, версия {version}.")
+
+
+__all__ = ["router"]
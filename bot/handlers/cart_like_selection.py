@@ -2,26 +2,33 @@
 
 from __future__ import annotations
 
+from html import escape
 from typing import Any
 
-from aiogram import F, Router
+from aiogram import Router
 from aiogram.fsm.context import FSMContext
 from aiogram.types import BufferedInputFile, CallbackQuery, InlineKeyboardMarkup, Message
 
+from ..callbacks import Action, CallbackPayload, callback_router
 from ..context import get_app_context
 from ..keyboards.catalog import selection_manage_keyboard
+from ..services.estimates import estimate_order, parse_order_input
+from ..services.layout import MAX_ROOM_RECTS, RoomPlanTooLargeError
+from ..services.quotes import format_money
 from ..services.selection_store import SelectionEntry
 from ..services.wizard_memory import wizard_memory
 from ..states import SelectionMetrics
-from ..utils.formatting import calc_required, mention_html
+from ..utils.formatting import mention_html
 
 router = Router(name="selection")
 
 
-@router.callback_query(F.data.startswith("selection:add:"))
-async def add_to_selection(callback: CallbackQuery, state: FSMContext) -> None:
+@callback_router.action(Action.SELECTION_ADD)
+async def add_to_selection(
+    callback: CallbackQuery, state: FSMContext, payload: CallbackPayload
+) -> None:
     ctx = get_app_context()
-    sku = callback.data.split(":")[2]
+    sku = str(payload.args[0])
     user_id = callback.from_user.id if callback.from_user else 0
     if not user_id:
         await callback.answer("Не удаётся определить пользователя.")
@@ -43,6 +50,7 @@ async def add_to_selection(callback: CallbackQuery, state: FSMContext) -> None:
             waste_pct=int(memory.get("waste_pct", 0)),
             total_m2=float(memory.get("total_m2", 0)),
             pack_step=memory.get("pack_step"),
+            notes=memory.get("notes"),
         )
         ctx.selection_store.add(user_id, entry)
         await callback.answer("Добавлено в подборку.")
@@ -54,7 +62,8 @@ async def add_to_selection(callback: CallbackQuery, state: FSMContext) -> None:
     await state.set_state(SelectionMetrics.sku)
     await state.update_data(pending_sku=sku)
     await callback.message.answer(
-        "Введите площадь и запас в формате «площадь запас», например: 120 7"
+        "Введите площадь и запас в формате «площадь запас», например: 120 7.\n"
+        "Несколько помещений — через «+»: 40+25 7, размеры комнаты — 5x8 или 5x8+3x4"
     )
 
 
@@ -68,16 +77,19 @@ async def collect_selection_metrics(message: Message, state: FSMContext) -> None
         await state.clear()
         return
 
-    parts = (message.text or "").replace(",", ".").split()
-    if not parts:
+    if not (message.text or "").strip():
         await message.answer("Пример: 96 5")
         return
 
     try:
-        area = float(parts[0])
-        waste = int(parts[1]) if len(parts) > 1 else 5
+        areas, waste, rects = parse_order_input(message.text or "")
+    except RoomPlanTooLargeError:
+        await message.answer(
+            f"Слишком сложный план: не больше {MAX_ROOM_RECTS} прямоугольников через «+»."
+        )
+        return
     except ValueError:
-        await message.answer("Не удалось распознать числа. Пример: 140 8")
+        await message.answer("Не удалось распознать числа. Пример: 140 8, 40+25 7 или 5x8 7")
         return
 
     product = ctx.inventory.get(sku)
@@ -86,16 +98,17 @@ async def collect_selection_metrics(message: Message, state: FSMContext) -> None
         await state.clear()
         return
 
-    total = calc_required(area, waste, product.pack_step_m2)
+    estimate = estimate_order(product, areas, waste, rects, ctx.pricing.price(sku))
     entry = SelectionEntry(
         sku=sku,
         name=product.name,
         category=product.category,
         brand=product.brand,
-        area_m2=area,
-        waste_pct=waste,
-        total_m2=total,
-        pack_step=product.pack_step_m2,
+        area_m2=estimate.area_m2,
+        waste_pct=estimate.waste_pct,
+        total_m2=estimate.total_m2,
+        pack_step=estimate.pack_step,
+        notes=estimate.notes,
     )
 
     user_id = message.from_user.id if message.from_user else 0
@@ -112,7 +125,7 @@ async def collect_selection_metrics(message: Message, state: FSMContext) -> None
     await state.clear()
 
 
-@router.callback_query(F.data == "selection:clear")
+@callback_router.action(Action.SELECTION_CLEAR)
 async def clear_selection(callback: CallbackQuery) -> None:
     ctx = get_app_context()
     user_id = callback.from_user.id if callback.from_user else 0
@@ -125,7 +138,7 @@ async def clear_selection(callback: CallbackQuery) -> None:
     await callback.message.answer("Подборка очищена.")
 
 
-@router.callback_query(F.data == "selection:export")
+@callback_router.action(Action.SELECTION_EXPORT)
 async def export_selection(callback: CallbackQuery) -> None:
     ctx = get_app_context()
     user_id = callback.from_user.id if callback.from_user else 0
@@ -145,13 +158,18 @@ async def export_selection(callback: CallbackQuery) -> None:
 
     from ..services.export import selection_to_workbook
 
-    payload = selection_to_workbook(items, customer=customer, company=ctx.text_library.company)
+    payload = selection_to_workbook(
+        items,
+        customer=customer,
+        company=ctx.text_library.company,
+        quote=ctx.quotes.quote(user_id),
+    )
     document = BufferedInputFile(payload.getvalue(), filename="lgpol_podbor.xlsx")
     await callback.message.answer_document(document, caption="Экспорт подборки готов.")
     await callback.answer("Файл сформирован.")
 
 
-@router.callback_query(F.data == "selection:send")
+@callback_router.action(Action.SELECTION_SEND)
 async def send_selection_to_manager(callback: CallbackQuery) -> None:
     ctx = get_app_context()
     user = callback.from_user
@@ -175,23 +193,26 @@ async def send_selection_to_manager(callback: CallbackQuery) -> None:
 
     from ..services.export import selection_to_workbook
 
-    payload = selection_to_workbook(items, customer=customer, company=ctx.text_library.company)
+    quote = ctx.quotes.quote(user_id)
+    payload = selection_to_workbook(
+        items, customer=customer, company=ctx.text_library.company, quote=quote
+    )
     document = BufferedInputFile(payload.getvalue(), filename=f"lgpol_request_{user_id}.xlsx")
     manager_chat = ctx.settings.manager_chat_id
     mention = mention_html(user)
     await callback.bot.send_message(
         manager_chat,
-        f"Новая заявка из подборки от {mention}.",
+        f"Новая заявка из подборки от {mention}.\n\n{escape(quote.as_text())}",
     )
     await callback.bot.send_document(manager_chat, document)
     await callback.answer("Отправили заявку менеджеру.")
     await callback.message.answer("Заявка передана менеджеру. Мы свяжемся с вами отдельно.")
 
 
-@router.callback_query(F.data.startswith("selection:samples:"))
-async def request_samples_from_card(callback: CallbackQuery) -> None:
+@callback_router.action(Action.SELECTION_SAMPLES)
+async def request_samples_from_card(callback: CallbackQuery, payload: CallbackPayload) -> None:
     ctx = get_app_context()
-    sku = callback.data.split(":")[2]
+    sku = str(payload.args[0])
     product = ctx.inventory.get(sku)
     mention = mention_html(callback.from_user)
     title = product.name if product else sku
@@ -205,10 +226,10 @@ async def request_samples_from_card(callback: CallbackQuery) -> None:
     )
 
 
-@router.callback_query(F.data.startswith("selection:passport:"))
-async def request_passport_from_card(callback: CallbackQuery) -> None:
+@callback_router.action(Action.SELECTION_PASSPORT)
+async def request_passport_from_card(callback: CallbackQuery, payload: CallbackPayload) -> None:
     ctx = get_app_context()
-    sku = callback.data.split(":")[2]
+    sku = str(payload.args[0])
     product = ctx.inventory.get(sku)
     mention = mention_html(callback.from_user)
     title = product.name if product else sku
@@ -222,18 +243,26 @@ async def request_passport_from_card(callback: CallbackQuery) -> None:
     )
 
 
-@router.callback_query(F.data.startswith("selection:quote:"))
-async def request_quote_from_card(callback: CallbackQuery) -> None:
+@callback_router.action(Action.SELECTION_QUOTE)
+async def request_quote_from_card(callback: CallbackQuery, payload: CallbackPayload) -> None:
     ctx = get_app_context()
-    sku = callback.data.split(":")[2]
+    sku = str(payload.args[0])
     product = ctx.inventory.get(sku)
     mention = mention_html(callback.from_user)
     title = product.name if product else sku
+    user_id = callback.from_user.id if callback.from_user else 0
     await callback.answer("Запрос отправлен")
-    await callback.bot.send_message(
-        ctx.settings.manager_chat_id,
-        f"Запрос расчёта по {title} (SKU {sku}) от {mention}.",
-    )
+
+    text = f"Запрос расчёта по {title} (SKU {sku}) от {mention}."
+    # Only this SKU's line: the rest of the selection is unrelated to the request.
+    quote = ctx.quotes.quote_sku(user_id, sku) if user_id else None
+    if quote is not None:
+        text += f"\n\n{escape(quote.as_text())}"
+    else:
+        price = ctx.pricing.price(sku)
+        if price is not None:
+            text += f"\nЦена: {format_money(price)}/м², в подборке клиента этой позиции нет."
+    await callback.bot.send_message(ctx.settings.manager_chat_id, text)
     await callback.message.answer(
         "Передал запрос на расчёт. Как только подготовим предложение, менеджер свяжется с вами."
     )
@@ -248,13 +277,18 @@ def _selection_summary(user_id: int) -> tuple[str, InlineKeyboardMarkup | None]:
     lines = [
         "Текущая подборка:",
     ]
+    promos = ctx.pricing.promos_for(entry.sku for entry in items)
     total = 0.0
     for entry in items:
         lines.append(
             f"- {entry.name} ({entry.sku}) — {entry.total_m2:.2f} м² с запасом {entry.waste_pct}%"
         )
+        if entry.notes:
+            lines.append(f"  📦 {entry.notes}")
+        for promo in promos.get(entry.sku, []):
+            lines.append(f"  🎯 {promo.title}")
         total += entry.total_m2
 
     lines.append(f"Итого: {total:.2f} м²")
     lines.append("Можно экспортировать в Excel или отправить менеджеру.")
-    return "\n".join(lines), selection_manage_keyboard()
+    return "\n".join(lines), ctx.keyboards.static(selection_manage_keyboard)
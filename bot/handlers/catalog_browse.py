@@ -3,55 +3,52 @@
 from __future__ import annotations
 
 from typing import Any
-import hashlib
 
 from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
+from aiogram.methods import SendMessage
 from aiogram.types import CallbackQuery, Message, InlineKeyboardMarkup
-from aiogram.exceptions import TelegramBadRequest
 
+from ..callbacks import Action, CallbackPayload, callback_router
 from ..context import get_app_context
 from ..filters import menu_choice
-from ..keyboards.catalog import (
-    categories_keyboard,
-    filter_keyboard,
-    product_actions_keyboard,
-)
 
 router = Router(name="catalog")
 
 SESSION_KEY = "catalog_flow"
-
-def _encode_option_key(filter_name: str, option: str) -> str:
-    raw = f"{filter_name}:{option}".encode("utf-8")
-    return hashlib.sha1(raw).hexdigest()[:10]
+# Callback data of buttons sent before callbacks were encoded, e.g. ``catalog:category:<name>``.
+LEGACY_PREFIXES = ("catalog:", "selection:")
 
 
 @router.message(menu_choice("catalog"))
-async def show_catalog_menu(message: Message, state: FSMContext) -> None:
+async def show_catalog_menu(message: Message, state: FSMContext) -> SendMessage:
     ctx = get_app_context()
-    categories = [descriptor.name for descriptor in ctx.inventory.categories()]
-    await state.update_data(
-        {SESSION_KEY: {"filters": {}, "category": None, "step": 0}, "catalog_options": {}}
-    )
+    await state.update_data({SESSION_KEY: {"filters": {}, "category": None, "step": 0}})
     intro = ctx.text_library.styles.get(
         "catalog_intro", "Выберите категорию напольного покрытия:"
     )
-    await message.answer(intro, reply_markup=categories_keyboard(categories))
+    return message.answer(intro, reply_markup=_categories_keyboard())
 
 
-@router.callback_query(F.data.startswith("catalog:category:"))
-async def pick_category(callback: CallbackQuery, state: FSMContext) -> None:
+@callback_router.action(Action.CATALOG_CATEGORY)
+async def pick_category(
+    callback: CallbackQuery, state: FSMContext, payload: CallbackPayload
+) -> None:
+    if await _reject_stale(callback, state, payload):
+        return
     ctx = get_app_context()
-    _, _, category = callback.data.partition("catalog:category:")
+    category = ctx.inventory.ids.categories.get(payload.args[1]) or ""
     await callback.answer()
-    catalog_data = {SESSION_KEY: {"filters": {}, "category": category, "step": 0}}
-    await state.update_data({**catalog_data, "catalog_options": {}})
+    await state.update_data({SESSION_KEY: {"filters": {}, "category": category, "step": 0}})
     await _ask_next_filter(callback.message, state, category, 0, {})
 
 
-@router.callback_query(F.data.startswith("catalog:filter:"))
-async def apply_filter(callback: CallbackQuery, state: FSMContext) -> None:
+@callback_router.action(Action.CATALOG_FILTER)
+async def apply_filter(
+    callback: CallbackQuery, state: FSMContext, payload: CallbackPayload
+) -> None:
+    if await _reject_stale(callback, state, payload):
+        return
     await callback.answer()
     ctx = get_app_context()
     data = await state.get_data()
@@ -61,14 +58,15 @@ async def apply_filter(callback: CallbackQuery, state: FSMContext) -> None:
         await callback.message.answer("Сначала выберите категорию.")
         return
 
-    _, _, payload = callback.data.partition("catalog:filter:")
-    filter_name, _, option_key = payload.partition(":")
-    options_map: dict[str, str] = data.get("catalog_options", {}).get(filter_name, {})
-    option = options_map.get(option_key)
-    if not option:
+    # None when the option left the catalogue since the button was sent.
+    key = ctx.inventory.ids.options.get(payload.args[1])
+    if key is None or key[0] != category:
         await callback.message.answer("Не удалось обработать выбор. Попробуйте ещё раз.")
-        await _ask_next_filter(callback.message, state, category, flow.get("step", 0), flow.get("filters", {}))
+        await _ask_next_filter(
+            callback.message, state, category, flow.get("step", 0), flow.get("filters", {})
+        )
         return
+    _, filter_name, option = key
     filters: dict[str, str] = dict(flow.get("filters", {}))
     filters[filter_name] = option
     step = flow.get("step", 0) + 1
@@ -82,8 +80,12 @@ async def apply_filter(callback: CallbackQuery, state: FSMContext) -> None:
     await _ask_next_filter(callback.message, state, category, step, filters)
 
 
-@router.callback_query(F.data.startswith("catalog:skip:"))
-async def skip_filter(callback: CallbackQuery, state: FSMContext) -> None:
+@callback_router.action(Action.CATALOG_SKIP)
+async def skip_filter(
+    callback: CallbackQuery, state: FSMContext, payload: CallbackPayload
+) -> None:
+    if await _reject_stale(callback, state, payload):
+        return
     await callback.answer()
     data = await state.get_data()
     flow: dict[str, Any] = data.get(SESSION_KEY, {})
@@ -98,7 +100,7 @@ async def skip_filter(callback: CallbackQuery, state: FSMContext) -> None:
     await _ask_next_filter(callback.message, state, category, step, filters)
 
 
-@router.callback_query(F.data == "catalog:filters:back")
+@callback_router.action(Action.CATALOG_FILTERS_BACK)
 async def back_in_filters(callback: CallbackQuery, state: FSMContext) -> None:
     await callback.answer()
     data = await state.get_data()
@@ -110,7 +112,7 @@ async def back_in_filters(callback: CallbackQuery, state: FSMContext) -> None:
     await _ask_next_filter(callback.message, state, category, step, filters)
 
 
-@router.callback_query(F.data == "catalog:back")
+@callback_router.action(Action.CATALOG_BACK)
 async def exit_catalog(callback: CallbackQuery, state: FSMContext) -> None:
     await callback.answer()
     await state.update_data({SESSION_KEY: {"filters": {}, "category": None, "step": 0}})
@@ -121,6 +123,43 @@ async def exit_catalog(callback: CallbackQuery, state: FSMContext) -> None:
     await callback.message.answer(text)
 
 
+@router.callback_query(F.data.startswith(LEGACY_PREFIXES))
+async def outdated_button(callback: CallbackQuery, state: FSMContext) -> None:
+    """Answer a button from an old message instead of leaving it spinning."""
+
+    await _restart_browsing(callback, state)
+
+
+def _categories_keyboard() -> InlineKeyboardMarkup:
+    ctx = get_app_context()
+    return ctx.keyboards.categories(ctx.inventory.ids.categories, ctx.inventory.ids.tag)
+
+
+async def _reject_stale(
+    callback: CallbackQuery, state: FSMContext, payload: CallbackPayload
+) -> bool:
+    """Restart browsing if the button's IDs come from another catalogue numbering.
+
+    That is a button sent before a restart or by a process that loaded another
+    catalogue; its IDs could name different items here.
+    """
+
+    if payload.args[0] in get_app_context().inventory.ids.tags:
+        return False
+    await _restart_browsing(callback, state)
+    return True
+
+
+async def _restart_browsing(callback: CallbackQuery, state: FSMContext) -> None:
+    ctx = get_app_context()
+    await callback.answer("Каталог обновился")
+    await state.update_data({SESSION_KEY: {"filters": {}, "category": None, "step": 0}})
+    text = ctx.text_library.styles.get(
+        "catalog_outdated", "Каталог обновился. Выберите категорию заново:"
+    )
+    await callback.message.answer(text, reply_markup=_categories_keyboard())
+
+
 async def _ask_next_filter(
     message: Message | None,
     state: FSMContext,
@@ -141,23 +180,16 @@ async def _ask_next_filter(
         return
 
     if step >= len(descriptor.filters):
-        await state.update_data({"catalog_options": {}})
         await _show_results(message, state, category, filters)
         return
 
     filter_name = descriptor.filters[step]
-    options = ctx.inventory.filter_options(category, filter_name)
+    options = ctx.inventory.ids.facets.get((category, filter_name))
 
     if not options:
         await _ask_next_filter(message, state, category, step + 1, filters)
         return
 
-    option_map = {_encode_option_key(filter_name, option): option for option in options}
-    data = await state.get_data()
-    catalog_options = dict(data.get("catalog_options", {}))
-    catalog_options[filter_name] = option_map
-    await state.update_data({"catalog_options": catalog_options})
-
     question_template = ctx.text_library.styles.get(
         "catalog_filter_question",
         "Выберите значение для фильтра «{filter}»:",
@@ -167,7 +199,9 @@ async def _ask_next_filter(
     await _render_prompt(
         message,
         prompt_text,
-        filter_keyboard(filter_name, option_map),
+        ctx.keyboards.filter(
+            ctx.inventory.ids.filters.id(filter_name), options, ctx.inventory.ids.tag
+        ),
     )
 
 
@@ -180,15 +214,12 @@ async def _show_results(
     ctx = get_app_context()
     products = ctx.inventory.search(category, filters)
     if not products:
-        categories = [descriptor.name for descriptor in ctx.inventory.categories()]
-        await state.update_data(
-            {SESSION_KEY: {"filters": {}, "category": None, "step": 0}, "catalog_options": {}}
-        )
+        await state.update_data({SESSION_KEY: {"filters": {}, "category": None, "step": 0}})
         prompt = ctx.text_library.styles.get(
             "catalog_no_results",
             "Не нашёл подходящих позиций. Попробуем ослабить фильтры или выбрать другую категорию?",
         )
-        await _render_prompt(message, prompt, categories_keyboard(categories))
+        await _render_prompt(message, prompt, _categories_keyboard())
         return
 
     intro_template = ctx.text_library.styles.get(
@@ -201,10 +232,16 @@ async def _show_results(
         None,
     )
 
-    for product in products[:6]:
-        price = ctx.pricing.price(product.sku)
-        text = ctx.text_library.render_product_card(product, price=price)
-        await message.answer(text, reply_markup=product_actions_keyboard(product))
+    shown = products[:6]
+    skus = [product.sku for product in shown]
+    prices = ctx.pricing.price_many(skus)
+    promos = ctx.pricing.promos_for(skus)
+    for product in shown:
+        text = ctx.text_library.render_product_card(
+            product, price=prices.get(product.sku), promos=promos.get(product.sku)
+        )
+        keyboard = ctx.keyboards.product_actions(product.sku)
+        await message.answer(text, reply_markup=keyboard)
 
 
 def _build_filter_prompt(
@@ -226,12 +263,4 @@ async def _render_prompt(
     text: str,
     keyboard: InlineKeyboardMarkup | None,
 ) -> None:
-    try:
-        await message.edit_text(text, reply_markup=keyboard)
-    except TelegramBadRequest:
-        if message.chat and message.message_id:
-            try:
-                await message.delete()
-            except TelegramBadRequest:
-                pass
-        await message.answer(text, reply_markup=keyboard)
+    await get_app_context().edit_tracker.render(message, text, keyboard)
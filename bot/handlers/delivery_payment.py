@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from aiogram import Router
+from aiogram.methods import SendMessage
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup, Message
 
 from ..context import get_app_context
@@ -11,7 +12,7 @@ from ..filters import menu_choice
 router = Router(name="delivery_payment")
 
 
-def _logistics_keyboard() -> InlineKeyboardMarkup:
+def logistics_keyboard() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[
             [InlineKeyboardButton(text="Задать вопрос", callback_data="manager:question")],
@@ -26,16 +27,18 @@ def _logistics_keyboard() -> InlineKeyboardMarkup:
 
 
 @router.message(menu_choice("delivery"))
-async def delivery_block(message: Message) -> None:
+async def delivery_block(message: Message) -> SendMessage:
     ctx = get_app_context()
-    await message.answer(ctx.text_library.delivery, reply_markup=_logistics_keyboard())
+    return message.answer(
+        ctx.text_library.delivery, reply_markup=ctx.keyboards.static(logistics_keyboard)
+    )
 
 
 @router.message(menu_choice("payment"))
-async def payment_block(message: Message) -> None:
+async def payment_block(message: Message) -> SendMessage:
     ctx = get_app_context()
     excerpt = ctx.text_library.styles.get(
         "payment_intro",
         "Принимаем оплату наличными, по безналичному расчёту и банковскими картами.",
     )
-    await message.answer(excerpt, reply_markup=_logistics_keyboard())
+    return message.answer(excerpt, reply_markup=ctx.keyboards.static(logistics_keyboard))
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from aiogram import F, Router
+from aiogram.methods import SendMessage
 from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message
 
 from ..context import get_app_context
@@ -11,7 +12,7 @@ from ..filters import menu_choice
 router = Router(name="partners")
 
 
-def _promo_keyboard() -> InlineKeyboardMarkup:
+def promo_keyboard() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[
             [
@@ -24,17 +25,12 @@ def _promo_keyboard() -> InlineKeyboardMarkup:
 
 
 @router.message(menu_choice("promos"))
-async def show_promos(message: Message) -> None:
+async def show_promos(message: Message) -> SendMessage:
     ctx = get_app_context()
-    promos = ctx.pricing.promos()
-    if promos:
-        lines = ["🎯 Актуальные акции:"]
-        for promo in promos:
-            until = f"до {promo.valid_until.strftime('%d.%m.%Y')}" if promo.valid_until else "без срока"
-            lines.append(f"• {promo.title} ({until})\n  {promo.description}")
-    else:
-        lines = ["Пока нет активных акций. Мы сообщим, когда появятся новинки."]
-    await message.answer("\n".join(lines), reply_markup=_promo_keyboard())
+    return message.answer(
+        ctx.responses.promos(ctx.pricing.promos()),
+        reply_markup=ctx.keyboards.static(promo_keyboard),
+    )
 
 
 @router.callback_query(F.data == "partners:info")
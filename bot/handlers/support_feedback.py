@@ -6,6 +6,7 @@ from typing import Any
 
 from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
+from aiogram.methods import SendMessage
 from aiogram.types import (
     BufferedInputFile,
     CallbackQuery,
@@ -60,7 +61,7 @@ def manager_menu_keyboard() -> InlineKeyboardMarkup:
 
 
 @router.message(menu_choice("samples"))
-async def samples_start(message: Message, state: FSMContext) -> None:
+async def samples_start(message: Message, state: FSMContext) -> SendMessage:
     ctx = get_app_context()
     prompts = ctx.text_library.styles.get(
         "samples_prompts",
@@ -71,61 +72,64 @@ async def samples_start(message: Message, state: FSMContext) -> None:
     )
     await state.set_state(SamplesForm.full_name)
     await state.update_data(samples_prompts=prompts)
-    await message.answer(prompt_text(prompts, "full_name"))
+    return message.answer(prompt_text(prompts, "full_name"))
 
 
 @router.message(SamplesForm.full_name)
-async def samples_full_name(message: Message, state: FSMContext) -> None:
+async def samples_full_name(message: Message, state: FSMContext) -> SendMessage:
     await state.update_data(full_name=message.text.strip())
     data = await state.get_data()
     await state.set_state(SamplesForm.company)
-    await message.answer(prompt_text(data["samples_prompts"], "company"))
+    return message.answer(prompt_text(data["samples_prompts"], "company"))
 
 
 @router.message(SamplesForm.company)
-async def samples_company(message: Message, state: FSMContext) -> None:
+async def samples_company(message: Message, state: FSMContext) -> SendMessage:
     await state.update_data(company=message.text.strip())
     await state.set_state(SamplesForm.phone)
-    await message.answer("Телефон для связи:")
+    return message.answer("Телефон для связи:")
 
 
 @router.message(SamplesForm.phone)
-async def samples_phone(message: Message, state: FSMContext) -> None:
+async def samples_phone(message: Message, state: FSMContext) -> SendMessage:
     await state.update_data(phone=message.text.strip())
     await state.set_state(SamplesForm.email)
-    await message.answer("Email:")
+    return message.answer("Email:")
 
 
 @router.message(SamplesForm.email)
-async def samples_email(message: Message, state: FSMContext) -> None:
+async def samples_email(message: Message, state: FSMContext) -> SendMessage:
     await state.update_data(email=message.text.strip())
     await state.set_state(SamplesForm.address)
-    await message.answer("Куда отправить образцы (адрес):")
+    return message.answer("Куда отправить образцы (адрес):")
 
 
 @router.message(SamplesForm.address)
-async def samples_address(message: Message, state: FSMContext) -> None:
+async def samples_address(message: Message, state: FSMContext) -> SendMessage:
     await state.update_data(address=message.text.strip())
     await state.set_state(SamplesForm.comment)
-    await message.answer("Комментарий или требуемые позиции (можно оставить пустым):")
+    return message.answer("Комментарий или требуемые позиции (можно оставить пустым):")
 
 
 @router.message(SamplesForm.comment)
-async def samples_comment(message: Message, state: FSMContext) -> None:
+async def samples_comment(message: Message, state: FSMContext) -> SendMessage:
     await state.update_data(comment=message.text.strip())
     await state.set_state(SamplesForm.consent)
     ctx = get_app_context()
-    await message.answer(ctx.text_library.consent_text(), reply_markup=consent_keyboard())
+    return message.answer(
+        ctx.text_library.consent_text(), reply_markup=ctx.keyboards.static(consent_keyboard)
+    )
 
 
 @router.callback_query(SamplesForm.consent, F.data == "consent_yes")
 async def samples_consent_yes(callback: CallbackQuery, state: FSMContext) -> None:
+    ctx = get_app_context()
     await callback.answer()
     await state.set_state(SamplesForm.confirmation)
     data = await state.get_data()
     await callback.message.answer(
         build_samples_summary(callback.message.from_user.id if callback.message else 0, data),
-        reply_markup=samples_confirm_keyboard(),
+        reply_markup=ctx.keyboards.static(samples_confirm_keyboard),
     )
 
 
@@ -156,7 +160,12 @@ async def samples_confirm_yes(callback: CallbackQuery, state: FSMContext) -> Non
 
     from ..services.export import selection_to_workbook
 
-    payload = selection_to_workbook(selection_items, customer=customer, company=ctx.text_library.company)
+    payload = selection_to_workbook(
+        selection_items,
+        customer=customer,
+        company=ctx.text_library.company,
+        quote=ctx.quotes.quote(user_id) if user_id else None,
+    )
     document = BufferedInputFile(payload.getvalue(), filename="lgpol_samples.xlsx")
 
     manager_chat = ctx.settings.manager_chat_id
@@ -177,44 +186,26 @@ async def samples_confirm_no(callback: CallbackQuery, state: FSMContext) -> None
 
 
 @router.message(menu_choice("manager"))
-async def manager_menu(message: Message) -> None:
+async def manager_menu(message: Message) -> SendMessage:
     ctx = get_app_context()
     prompt = ctx.text_library.styles.get(
         "manager_intro",
         "Выберите вариант связи с менеджером:",
     )
-    await message.answer(prompt, reply_markup=manager_menu_keyboard())
+    return message.answer(prompt, reply_markup=ctx.keyboards.static(manager_menu_keyboard))
 
 
 @router.message(menu_choice("contacts"))
-async def contacts(message: Message) -> None:
+async def contacts(message: Message) -> SendMessage:
     ctx = get_app_context()
-    company = ctx.text_library.company
-    text = "\n".join(
-        [
-            f"{company.get('brand', 'Lgpol / В.В.К.')}",
-            f"Телефон: {company.get('phone', '')}",
-            f"Email: {company.get('email', '')}",
-            f"Адрес: {company.get('address', '')}",
-            f"График: {company.get('hours', '')}",
-            f"Сайт: {company.get('site', '')}",
-        ]
-    )
     maps_url = ctx.text_library.styles.get(
         "maps_url",
         "https://yandex.ru/maps/",
     )
-    keyboard = InlineKeyboardMarkup(
-        inline_keyboard=[
-            [
-                InlineKeyboardButton(
-                    text="Построить маршрут",
-                    url=maps_url,
-                )
-            ]
-        ]
+    return message.answer(
+        ctx.responses.contacts(ctx.text_library.company),
+        reply_markup=ctx.keyboards.contacts(maps_url),
     )
-    await message.answer(text, reply_markup=keyboard)
 
 
 @router.callback_query(F.data == "manager:callback")
@@ -225,18 +216,20 @@ async def manager_callback_start(callback: CallbackQuery, state: FSMContext) ->
 
 
 @router.message(ManagerCallForm.phone)
-async def manager_callback_phone(message: Message, state: FSMContext) -> None:
+async def manager_callback_phone(message: Message, state: FSMContext) -> SendMessage:
     await state.update_data(phone=message.text.strip())
     await state.set_state(ManagerCallForm.preferred_time)
-    await message.answer("Когда удобно позвонить?")
+    return message.answer("Когда удобно позвонить?")
 
 
 @router.message(ManagerCallForm.preferred_time)
-async def manager_callback_time(message: Message, state: FSMContext) -> None:
+async def manager_callback_time(message: Message, state: FSMContext) -> SendMessage:
     await state.update_data(preferred_time=message.text.strip())
     await state.set_state(ManagerCallForm.consent)
     ctx = get_app_context()
-    await message.answer(ctx.text_library.consent_text(), reply_markup=consent_keyboard())
+    return message.answer(
+        ctx.text_library.consent_text(), reply_markup=ctx.keyboards.static(consent_keyboard)
+    )
 
 
 @router.callback_query(ManagerCallForm.consent, F.data == "consent_yes")
@@ -306,18 +299,20 @@ async def manager_question_start(callback: CallbackQuery, state: FSMContext) ->
 
 
 @router.message(ManagerQuestionForm.question)
-async def manager_question_collect_question(message: Message, state: FSMContext) -> None:
+async def manager_question_collect_question(message: Message, state: FSMContext) -> SendMessage:
     await state.update_data(question=message.text.strip())
     await state.set_state(ManagerQuestionForm.contact)
-    await message.answer("Как с вами связаться? (телефон/email)")
+    return message.answer("Как с вами связаться? (телефон/email)")
 
 
 @router.message(ManagerQuestionForm.contact)
-async def manager_question_collect_contact(message: Message, state: FSMContext) -> None:
+async def manager_question_collect_contact(message: Message, state: FSMContext) -> SendMessage:
     await state.update_data(contact=message.text.strip())
     await state.set_state(ManagerQuestionForm.consent)
     ctx = get_app_context()
-    await message.answer(ctx.text_library.consent_text(), reply_markup=consent_keyboard())
+    return message.answer(
+        ctx.text_library.consent_text(), reply_markup=ctx.keyboards.static(consent_keyboard)
+    )
 
 
 @router.callback_query(ManagerQuestionForm.consent, F.data == "consent_yes")
@@ -6,14 +6,16 @@ from typing import Any
 
 from aiogram import Router
 from aiogram.fsm.context import FSMContext
+from aiogram.methods import TelegramMethod
 from aiogram.types import Message
 
 from ..context import get_app_context
 from ..filters import menu_choice
 from ..states import PickerWizard
-from ..keyboards.catalog import product_actions_keyboard
+from ..services.estimates import estimate_order, parse_order_input
+from ..services.layout import MAX_ROOM_RECTS, Rect, RoomPlanTooLargeError
+from ..services.recommender import RELAX_LABELS
 from ..services.wizard_memory import wizard_memory
-from ..utils.formatting import calc_required
 
 router = Router(name="wizard")
 
@@ -23,61 +25,52 @@ async def _maybe_redirect_menu(message: Message, state: FSMContext) -> bool:
 
     Returns True if handled.
     """
-    text = (message.text or "").strip()
-    if not text:
-        return False
-
-    ctx = get_app_context()
-    labels = ctx.text_library.menu_labels()
-    # Build reverse map label->key
-    rev = {v: k for k, v in labels.items() if v}
-    key = rev.get(text)
+    key = get_app_context().text_library.menu_route(message.text)
     if not key:
         return False
 
     await state.clear()
 
+    reply = None
     # Lazy imports to avoid circulars
     if key == "pick":
         await start_picker(message, state)
-        return True
     elif key == "catalog":
         from .catalog_browse import show_catalog_menu
 
-        await show_catalog_menu(message, state)
-        return True
+        reply = await show_catalog_menu(message, state)
     elif key == "delivery":
         from .delivery_payment import delivery_block
 
-        await delivery_block(message)
-        return True
+        reply = await delivery_block(message)
     elif key == "payment":
         from .delivery_payment import payment_block
 
-        await payment_block(message)
-        return True
+        reply = await payment_block(message)
     elif key == "promos":
         from .partners import show_promos
 
-        await show_promos(message)
-        return True
+        reply = await show_promos(message)
     elif key == "samples":
         from .support_feedback import samples_start
 
-        await samples_start(message, state)
-        return True
+        reply = await samples_start(message, state)
     elif key == "manager":
         from .support_feedback import manager_menu
 
-        await manager_menu(message)
-        return True
+        reply = await manager_menu(message)
     elif key == "contacts":
         from .support_feedback import contacts
 
-        await contacts(message)
-        return True
+        reply = await contacts(message)
+    else:
+        return False
+
+    # Menu handlers return their single reply instead of sending it.
+    if isinstance(reply, TelegramMethod):
+        await reply
+    return True
 
-    return False
 
 @router.message(menu_choice("pick"))
 async def start_picker(message: Message, state: FSMContext) -> None:
@@ -155,19 +148,27 @@ async def handle_design_preferences(message: Message, state: FSMContext) -> None
 async def handle_metrics(message: Message, state: FSMContext) -> None:
     if await _maybe_redirect_menu(message, state):
         return
-    raw = (message.text or "").replace(",", ".").split()
-    if not raw:
+    if not (message.text or "").strip():
         await message.answer("Укажите площадь в квадратных метрах и запас, например: 120 8")
         return
 
     try:
-        area = float(raw[0])
-        waste = int(raw[1]) if len(raw) > 1 else 5
+        rooms, waste, rects = parse_order_input(message.text or "")
+    except RoomPlanTooLargeError:
+        await message.answer(
+            f"Слишком сложный план: не больше {MAX_ROOM_RECTS} прямоугольников через «+»."
+        )
+        return
     except ValueError:
-        await message.answer("Не удалось распознать числа. Пример: 150 7")
+        await message.answer("Не удалось распознать числа. Пример: 150 7, 40+25 7 или 5x8 7")
         return
 
-    await state.update_data(area_m2=area, waste_pct=waste)
+    await state.update_data(
+        area_m2=sum(rooms),
+        rooms=rooms,
+        waste_pct=waste,
+        room_plan=[[rect.width_m, rect.length_m] for rect in rects] if rects else None,
+    )
     ctx = get_app_context()
     questions = ctx.text_library.picker_questions()
     await state.set_state(PickerWizard.budget)
@@ -197,33 +198,14 @@ async def handle_budget(message: Message, state: FSMContext) -> None:
 
 async def _provide_recommendations(message: Message, answers: dict[str, Any]) -> None:
     ctx = get_app_context()
-    category = answers.get("material_type") or "Ковровая плитка"
-    filters: dict[str, Any] = {}
     area = float(answers.get("area_m2", 0) or 0)
     waste = int(answers.get("waste_pct", 0) or 0)
-    budget = answers.get("budget")
-
-    application_area = answers.get("application_area")
-    if application_area:
-        filters["Область применения"] = application_area
-
-    usage_class = answers.get("usage_class")
-    if usage_class:
-        filters["Класс"] = usage_class
-
-    design_pref = answers.get("design_preferences")
-    if design_pref:
-        filters["Цвет"] = design_pref
-
-    products = ctx.inventory.search(category, filters)
-    if budget:
-        products = [
-            product
-            for product in products
-            if ctx.pricing.price(product.sku) is None or ctx.pricing.price(product.sku) <= budget
-        ]
+    rooms = [float(value) for value in answers.get("rooms") or [area]]
+    room_plan = answers.get("room_plan")
+    rects = tuple(Rect(width, length) for width, length in room_plan) if room_plan else None
 
-    if not products:
+    result = ctx.recommender.recommend(answers, limit=6)
+    if not result.items:
         await message.answer(
             "Не нашёл подходящих позиций. Попробуем ослабить ограничения или посмотреть каталог?"
         )
@@ -236,22 +218,42 @@ async def _provide_recommendations(message: Message, answers: dict[str, Any]) ->
         )
     )
 
+    if result.relaxed:
+        relaxed = ", ".join(RELAX_LABELS[name] for name in result.relaxed)
+        note = f"Точных совпадений мало — ослабил условия: {relaxed}."
+        budget = answers.get("budget")
+        if "budget" in result.relaxed and budget:
+            index = ctx.recommender.price_index(result.category)
+            cheapest = index.cheapest()
+            if cheapest is not None:
+                note += (
+                    f"\nВ бюджет до {budget:.0f} ₽/м² укладывается позиций: "
+                    f"{index.count_under(budget)}; самые доступные — от {cheapest:.0f} ₽/м²."
+                )
+        await message.answer(note)
+
+    promos = ctx.pricing.promos_for(item.product.sku for item in result.items)
     recommendations: dict[str, Any] = {}
-    for product in products[:6]:
-        total_required = calc_required(area, waste, product.pack_step_m2)
-        price = ctx.pricing.price(product.sku)
+    for item in result.items:
+        product = item.product
+        estimate = estimate_order(product, rooms, waste, rects, item.price)
         text = ctx.text_library.render_product_card(
-            product, price=price, required_m2=total_required
+            product,
+            price=item.price,
+            required_m2=estimate.total_m2,
+            promos=promos.get(product.sku),
         )
-        await message.answer(text, reply_markup=product_actions_keyboard(product))
+        keyboard = ctx.keyboards.product_actions(product.sku)
+        await message.answer(text, reply_markup=keyboard)
         recommendations[product.sku] = {
-            "area_m2": area,
-            "waste_pct": waste,
-            "total_m2": total_required,
+            "area_m2": estimate.area_m2,
+            "waste_pct": estimate.waste_pct,
+            "total_m2": estimate.total_m2,
             "category": product.category,
             "name": product.name,
             "brand": product.brand,
-            "pack_step": product.pack_step_m2,
+            "pack_step": estimate.pack_step,
+            "notes": estimate.notes,
         }
 
     user_id = message.from_user.id if message.from_user else 0
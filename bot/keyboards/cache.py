@@ -0,0 +1,93 @@
+"""Shared keyboard instances, rebuilt only when their inputs change."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from aiogram.types import InlineKeyboardMarkup, ReplyKeyboardMarkup
+
+from ..services.catalog_ids import IdTable
+from .catalog import categories_keyboard, filter_keyboard, product_actions_keyboard
+from .common import build_main_menu, contacts_keyboard
+
+KeyboardMarkup = InlineKeyboardMarkup | ReplyKeyboardMarkup
+
+
+class KeyboardCache:
+    """Build each keyboard once and hand out the same (frozen) markup afterwards.
+
+    Keys are the keyboard's inputs, so a stale entry can never be served for
+    different labels or options, and reloaded texts need no invalidation.
+    Catalogue IDs only hold within one catalogue version, so :meth:`sync`
+    drops everything when the catalogue version changes, which also keeps
+    old entries from piling up. Per-SKU and per-filter keyboards are kept in
+    an LRU of ``max_entries``.
+    """
+
+    def __init__(self, max_entries: int = 4096) -> None:
+        self.max_entries = max_entries
+        self.version: Hashable = None
+        self.hits = 0
+        self.misses = 0
+        self._static: dict[Hashable, KeyboardMarkup] = {}
+        self._lru: OrderedDict[Hashable, KeyboardMarkup] = OrderedDict()
+
+    def sync(self, version: Hashable) -> None:
+        if version != self.version:
+            self.clear()
+            self.version = version
+
+    def clear(self) -> None:
+        self._static.clear()
+        self._lru.clear()
+
+    # Keyboards --------------------------------------------------------------------
+
+    def main_menu(self, labels: dict[str, str]) -> ReplyKeyboardMarkup:
+        key = ("main_menu", *labels.items())
+        return self._get(self._static, key, lambda: build_main_menu(labels))
+
+    def categories(self, categories: IdTable[str], tag: int) -> InlineKeyboardMarkup:
+        key = ("categories", tag, *categories)
+        return self._get(self._static, key, lambda: categories_keyboard(categories, tag))
+
+    def filter(self, filter_id: int, options: dict[int, str], tag: int) -> InlineKeyboardMarkup:
+        key = ("filter", tag, filter_id, *options.items())
+        return self._get(self._lru, key, lambda: filter_keyboard(filter_id, options, tag))
+
+    def product_actions(self, sku: str) -> InlineKeyboardMarkup:
+        key = ("product", sku)
+        return self._get(self._lru, key, lambda: product_actions_keyboard(sku))
+
+    def contacts(self, maps_url: str) -> InlineKeyboardMarkup:
+        key = ("contacts", maps_url)
+        return self._get(self._static, key, lambda: contacts_keyboard(maps_url))
+
+    def static(self, factory: Callable[[], Any]) -> Any:
+        """Keyboard that depends on nothing but code, e.g. ``static(consent_keyboard)``."""
+
+        return self._get(self._static, factory, factory)
+
+    # Internal helpers -------------------------------------------------------------
+
+    def _get(
+        self,
+        store: dict[Hashable, KeyboardMarkup],
+        key: Hashable,
+        build: Callable[[], Any],
+    ) -> Any:
+        markup = store.get(key)
+        if markup is not None:
+            self.hits += 1
+            if store is self._lru:
+                self._lru.move_to_end(key)
+            return markup
+        self.misses += 1
+        markup = store[key] = build()
+        if store is self._lru and len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+        return markup
+
+
+__all__ = ["KeyboardCache"]
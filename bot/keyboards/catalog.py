@@ -2,65 +2,86 @@
 
 from __future__ import annotations
 
-from typing import Iterable
-
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
-from ..services.inventory_port import Product
+from ..callbacks import Action, encode_callback
+from ..services.catalog_ids import IdTable
+
 
+def categories_keyboard(categories: IdTable[str], tag: int) -> InlineKeyboardMarkup:
+    """``tag`` is the ``CatalogIds.tag`` the category IDs belong to."""
 
-def categories_keyboard(categories: Iterable[str]) -> InlineKeyboardMarkup:
     buttons = [
-        [InlineKeyboardButton(text=name, callback_data=f"catalog:category:{name}")]
-        for name in categories
+        [
+            InlineKeyboardButton(
+                text=name,
+                callback_data=encode_callback(Action.CATALOG_CATEGORY, tag, category_id),
+            )
+        ]
+        for category_id, name in categories.items()
     ]
-    buttons.append([InlineKeyboardButton(text="⬅️ В меню", callback_data="catalog:back")])
+    buttons.append(
+        [InlineKeyboardButton(text="⬅️ В меню", callback_data=encode_callback(Action.CATALOG_BACK))]
+    )
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
-def filter_keyboard(filter_name: str, options: dict[str, str]) -> InlineKeyboardMarkup:
+def filter_keyboard(filter_id: int, options: dict[int, str], tag: int) -> InlineKeyboardMarkup:
+    """``options`` maps option IDs to labels, as in ``CatalogIds.facets`` of ``tag``."""
+
     keyboard: list[list[InlineKeyboardButton]] = []
-    for key, option in options.items():
+    for option_id, option in options.items():
         keyboard.append(
             [
                 InlineKeyboardButton(
                     text=option,
-                    callback_data=f"catalog:filter:{filter_name}:{key}",
+                    callback_data=encode_callback(Action.CATALOG_FILTER, tag, option_id),
                 )
             ]
         )
     keyboard.append(
-        [InlineKeyboardButton(text="Пропустить", callback_data=f"catalog:skip:{filter_name}")]
+        [
+            InlineKeyboardButton(
+                text="Пропустить",
+                callback_data=encode_callback(Action.CATALOG_SKIP, tag, filter_id),
+            )
+        ]
+    )
+    keyboard.append(
+        [
+            InlineKeyboardButton(
+                text="⬅️ Назад", callback_data=encode_callback(Action.CATALOG_FILTERS_BACK)
+            )
+        ]
     )
-    keyboard.append([InlineKeyboardButton(text="⬅️ Назад", callback_data="catalog:filters:back")])
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
-def product_actions_keyboard(product: Product) -> InlineKeyboardMarkup:
+def product_actions_keyboard(sku: str) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[
             [
                 InlineKeyboardButton(
                     text="➕ В подборку",
-                    callback_data=f"selection:add:{product.sku}",
+                    callback_data=encode_callback(Action.SELECTION_ADD, sku),
                 )
             ],
             [
                 InlineKeyboardButton(
                     text="📦 Образцы",
-                    callback_data=f"selection:samples:{product.sku}",
+                    callback_data=encode_callback(Action.SELECTION_SAMPLES, sku),
                 )
             ],
             [
                 InlineKeyboardButton(
                     text="📄 Паспорт",
-                    callback_data=f"selection:passport:{product.sku}",
+                    callback_data=encode_callback(Action.SELECTION_PASSPORT, sku),
                 )
             ],
             [
                 InlineKeyboardButton(
                     text="✉️ Запрос счёта",
-                    callback_data=f"selection:quote:{product.sku}",
+                    callback_data=encode_callback(Action.SELECTION_QUOTE, sku),
                 )
             ],
         ]
@@ -71,11 +92,17 @@ def selection_manage_keyboard() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[
             [
-                InlineKeyboardButton(text="🗑 Очистить", callback_data="selection:clear"),
-                InlineKeyboardButton(text="📊 Экспорт XLSX", callback_data="selection:export"),
+                InlineKeyboardButton(
+                    text="🗑 Очистить", callback_data=encode_callback(Action.SELECTION_CLEAR)
+                ),
+                InlineKeyboardButton(
+                    text="📊 Экспорт XLSX", callback_data=encode_callback(Action.SELECTION_EXPORT)
+                ),
             ],
             [
-                InlineKeyboardButton(text="✉️ Менеджеру", callback_data="selection:send"),
+                InlineKeyboardButton(
+                    text="✉️ Менеджеру", callback_data=encode_callback(Action.SELECTION_SEND)
+                ),
             ],
         ]
     )
@@ -74,6 +74,12 @@ def consent_keyboard() -> InlineKeyboardMarkup:
     )
 
 
+def contacts_keyboard(maps_url: str) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(
+        inline_keyboard=[[InlineKeyboardButton(text="Построить маршрут", url=maps_url)]]
+    )
+
+
 def back_to_menu_button(text: str = "⬅️ В меню") -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[[InlineKeyboardButton(text=text, callback_data="back_to_menu")]]
@@ -84,5 +90,6 @@ __all__ = [
     "build_main_menu",
     "yes_no_keyboard",
     "consent_keyboard",
+    "contacts_keyboard",
     "back_to_menu_button",
 ]
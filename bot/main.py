@@ -3,17 +3,24 @@
 from __future__ import annotations
 
 import asyncio
+import gc
 import logging
+import time
 from contextlib import suppress
 
 from aiogram import Bot, Dispatcher
 from aiogram.enums import ParseMode
 from aiogram.client.default import DefaultBotProperties
+from aiogram.fsm.storage.base import BaseStorage
 from aiogram.fsm.storage.memory import MemoryStorage
 
+from .callbacks import callback_router
 from .config import Settings, get_settings
 from .context import AppContext, set_app_context
+from .keyboards.catalog import selection_manage_keyboard
+from .keyboards.common import consent_keyboard
 from .handlers import (
+    admin,
     cart_like_selection,
     catalog_browse,
     delivery_payment,
@@ -22,61 +29,249 @@ from .handlers import (
     support_feedback,
     wizard_picker,
 )
+from .middlewares.metrics import HandlerLabelMiddleware, MetricsMiddleware
+from .middlewares.ordering import OrderingMiddleware
 from .middlewares.rate_limit import RateLimitMiddleware
+from .middlewares.recording import RecordingMiddleware
+from .middlewares.replies import ReplyMiddleware
+from .middlewares.tracing import (
+    HandlerSpanMiddleware,
+    TracedStorage,
+    TracingMiddleware,
+    TracingRequestMiddleware,
+)
+from .services.http_session import build_session
 from .services.inventory_stub import InventoryStub
+from .services.metrics import TimedProxy, registry, start_metrics_server
 from .services.pricing_stub import PricingStub
+from .services.quotes import QuoteEngine
+from .services.recommender import Recommender
+from .services.recording import recorder
 from .services.selection_store import SelectionStore
+from .services.text_reload import watch_texts
 from .services.text_templates import get_text_library
+from .services.tracing import TracedProxy, tracer
+from .webhook import run_master, serve_webhook
 
 logger = logging.getLogger(__name__)
 
 
+ROUTERS = (
+    callback_router,
+    admin.router,
+    start.router,
+    wizard_picker.router,
+    catalog_browse.router,
+    cart_like_selection.router,
+    delivery_payment.router,
+    partners.router,
+    support_feedback.router,
+)
+
+
+def configure_instrumentation(settings: Settings) -> None:
+    """Switch metrics, tracing and update recording on according to settings."""
+
+    registry.enable(settings.metrics_enabled)
+    tracer.configure(
+        sample_rate=settings.trace_sample_rate,
+        slow_ms=settings.trace_slow_ms,
+        path=settings.trace_path or settings.tmp_dir / "traces.jsonl",
+    )
+    record_path = None
+    if settings.record_updates:
+        record_path = settings.record_path or settings.tmp_dir / "updates.jsonl.gz"
+    recorder.configure(record_path, salt=settings.record_salt)
+
+
+def build_app_context(
+    settings: Settings,
+    partition: tuple[int, int] | None = None,
+) -> AppContext:
+    """Create long-lived services, wrapped for metrics/tracing when enabled.
+
+    ``partition`` is ``(worker index, worker count)`` in multi-process webhook mode.
+    """
+
+    text_library = get_text_library(settings.data_dir)
+    if recorder.enabled:
+        recorder.add_known_texts(text_library.reply_button_texts())
+    inventory = InventoryStub(settings.data_dir / "catalog.json")
+    pricing = PricingStub(settings.data_dir / "pricing.json")
+    if registry.enabled:
+        inventory = TimedProxy(inventory, "inventory")
+        pricing = TimedProxy(pricing, "pricing")
+    if tracer.enabled:
+        inventory = TracedProxy(inventory, "inventory")
+        pricing = TracedProxy(pricing, "pricing")
+    selection_store = SelectionStore(
+        settings.tmp_dir,
+        autosave=settings.autosave_selection,
+        partition=partition,
+    )
+    recommender = Recommender(inventory, pricing)
+    quotes = QuoteEngine(pricing, selection_store)
+    if tracer.enabled:
+        recommender = TracedProxy(recommender, "recommender")
+        quotes = TracedProxy(quotes, "quotes")
+
+    return AppContext(
+        text_library=text_library,
+        inventory=inventory,
+        pricing=pricing,
+        selection_store=selection_store,
+        settings=settings,
+        recommender=recommender,
+        quotes=quotes,
+    )
+
+
+def warm_up(context: AppContext, freeze: bool = True) -> float:
+    """Build what the first updates after a start would otherwise pay for.
+
+    Compiles the text library templates, pre-renders the shared section texts
+    and keyboards (including every filter step of the catalogue) and renders
+    one product card. With ``freeze`` everything allocated so far is moved to
+    the permanent GC generation, so collections stop rescanning the catalogue
+    and caches. Returns the seconds spent.
+    """
+
+    started = time.perf_counter()
+    library = context.text_library
+    inventory = context.inventory
+    library.compile_templates()
+
+    labels = library.menu_labels()
+    responses = context.responses
+    responses.help(labels)
+    responses.contacts(library.company)
+    responses.promos(context.pricing.promos())
+
+    keyboards = context.keyboards
+    keyboards.main_menu(labels)
+    ids = inventory.ids
+    keyboards.categories(ids.categories, ids.tag)
+    keyboards.contacts(library.styles.get("maps_url", "https://yandex.ru/maps/"))
+    for factory in (
+        consent_keyboard,
+        selection_manage_keyboard,
+        delivery_payment.logistics_keyboard,
+        partners.promo_keyboard,
+        support_feedback.manager_menu_keyboard,
+        support_feedback.samples_confirm_keyboard,
+    ):
+        keyboards.static(factory)
+    for (_, filter_name), options in list(ids.facets.items())[: keyboards.max_entries]:
+        keyboards.filter(ids.filters.id(filter_name), options, ids.tag)
+
+    for item in inventory.categories():
+        products = inventory.search(item.name, {})
+        if products:
+            sku = products[0].sku
+            library.render_product_card(products[0], price=context.pricing.price(sku))
+            break
+
+    if freeze:
+        gc.collect()
+        gc.freeze()
+    return time.perf_counter() - started
+
+
+def build_dispatcher(
+    storage: BaseStorage | None = None,
+    rate_limit: bool = True,
+    max_concurrency: int = 0,
+) -> Dispatcher:
+    """Create the dispatcher with middlewares and all routers.
+
+    Updates of one user are handled in order; ``max_concurrency`` (0 for no
+    limit) bounds how many updates are handled at once.
+
+    Routers are module-level singletons, so building a second dispatcher in the
+    same process (tests, load and benchmark tools) detaches them first.
+    """
+
+    storage = storage or MemoryStorage()
+    if tracer.enabled:
+        storage = TracedStorage(storage)
+    dp = Dispatcher(storage=storage)
+    if recorder.enabled:
+        dp.update.outer_middleware(RecordingMiddleware())
+    if tracer.enabled:
+        dp.update.outer_middleware(TracingMiddleware())
+    dp.update.outer_middleware(OrderingMiddleware(max_concurrency))
+    # Innermost update middleware: replies returned by handlers go out before it returns.
+    dp.update.outer_middleware(ReplyMiddleware())
+    if registry.enabled:
+        dp.message.outer_middleware(MetricsMiddleware("message"))
+        dp.callback_query.outer_middleware(MetricsMiddleware("callback_query"))
+        # Registered before the rate limiter so throttled events are labelled too.
+        dp.message.middleware(HandlerLabelMiddleware())
+        dp.callback_query.middleware(HandlerLabelMiddleware())
+    if rate_limit:
+        dp.message.middleware(RateLimitMiddleware(interval=0.6))
+        dp.callback_query.middleware(RateLimitMiddleware(interval=0.4))
+    if tracer.enabled:
+        dp.message.middleware(HandlerSpanMiddleware())
+        dp.callback_query.middleware(HandlerSpanMiddleware())
+
+    for router in ROUTERS:
+        parent = router.parent_router
+        if parent is not None:
+            parent.sub_routers.remove(router)
+            router._parent_router = None  # aiogram has no public detach
+        dp.include_router(router)
+    return dp
+
+
 async def start_bot(settings: Settings) -> None:
+    webhook_mode = settings.use_webhook and settings.webhook_url
+    if webhook_mode and settings.webhook_workers > 1:
+        logger.info("Starting bot in webhook mode with %d workers", settings.webhook_workers)
+        await run_master(settings)
+        return
+
+    configure_instrumentation(settings)
     bot = Bot(
         token=settings.bot_token.get_secret_value(),
+        session=build_session(settings),
         default=DefaultBotProperties(parse_mode=ParseMode.HTML),
     )
-    storage = MemoryStorage()
-    dp = Dispatcher(storage=storage)
-    dp.message.middleware(RateLimitMiddleware(interval=0.6))
-    dp.callback_query.middleware(RateLimitMiddleware(interval=0.4))
+    if tracer.enabled:
+        bot.session.middleware(TracingRequestMiddleware())
 
-    text_library = get_text_library(settings.data_dir)
-    inventory = InventoryStub(settings.data_dir / "catalog.json")
-    pricing = PricingStub()
-    selection_store = SelectionStore(settings.tmp_dir, autosave=settings.autosave_selection)
-
-    set_app_context(
-        AppContext(
-            text_library=text_library,
-            inventory=inventory,
-            pricing=pricing,
-            selection_store=selection_store,
-            settings=settings,
-        )
-    )
+    context = build_app_context(settings)
+    set_app_context(context)
+    dp = build_dispatcher(max_concurrency=settings.update_concurrency)
+    # Updates are only accepted once this returns: polling and the webhook start below.
+    logger.info("Warm-up finished in %.0f ms", warm_up(context) * 1000)
+
+    metrics_runner = None
+    if registry.enabled:
+        metrics_runner = await start_metrics_server(settings.metrics_host, settings.metrics_port)
+    watcher = None
+    if settings.texts_watch_interval_s > 0:
+        watcher = asyncio.create_task(watch_texts(context, settings.texts_watch_interval_s))
 
-    dp.include_router(start.router)
-    dp.include_router(wizard_picker.router)
-    dp.include_router(catalog_browse.router)
-    dp.include_router(cart_like_selection.router)
-    dp.include_router(delivery_payment.router)
-    dp.include_router(partners.router)
-    dp.include_router(support_feedback.router)
-
-    if settings.use_webhook and settings.webhook_url:
-        logger.info("Starting bot in webhook mode")
-        await bot.set_webhook(url=settings.webhook_url, drop_pending_updates=True)
-        await dp.start_webhook(
-            bot=bot,
-            webhook_path="/",
-            host=settings.webapp_host or "0.0.0.0",
-            port=settings.webapp_port or 8080,
-        )
-    else:
-        logger.info("Starting bot in long-polling mode")
-        await bot.delete_webhook(drop_pending_updates=True)
-        await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
+    try:
+        if webhook_mode:
+            logger.info("Starting bot in webhook mode")
+            await bot.set_webhook(
+                url=settings.webhook_url,
+                secret_token=settings.webhook_secret,
+                drop_pending_updates=True,
+            )
+            await serve_webhook(dp, bot, settings)
+        else:
+            logger.info("Starting bot in long-polling mode")
+            await bot.delete_webhook(drop_pending_updates=True)
+            await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+        recorder.close()
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
 
 
 def configure_logging() -> None:
@@ -0,0 +1,95 @@
+"""Per-handler latency and outcome metrics."""
+
+from __future__ import annotations
+
+from time import perf_counter
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.event.bases import UNHANDLED
+
+from ..services.metrics import HANDLER_DURATION, HANDLER_ERRORS, registry
+
+_LABEL_KEY = "metrics_label"
+
+
+class _HandlerLabel:
+    __slots__ = ("name",)
+
+    def __init__(self) -> None:
+        self.name: str | None = None
+
+
+def handler_name(callback: Callable[..., Any]) -> str:
+    module = getattr(callback, "__module__", "") or ""
+    qualname = getattr(callback, "__qualname__", None) or repr(callback)
+    return f"{module.rsplit('.', 1)[-1]}.{qualname}" if module else qualname
+
+
+class MetricsMiddleware(BaseMiddleware):
+    """Outer middleware: time every event and count handler errors.
+
+    Register it with ``observer.outer_middleware`` together with
+    :class:`HandlerLabelMiddleware` as an inner middleware; the latter tells
+    the outer one which handler matched. Events that no handler matched are
+    recorded as ``handler="unhandled"``.
+    """
+
+    def __init__(self, event_type: str) -> None:
+        super().__init__()
+        self.event_type = event_type
+
+    async def __call__(  # type: ignore[override]
+        self,
+        handler: Callable[[Any, dict[str, Any]], Awaitable[Any]],
+        event: object,
+        data: dict[str, Any],
+    ) -> Any:
+        if not registry.enabled:
+            return await handler(event, data)
+
+        label = _HandlerLabel()
+        data[_LABEL_KEY] = label
+        started = perf_counter()
+        outcome = "ok"
+        try:
+            result = await handler(event, data)
+        except Exception:
+            outcome = "error"
+            raise
+        else:
+            if result is UNHANDLED:
+                outcome = "unhandled"
+            return result
+        finally:
+            name = label.name or "unhandled"
+            registry.histogram(HANDLER_DURATION, "Update handling latency").observe(
+                perf_counter() - started,
+                event=self.event_type,
+                handler=name,
+                outcome=outcome,
+            )
+            if outcome == "error":
+                registry.counter(HANDLER_ERRORS, "Exceptions raised by handlers").inc(
+                    event=self.event_type,
+                    handler=name,
+                )
+
+
+class HandlerLabelMiddleware(BaseMiddleware):
+    """Inner middleware that reports the matched handler to :class:`MetricsMiddleware`."""
+
+    async def __call__(  # type: ignore[override]
+        self,
+        handler: Callable[[Any, dict[str, Any]], Awaitable[Any]],
+        event: object,
+        data: dict[str, Any],
+    ) -> Any:
+        label = data.get(_LABEL_KEY)
+        handler_object = data.get("handler")
+        if label is not None and handler_object is not None:
+            label.name = handler_name(handler_object.callback)
+        return await handler(event, data)
+
+
+__all__ = ["MetricsMiddleware", "HandlerLabelMiddleware", "handler_name"]
@@ -0,0 +1,106 @@
+"""Outer ``dp.update`` middleware: one update at a time per user, users in parallel."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+
+from ..services.metrics import (
+    USER_QUEUE_LENGTH,
+    USER_QUEUE_MAX,
+    USER_QUEUE_WAIT,
+    USER_QUEUES_ACTIVE,
+    registry,
+)
+
+QUEUE_LENGTH_BUCKETS: tuple[float, ...] = (0, 1, 2, 3, 5, 10, 20, 50)
+
+
+@dataclass(slots=True)
+class _UserSlot:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    # Updates of this user being handled or waiting for the lock.
+    pending: int = 0
+
+
+class OrderingMiddleware(BaseMiddleware):
+    """Handle each user's updates in arrival order; bound how many run at once.
+
+    Polling runs every update as its own task, so two quick taps of one user
+    could read and rewrite the same FSM data concurrently. A user's lock exists
+    only while they have updates in flight. The global limit is taken after the
+    user's lock, so updates queued behind their own user never hold a slot
+    another user could use. Updates without a user or chat are not ordered.
+    """
+
+    def __init__(self, max_concurrency: int = 0) -> None:
+        super().__init__()
+        self.max_concurrency = max_concurrency
+        self._slots: dict[int, _UserSlot] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency > 0 else None
+        if registry.enabled:
+            registry.gauge(USER_QUEUES_ACTIVE, "Users with updates in flight").track(
+                lambda: len(self._slots)
+            )
+            registry.gauge(USER_QUEUE_MAX, "Longest per-user queue of updates in flight").track(
+                self.max_pending
+            )
+
+    def pending(self, key: int) -> int:
+        slot = self._slots.get(key)
+        return slot.pending if slot is not None else 0
+
+    def max_pending(self) -> int:
+        return max((slot.pending for slot in self._slots.values()), default=0)
+
+    async def __call__(  # type: ignore[override]
+        self,
+        handler: Callable[[Any, dict[str, Any]], Awaitable[Any]],
+        event: Any,
+        data: dict[str, Any],
+    ) -> Any:
+        owner = data.get("event_from_user") or data.get("event_chat")
+        if owner is None:
+            return await self._run(handler, event, data)
+
+        key = owner.id
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = _UserSlot()
+        if registry.enabled:
+            registry.histogram(
+                USER_QUEUE_LENGTH,
+                "Updates of the same user already in flight when one arrives",
+                QUEUE_LENGTH_BUCKETS,
+            ).observe(slot.pending)
+        slot.pending += 1
+        started = perf_counter()
+        try:
+            async with slot.lock:
+                if registry.enabled:
+                    registry.histogram(
+                        USER_QUEUE_WAIT, "Time updates waited behind the same user's updates"
+                    ).observe(perf_counter() - started)
+                return await self._run(handler, event, data)
+        finally:
+            slot.pending -= 1
+            if not slot.pending:
+                del self._slots[key]
+
+    async def _run(
+        self,
+        handler: Callable[[Any, dict[str, Any]], Awaitable[Any]],
+        event: Any,
+        data: dict[str, Any],
+    ) -> Any:
+        if self._semaphore is None:
+            return await handler(event, data)
+        async with self._semaphore:
+            return await handler(event, data)
+
+
+__all__ = ["OrderingMiddleware"]
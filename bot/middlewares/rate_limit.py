@@ -7,6 +7,9 @@ from typing import Awaitable, Callable, Dict, Optional
 
 from aiogram import BaseMiddleware
 
+from ..services.metrics import THROTTLED, registry
+from .metrics import handler_name
+
 
 class RateLimitMiddleware(BaseMiddleware):
     """Throttle events from the same user within a given interval."""
@@ -27,9 +30,19 @@ class RateLimitMiddleware(BaseMiddleware):
             now = time.monotonic()
             last = self._last_event_at.get(from_user.id)
             if last is not None and now - last < self.interval:
+                if registry.enabled:
+                    self._count_throttled(event, data)
                 return None
             self._last_event_at[from_user.id] = now
         return await handler(event, data)
 
+    @staticmethod
+    def _count_throttled(event: object, data: dict) -> None:
+        handler_object = data.get("handler")
+        registry.counter(THROTTLED, "Events dropped by the rate limiter").inc(
+            event=type(event).__name__.lower(),
+            handler=handler_name(handler_object.callback) if handler_object else "unknown",
+        )
+
 
 __all__ = ["RateLimitMiddleware"]
@@ -0,0 +1,26 @@
+"""Outer ``dp.update`` middleware feeding the update recorder."""
+
+from __future__ import annotations
+
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+
+from ..services.recording import recorder
+
+
+class RecordingMiddleware(BaseMiddleware):
+    """Record every incoming update before it is handled."""
+
+    async def __call__(  # type: ignore[override]
+        self,
+        handler: Callable[[Any, dict[str, Any]], Awaitable[Any]],
+        event: Any,
+        data: dict[str, Any],
+    ) -> Any:
+        if recorder.enabled:
+            recorder.record(event.model_dump(mode="json", exclude_none=True))
+        return await handler(event, data)
+
+
+__all__ = ["RecordingMiddleware"]
@@ -0,0 +1,38 @@
+"""Send Bot API methods returned by handlers while the update is still being handled."""
+
+from __future__ import annotations
+
+from typing import Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.methods import TelegramMethod
+
+# Dispatcher data key the webhook ingest handler sets when it can put a returned
+# method into its response body instead.
+INLINE_REPLY = "inline_reply"
+
+
+class ReplyMiddleware(BaseMiddleware):
+    """Call the method a handler returned (``return message.answer(...)``) in the chain.
+
+    Left to aiogram, the method is sent only after every middleware has
+    returned, through ``silent_call_request``, which logs and swallows errors.
+    Sending it here keeps the reply inside whatever ordering outer middlewares
+    provide and lets a failed send raise like an awaited ``message.answer``.
+    Updates fed with ``inline_reply=True`` get the method back untouched.
+    """
+
+    async def __call__(  # type: ignore[override]
+        self,
+        handler: Callable[[dict, dict], Awaitable],
+        event: object,
+        data: dict,
+    ):
+        result = await handler(event, data)
+        if isinstance(result, TelegramMethod) and not data.get(INLINE_REPLY):
+            await data["bot"](result)
+            return None
+        return result
+
+
+__all__ = ["INLINE_REPLY", "ReplyMiddleware"]
@@ -0,0 +1,103 @@
+"""aiogram hooks that feed the update tracer."""
+
+from __future__ import annotations
+
+from typing import Any, Awaitable, Callable, Mapping
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StorageKey
+from aiogram.methods import Response, TelegramMethod
+
+from ..services.tracing import tracer
+from .metrics import handler_name
+
+
+class TracingMiddleware(BaseMiddleware):
+    """Outer ``dp.update`` middleware: one trace per sampled update."""
+
+    async def __call__(  # type: ignore[override]
+        self,
+        handler: Callable[[Any, dict[str, Any]], Awaitable[Any]],
+        event: Any,
+        data: dict[str, Any],
+    ) -> Any:
+        if not tracer.enabled:
+            return await handler(event, data)
+        with tracer.trace(getattr(event, "update_id", None), name=f"update:{event.event_type}"):
+            return await handler(event, data)
+
+
+class HandlerSpanMiddleware(BaseMiddleware):
+    """Inner middleware: wrap the matched handler in a ``handler:<name>`` span."""
+
+    async def __call__(  # type: ignore[override]
+        self,
+        handler: Callable[[Any, dict[str, Any]], Awaitable[Any]],
+        event: Any,
+        data: dict[str, Any],
+    ) -> Any:
+        handler_object = data.get("handler")
+        if handler_object is None:
+            return await handler(event, data)
+        with tracer.span(f"handler:{handler_name(handler_object.callback)}"):
+            return await handler(event, data)
+
+
+class TracingRequestMiddleware(BaseRequestMiddleware):
+    """Bot session middleware: outbound Bot API calls become ``telegram:<method>`` spans."""
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[Any],
+        bot: Bot,
+        method: TelegramMethod[Any],
+    ) -> Response[Any]:
+        with tracer.span(f"telegram:{type(method).__name__}"):
+            return await make_request(bot, method)
+
+
+class TracedStorage(BaseStorage):
+    """FSM storage wrapper recording ``storage.<operation>`` spans."""
+
+    def __init__(self, storage: BaseStorage) -> None:
+        self.storage = storage
+
+    async def set_state(self, key: StorageKey, state: str | State | None = None) -> None:
+        with tracer.span("storage.set_state"):
+            await self.storage.set_state(key, state)
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        with tracer.span("storage.get_state"):
+            return await self.storage.get_state(key)
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        with tracer.span("storage.set_data"):
+            await self.storage.set_data(key, data)
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        with tracer.span("storage.get_data"):
+            return await self.storage.get_data(key)
+
+    async def update_data(self, key: StorageKey, data: Mapping[str, Any]) -> dict[str, Any]:
+        with tracer.span("storage.update_data"):
+            return await self.storage.update_data(key, data)
+
+    async def close(self) -> None:
+        await self.storage.close()
+
+    def __getattr__(self, name: str) -> Any:
+        # Storage-specific helpers (e.g. MemoryStorage.with_data) pass through.
+        return getattr(self.storage, name)
+
+
+__all__ = [
+    "TracingMiddleware",
+    "HandlerSpanMiddleware",
+    "TracingRequestMiddleware",
+    "TracedStorage",
+]
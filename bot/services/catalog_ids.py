@@ -0,0 +1,134 @@
+"""Stable integer IDs for catalogue categories, filters and options."""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass, field
+from typing import Generic, Hashable, Iterable, Iterator, Mapping, Sequence, TypeVar
+
+from .inventory_port import CategoryDescriptor
+
+K = TypeVar("K", bound=Hashable)
+
+# (category, filter name, option label)
+OptionKey = tuple[str, str, str]
+# Size of CatalogIds.tag; a 24-bit varint adds at most 4 bytes to a button.
+TAG_BITS = 24
+
+
+class IdTable(Generic[K]):
+    """Integer IDs for distinct keys with O(1) lookups in both directions.
+
+    Built with ``previous``, keys it already knew keep their IDs and new keys
+    get fresh ones, so IDs stay valid across catalogue reloads. Keys missing
+    from the new catalogue are retired: their IDs are never reused and
+    resolve to ``None``, which is how a button from an older catalogue is told
+    apart from a current one. Iteration yields the current keys in the order
+    they were given.
+    """
+
+    __slots__ = ("keys", "_ids", "_order", "_live")
+
+    def __init__(self, keys: Iterable[K] = (), previous: IdTable[K] | None = None) -> None:
+        known: list[K] = list(previous.keys) if previous is not None else []
+        ids: dict[K, int] = dict(previous._ids) if previous is not None else {}
+        order: dict[int, None] = {}
+        for key in keys:
+            item_id = ids.get(key)
+            if item_id is None:
+                item_id = ids[key] = len(known)
+                known.append(key)
+            order[item_id] = None
+        self.keys: tuple[K, ...] = tuple(known)
+        self._ids = ids
+        self._order = tuple(order)
+        self._live = frozenset(order)
+
+    def id(self, key: K) -> int:
+        """ID of ``key``; raises ``KeyError`` for keys the table never saw."""
+
+        return self._ids[key]
+
+    def get(self, item_id: int) -> K | None:
+        """Key behind ``item_id`` if it is in the current catalogue, else ``None``."""
+
+        return self.keys[item_id] if item_id in self._live else None
+
+    def items(self) -> Iterator[tuple[int, K]]:
+        """``(id, key)`` pairs of the current catalogue, in its order."""
+
+        keys = self.keys
+        return ((item_id, keys[item_id]) for item_id in self._order)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __iter__(self) -> Iterator[K]:
+        keys = self.keys
+        return (keys[item_id] for item_id in self._order)
+
+
+@dataclass(slots=True)
+class CatalogIds:
+    """ID tables of one catalogue version, carried over from the previous one.
+
+    ``facets`` lists the options of every (category, filter) pair as
+    ``{option_id: label}`` in display order, so rendering a filter step needs
+    no hashing and no per-user mapping in FSM data.
+
+    IDs only live in memory, so a restart numbers the catalogue afresh.
+    ``tag`` names the numbering: a hash of the catalogue versions it was built
+    through. Loading the same file from scratch gives the same IDs and the same
+    tag; after reloads, or from another file, the tag differs. Catalogue
+    buttons carry the tag, and ``tags`` holds every tag whose IDs still mean
+    the same here, i.e. this one and those of the versions carried over.
+    """
+
+    categories: IdTable[str]
+    filters: IdTable[str]
+    options: IdTable[OptionKey]
+    facets: dict[tuple[str, str], dict[int, str]] = field(default_factory=dict)
+    version: str = ""
+    tag: int = 0
+    tags: frozenset[int] = frozenset()
+
+    @classmethod
+    def build(
+        cls,
+        categories: Sequence[CategoryDescriptor],
+        facets: Mapping[tuple[str, str], Sequence[str]] | None = None,
+        previous: CatalogIds | None = None,
+        version: str = "",
+    ) -> CatalogIds:
+        if previous is not None and not previous.version:
+            previous = None  # nothing loaded yet, so nothing to carry over
+        if previous is not None and previous.version == version:
+            return previous
+        facets = facets or {}
+        tag = _lineage_tag(version, previous.tag if previous else None)
+        option_keys = [(*key, label) for key, labels in facets.items() for label in labels]
+        options = IdTable(option_keys, previous.options if previous else None)
+        filter_names = (name for item in categories for name in item.filters)
+        return cls(
+            categories=IdTable(
+                (item.name for item in categories), previous.categories if previous else None
+            ),
+            filters=IdTable(filter_names, previous.filters if previous else None),
+            options=options,
+            facets={
+                key: {options.id((*key, label)): label for label in labels}
+                for key, labels in facets.items()
+            },
+            version=version,
+            tag=tag,
+            tags=(previous.tags if previous else frozenset()) | {tag},
+        )
+
+
+def _lineage_tag(version: str, previous_tag: int | None) -> int:
+    seed = version if previous_tag is None else f"{previous_tag}:{version}"
+    digest = hashlib.sha1(seed.encode("utf-8")).digest()
+    return int.from_bytes(digest, "big") >> (160 - TAG_BITS)
+
+
+__all__ = ["CatalogIds", "IdTable", "OptionKey", "TAG_BITS"]
@@ -0,0 +1,80 @@
+"""Order estimates combining pack optimisation and cutting layouts."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Sequence
+
+from ..utils.formatting import parse_metrics
+from .inventory_port import Product
+from .layout import Rect, layout_for_product, order_total, parse_room_plan
+from .pack_optimizer import Room, plan_for_product
+
+
+@dataclass(slots=True)
+class OrderEstimate:
+    """Totals to store in a selection entry or wizard recommendation."""
+
+    area_m2: float
+    waste_pct: int
+    total_m2: float
+    pack_step: float | None
+    notes: str | None = None
+
+
+def parse_order_input(
+    text: str,
+    default_waste: int = 5,
+) -> tuple[list[float], int, tuple[Rect, ...] | None]:
+    """Parse «площадь запас», «40+25 7» or room dimensions «5x8+3x4».
+
+    Returns room areas, the waste allowance and the room plan when dimensions
+    were given. Raises ``ValueError`` for unrecognised input.
+    """
+
+    rects = parse_room_plan(text)
+    if rects is None:
+        areas, waste = parse_metrics(text, default_waste)
+        return areas, waste, None
+    parts = text.split()
+    waste = int(parts[1]) if len(parts) > 1 else default_waste
+    return [rect.area_m2 for rect in rects], waste, rects
+
+
+def estimate_order(
+    product: Product,
+    areas: Sequence[float],
+    waste_pct: int,
+    rects: tuple[Rect, ...] | None = None,
+    unit_price: float | None = None,
+) -> OrderEstimate:
+    """Estimate material to order for ``product``.
+
+    Roll carpet and carpet tiles with a known room plan use the cutting layout
+    and its real waste instead of the flat allowance; otherwise the pooled
+    requirement goes through the pack optimiser.
+    """
+
+    area = round(sum(areas), 2)
+    layout = layout_for_product(product, rects) if rects else None
+    if layout is not None:
+        return OrderEstimate(
+            area_m2=area,
+            waste_pct=round(layout.waste_pct),
+            total_m2=order_total(product, layout),
+            pack_step=product.pack_step_m2 if layout.kind == "tile" else None,
+            notes=layout.description,
+        )
+
+    rooms = [Room(value, waste_pct) for value in areas]
+    total, plan = plan_for_product(product, rooms, unit_price)
+    return OrderEstimate(
+        area_m2=area,
+        waste_pct=waste_pct,
+        total_m2=total,
+        pack_step=None if plan else product.pack_step_m2,
+        notes=plan.describe() if plan else None,
+    )
+
+
+__all__ = ["OrderEstimate", "estimate_order", "parse_order_input"]
@@ -5,12 +5,20 @@ from __future__ import annotations
 from dataclasses import dataclass
 from io import BytesIO
 from pathlib import Path
-from typing import Any, Iterable
+from typing import TYPE_CHECKING, Any, Iterable
 
 from jinja2 import Environment, StrictUndefined
 from openpyxl import Workbook
 from openpyxl.styles import Alignment, Font
 
+from .metrics import timed
+from .tracing import traced
+
+if TYPE_CHECKING:
+    from openpyxl.worksheet.worksheet import Worksheet
+
+    from .quotes import Quote
+
 env = Environment(undefined=StrictUndefined, trim_blocks=True, lstrip_blocks=True)
 
 
@@ -29,12 +37,15 @@ class SelectionLine:
     notes: str | None = None
 
 
+@timed("export")
+@traced("export.selection_to_workbook")
 def selection_to_workbook(
     items: Iterable[SelectionLine],
     customer: dict[str, Any],
     company: dict[str, Any] | None = None,
+    quote: Quote | None = None,
 ) -> BytesIO:
-    """Generate Excel workbook with selection details."""
+    """Generate Excel workbook with selection details (and a priced sheet if quoted)."""
 
     items_list = list(items)
     workbook = Workbook()
@@ -80,6 +91,9 @@ def selection_to_workbook(
     ws_summary.append(["Всего позиций", len(items_list)])
     ws_summary.append(["Общий метраж, м²", round(totals, 2)])
 
+    # Quote sheet -----------------------------------------------------------------
+    ws_quote = _append_quote_sheet(workbook, quote) if quote and quote.lines else None
+
     # Contacts sheet --------------------------------------------------------------
     ws_contacts = workbook.create_sheet("Контакты клиента")
     for key, value in customer.items():
@@ -94,6 +108,8 @@ def selection_to_workbook(
     auto_fit_columns(ws_items)
     auto_fit_columns(ws_summary)
     auto_fit_columns(ws_contacts)
+    if ws_quote is not None:
+        auto_fit_columns(ws_quote)
 
     buffer = BytesIO()
     workbook.save(buffer)
@@ -101,6 +117,54 @@ def selection_to_workbook(
     return buffer
 
 
+def _append_quote_sheet(workbook: Workbook, quote: Quote) -> Worksheet:
+    """Add the «Смета» sheet with pack counts, prices and discounts."""
+
+    ws_quote = workbook.create_sheet("Смета")
+    ws_quote.append(
+        [
+            "SKU",
+            "Коллекция",
+            "Нужно, м²",
+            "К заказу, м²",
+            "Упаковок",
+            "Цена, ₽/м²",
+            "Скидка, %",
+            "Акции",
+            "Сумма, ₽",
+        ]
+    )
+    header_font = Font(bold=True)
+    for cell in ws_quote[1]:
+        cell.font = header_font
+        cell.alignment = Alignment(horizontal="center", vertical="center")
+
+    for line in quote.lines:
+        ws_quote.append(
+            [
+                line.sku,
+                line.name,
+                round(line.required_m2, 2),
+                round(line.billed_m2, 2),
+                line.packs if line.packs is not None else "",
+                line.unit_price if line.unit_price is not None else "по запросу",
+                line.discount_pct or "",
+                ", ".join(line.promo_codes),
+                line.amount if line.amount is not None else "",
+            ]
+        )
+
+    ws_quote.append([])
+    ws_quote.append(["Итого, м²", quote.total_m2])
+    ws_quote.append(["Сумма без скидки, ₽", quote.subtotal])
+    ws_quote.append(["Скидка, ₽", quote.discount])
+    ws_quote.append(["Итого к оплате, ₽", quote.total])
+    for row in ws_quote.iter_rows(min_row=ws_quote.max_row, max_row=ws_quote.max_row):
+        row[0].font = header_font
+        row[1].font = header_font
+    return ws_quote
+
+
 def auto_fit_columns(sheet) -> None:
     """Adjust sheet columns based on their content length."""
 
@@ -0,0 +1,118 @@
+"""Bot API HTTP session with a tuned connection pool, timeouts and optional proxy pool."""
+
+from __future__ import annotations
+
+from itertools import count
+from typing import TYPE_CHECKING, Any, Sequence
+
+from aiogram import __version__ as aiogram_version
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.methods import GetUpdates, TelegramMethod
+from aiohttp import ClientSession, ClientTimeout
+from aiohttp.hdrs import USER_AGENT
+from aiohttp.http import SERVER_SOFTWARE
+
+from ..config import Settings
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+
+class TunedAiohttpSession(AiohttpSession):
+    """:class:`AiohttpSession` with explicit pool, keep-alive, DNS cache and timeouts.
+
+    Connections are kept open for ``keepalive_timeout`` seconds between bursts
+    instead of aiohttp's 15 s, and resolved addresses are cached for
+    ``dns_ttl`` seconds. Every request gets a connect and, if set, a socket read
+    timeout on top of the total one; long-polling ``getUpdates`` never gets the
+    read timeout.
+
+    ``proxies`` (HTTP proxy URLs) spreads requests round-robin over one
+    connection pool per proxy, ``limit`` split between them. For a single
+    SOCKS proxy use aiogram's own ``proxy`` argument instead.
+    """
+
+    def __init__(
+        self,
+        *,
+        limit: int = 100,
+        keepalive_timeout: float = 30.0,
+        dns_ttl: int = 300,
+        connect_timeout: float | None = 5.0,
+        read_timeout: float | None = None,
+        proxies: Sequence[str] = (),
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(limit=limit, **kwargs)
+        self._connector_init.update(keepalive_timeout=keepalive_timeout, ttl_dns_cache=dns_ttl)
+        self.limit = limit
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.proxies = list(proxies)
+        self._pool: list[ClientSession] = []
+        self._turn = count()
+
+    async def create_session(self) -> ClientSession:
+        if not self.proxies:
+            return await super().create_session()
+        if not self._pool or any(session.closed for session in self._pool):
+            await self.close()
+            per_proxy = max(1, self.limit // len(self.proxies))
+            self._pool = [
+                ClientSession(
+                    connector=self._connector_type(**{**self._connector_init, "limit": per_proxy}),
+                    headers={USER_AGENT: f"{SERVER_SOFTWARE} aiogram/{aiogram_version}"},
+                    proxy=proxy,
+                )
+                for proxy in self.proxies
+            ]
+        return self._pool[next(self._turn) % len(self._pool)]
+
+    async def make_request(
+        self,
+        bot: Bot,
+        method: TelegramMethod[Any],
+        timeout: int | None = None,
+    ) -> Any:
+        # aiohttp turns a plain number into a total-only timeout; pass the full set instead.
+        client_timeout = ClientTimeout(
+            total=self.timeout if timeout is None else timeout,
+            connect=self.connect_timeout,
+            sock_read=None if isinstance(method, GetUpdates) else self.read_timeout,
+        )
+        return await super().make_request(
+            bot, method, timeout=client_timeout  # type: ignore[arg-type]
+        )
+
+    async def close(self) -> None:
+        await super().close()
+        pool, self._pool = self._pool, []
+        for session in pool:
+            await session.close()
+
+
+def build_session(
+    settings: Settings,
+    api: TelegramAPIServer | None = None,
+) -> TunedAiohttpSession:
+    """Create the Bot API session described by the ``BOT_API_*`` settings."""
+
+    options: dict[str, Any] = {}
+    if api is None and settings.bot_api_url:
+        api = TelegramAPIServer.from_base(settings.bot_api_url)
+    if api is not None:
+        options["api"] = api
+    return TunedAiohttpSession(
+        limit=settings.bot_api_pool_size,
+        keepalive_timeout=settings.bot_api_keepalive_s,
+        dns_ttl=settings.bot_api_dns_ttl_s,
+        connect_timeout=settings.bot_api_connect_timeout_s,
+        read_timeout=settings.bot_api_read_timeout_s,
+        proxies=settings.bot_api_proxies,
+        timeout=settings.bot_api_timeout_s,
+        **options,
+    )
+
+
+__all__ = ["TunedAiohttpSession", "build_session"]
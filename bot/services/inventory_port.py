@@ -2,10 +2,13 @@
 
 from __future__ import annotations
 
-from typing import Any, Protocol
+from typing import TYPE_CHECKING, Any, Protocol
 
 from pydantic import BaseModel, Field
 
+if TYPE_CHECKING:
+    from .catalog_ids import CatalogIds
+
 
 class Product(BaseModel):
     """Normalized product model used across the bot."""
@@ -29,6 +32,9 @@ class Product(BaseModel):
     shape: str | None = None
     lock: str | None = None
     pack_step_m2: float | None = None
+    pack_sizes_m2: list[float] = Field(default_factory=list)
+    roll_width_m: float | None = None
+    tile_size_m: float | None = None
     image_url: str | None = None
     description: str | None = None
 
@@ -45,6 +51,11 @@ class CategoryDescriptor(BaseModel):
 class InventoryPort(Protocol):
     """Abstraction for integrating different inventory data sources."""
 
+    #: Changes whenever the catalogue data changes; caches derived from it key on this.
+    version: str
+    #: Integer IDs of categories, filters and options, stable across reloads.
+    ids: CatalogIds
+
     def categories(self) -> list[CategoryDescriptor]:
         """Return all available categories and their filters."""
 
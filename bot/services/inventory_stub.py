@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
 from dataclasses import dataclass
 from pathlib import Path
@@ -9,6 +10,7 @@ from typing import Any
 
 from pydantic import ValidationError
 
+from .catalog_ids import CatalogIds
 from .inventory_port import CategoryDescriptor, InventoryPort, Product
 
 FILTER_KEY_MAP: dict[str, str] = {
@@ -45,6 +47,8 @@ class InventoryStub(InventoryPort):
         self.data_path = data_path
         self._catalog: dict[str, CatalogNode] = {}
         self._products_index: dict[str, Product] = {}
+        self.version = ""
+        self.ids = CatalogIds.build(())
         self.reload()
 
     def reload(self) -> None:
@@ -53,7 +57,8 @@ class InventoryStub(InventoryPort):
         if not self.data_path.exists():
             raise FileNotFoundError(f"Catalog file not found: {self.data_path}")
 
-        content = json.loads(self.data_path.read_text(encoding="utf-8"))
+        source = self.data_path.read_bytes()
+        content = json.loads(source)
         catalog: dict[str, CatalogNode] = {}
         index: dict[str, Product] = {}
 
@@ -78,6 +83,16 @@ class InventoryStub(InventoryPort):
 
         self._catalog = catalog
         self._products_index = index
+        self.version = hashlib.sha1(source).hexdigest()[:12]
+        facets = {
+            (name, filter_name): self._collect_options(node, filter_name)
+            for name, node in catalog.items()
+            for filter_name in node.descriptor.filters
+        }
+        # Carried over so buttons sent before a reload keep pointing at the same items.
+        self.ids = CatalogIds.build(
+            self.categories(), facets, previous=self.ids, version=self.version
+        )
 
     # InventoryPort implementation -------------------------------------------------
 
@@ -108,10 +123,18 @@ class InventoryStub(InventoryPort):
         return None
 
     def filter_options(self, category: str, filter_name: str) -> list[str]:
+        options = self.ids.facets.get((category, filter_name))
+        if options is not None:
+            return list(options.values())
         node = self._catalog.get(category)
         if not node:
             return []
+        return self._collect_options(node, filter_name)
 
+    # Helpers ---------------------------------------------------------------------
+
+    @staticmethod
+    def _collect_options(node: CatalogNode, filter_name: str) -> list[str]:
         attr_name = FILTER_KEY_MAP.get(filter_name, filter_name)
         options: set[str] = set()
 
@@ -124,8 +147,6 @@ class InventoryStub(InventoryPort):
 
         return sorted(options)
 
-    # Helpers ---------------------------------------------------------------------
-
     def _matches(self, product: Product, filters: dict[str, Any]) -> bool:
         for filter_name, filter_value in filters.items():
             attr_name = FILTER_KEY_MAP.get(filter_name, filter_name)
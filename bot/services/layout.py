@@ -0,0 +1,264 @@
+"""Cutting-layout estimates for roll carpet and carpet tiles."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import product as orientations
+from math import ceil, floor
+from typing import Literal
+
+from ..utils.formatting import calc_required
+from .inventory_port import Product
+
+LayoutKind = Literal["roll", "tile"]
+
+# Category defaults; products may override them with roll_width_m / tile_size_m.
+LAYOUT_DEFAULTS: dict[str, tuple[LayoutKind, float]] = {
+    "Ковролин": ("roll", 4.0),
+    "Ковровая плитка": ("tile", 0.5),
+}
+
+ROLL_TRIM_M = 0.1
+# Roll layouts try every orientation of every rectangle (2^n plans).
+MAX_ROOM_RECTS = 8
+_EPS = 1e-6
+_DIMENSIONS_RE = re.compile(r"^(\d+(?:\.\d+)?)[xх×*](\d+(?:\.\d+)?)$", re.IGNORECASE)
+
+
+@dataclass(slots=True, frozen=True)
+class Rect:
+    """Rectangular part of a room plan, in metres."""
+
+    width_m: float
+    length_m: float
+
+    @property
+    def area_m2(self) -> float:
+        return self.width_m * self.length_m
+
+
+class RoomPlanTooLargeError(ValueError):
+    """A room plan has more than :data:`MAX_ROOM_RECTS` rectangles."""
+
+
+@dataclass(slots=True, frozen=True)
+class LayoutResult:
+    """Material needed for a room plan and the resulting real waste."""
+
+    kind: LayoutKind
+    area_m2: float
+    material_m2: float
+    pieces: int
+    description: str
+
+    @property
+    def waste_pct(self) -> float:
+        if self.area_m2 <= 0:
+            return 0.0
+        return round((self.material_m2 / self.area_m2 - 1) * 100, 1)
+
+
+def parse_room_plan(text: str) -> tuple[Rect, ...] | None:
+    """Parse «5x8» or an L-shaped «5x8+3x4» plan; ``None`` if the text holds no dimensions.
+
+    Raises :class:`RoomPlanTooLargeError` for more than :data:`MAX_ROOM_RECTS` rectangles.
+    """
+
+    parts = text.replace(",", ".").split()
+    if not parts:
+        return None
+    chunks = parts[0].split("+")
+    rects: list[Rect] = []
+    for chunk in chunks:
+        match = _DIMENSIONS_RE.match(chunk.strip())
+        if not match:
+            return None
+        width, length = float(match.group(1)), float(match.group(2))
+        if width <= 0 or length <= 0:
+            return None
+        rects.append(Rect(width, length))
+        if len(rects) > MAX_ROOM_RECTS:
+            raise RoomPlanTooLargeError(f"{len(chunks)} rectangles, at most {MAX_ROOM_RECTS}")
+    return tuple(rects)
+
+
+def layout_settings(product: Product) -> tuple[LayoutKind, float] | None:
+    """Return the layout kind and roll width / tile size for ``product``, if any."""
+
+    if product.roll_width_m:
+        return "roll", product.roll_width_m
+    if product.tile_size_m:
+        return "tile", product.tile_size_m
+    return LAYOUT_DEFAULTS.get(product.category)
+
+
+def layout_for_product(product: Product, rects: tuple[Rect, ...]) -> LayoutResult | None:
+    settings = layout_settings(product)
+    if settings is None or not rects:
+        return None
+    kind, size = settings
+    if kind == "roll":
+        return roll_layout(rects, size)
+    return tile_layout(rects, size)
+
+
+def order_total(product: Product, layout: LayoutResult) -> float:
+    """Material to order: rolls are cut to length, tiles are sold in whole packs."""
+
+    if layout.kind == "roll":
+        return round(layout.material_m2, 2)
+    return calc_required(layout.material_m2, 0, product.pack_step_m2)
+
+
+@lru_cache(maxsize=512)
+def roll_layout(
+    rects: tuple[Rect, ...],
+    roll_width: float,
+    trim_m: float = ROLL_TRIM_M,
+) -> LayoutResult:
+    """Strip layout for a roll of ``roll_width`` metres.
+
+    Every rectangle is tried in both orientations. Full-width strips are cut
+    from the roll; the narrower remainder pieces are packed first-fit into the
+    offcuts of earlier strips before a new strip is cut for them. Plans of
+    more than :data:`MAX_ROOM_RECTS` rectangles only try each rectangle's
+    own best orientation and the two uniform ones.
+    """
+
+    area = sum(rect.area_m2 for rect in rects)
+    if len(rects) <= MAX_ROOM_RECTS:
+        candidates = orientations((False, True), repeat=len(rects))
+    else:
+        greedy = tuple(
+            _roll_length((rect,), (True,), roll_width, trim_m)
+            < _roll_length((rect,), (False,), roll_width, trim_m)
+            for rect in rects
+        )
+        candidates = [greedy, (False,) * len(rects), (True,) * len(rects)]
+    best_length, best_strips = 0.0, 0
+    for index, flips in enumerate(candidates):
+        length, strips = _roll_length(rects, flips, roll_width, trim_m)
+        if index == 0 or (round(length, 4), strips) < (round(best_length, 4), best_strips):
+            best_length, best_strips = length, strips
+    # Rolls are cut in 10 cm steps.
+    roll_length = ceil(best_length * 10 - _EPS) / 10
+    return LayoutResult(
+        kind="roll",
+        area_m2=round(area, 2),
+        material_m2=round(roll_length * roll_width, 2),
+        pieces=best_strips,
+        description=f"рулон {roll_width:g} м: полос {best_strips}, {roll_length:.1f} пог. м",
+    )
+
+
+@lru_cache(maxsize=512)
+def tile_layout(rects: tuple[Rect, ...], tile_size: float) -> LayoutResult:
+    """Grid layout for square tiles; edge cuts of all rectangles share tiles first-fit."""
+
+    area = sum(rect.area_m2 for rect in rects)
+    full_tiles = 0
+    cut_widths: list[tuple[float, int]] = []
+    for rect in rects:
+        full_x, rest_x = _split(rect.width_m, tile_size)
+        full_y, rest_y = _split(rect.length_m, tile_size)
+        full_tiles += full_x * full_y
+        if rest_x:
+            cut_widths.append((rest_x, full_y + (1 if rest_y else 0)))
+        if rest_y:
+            cut_widths.append((rest_y, full_x))
+
+    cut_tiles = _pack_widths(cut_widths, tile_size)
+    tiles = full_tiles + cut_tiles
+    return LayoutResult(
+        kind="tile",
+        area_m2=round(area, 2),
+        material_m2=round(tiles * tile_size * tile_size, 2),
+        pieces=tiles,
+        description=f"плитка {tile_size:g}×{tile_size:g} м: {tiles} шт. ({cut_tiles} на подрезку)",
+    )
+
+
+def _roll_length(
+    rects: tuple[Rect, ...],
+    flips: tuple[bool, ...],
+    roll_width: float,
+    trim_m: float,
+) -> tuple[float, int]:
+    length = 0.0
+    strips = 0
+    pieces: list[tuple[float, float]] = []
+    for rect, flip in zip(rects, flips):
+        across, along = (rect.length_m, rect.width_m) if flip else (rect.width_m, rect.length_m)
+        full, rest = _split(across, roll_width)
+        strip_length = along + trim_m
+        length += full * strip_length
+        strips += full
+        if rest:
+            pieces.append((rest, strip_length))
+
+    # Offcuts are (width, length) leftovers of strips cut for narrower pieces.
+    offcuts: list[tuple[float, float]] = []
+    for width, piece_length in sorted(pieces, reverse=True):
+        fit = None
+        for index, (off_width, off_length) in enumerate(offcuts):
+            if off_width + _EPS >= width and off_length + _EPS >= piece_length:
+                if fit is None or off_width * off_length < offcuts[fit][0] * offcuts[fit][1]:
+                    fit = index
+        if fit is None:
+            length += piece_length
+            strips += 1
+            offcuts.append((roll_width - width, piece_length))
+            continue
+        off_width, off_length = offcuts.pop(fit)
+        if off_width - width > _EPS:
+            offcuts.append((off_width - width, off_length))
+    return length, strips
+
+
+def _split(extent: float, module: float) -> tuple[int, float]:
+    full = floor(extent / module + _EPS)
+    rest = round(extent - full * module, 4)
+    return full, rest if rest > _EPS else 0.0
+
+
+def _pack_widths(cuts: list[tuple[float, int]], tile_size: float) -> int:
+    """First-fit-decreasing packing of cut strips (width × count) into whole tiles."""
+
+    remaining: list[float] = []
+    for width, count in sorted(cuts, reverse=True):
+        for index, free in enumerate(remaining):
+            if count <= 0:
+                break
+            fits = int((free + _EPS) // width)
+            if fits:
+                used = min(fits, count)
+                remaining[index] = free - used * width
+                count -= used
+        if count <= 0:
+            continue
+        per_tile = max(1, int((tile_size + _EPS) // width))
+        new_tiles = ceil(count / per_tile)
+        remaining.extend([tile_size] * new_tiles)
+        # The last new tile may be only partially used.
+        for index in range(len(remaining) - new_tiles, len(remaining)):
+            used = min(per_tile, count)
+            remaining[index] = tile_size - used * width
+            count -= used
+    return len(remaining)
+
+
+__all__ = [
+    "Rect",
+    "LayoutResult",
+    "LAYOUT_DEFAULTS",
+    "parse_room_plan",
+    "MAX_ROOM_RECTS",
+    "RoomPlanTooLargeError",
+    "layout_settings",
+    "layout_for_product",
+    "order_total",
+    "roll_layout",
+    "tile_layout",
+]
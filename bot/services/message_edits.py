@@ -0,0 +1,128 @@
+"""Render prompts into an existing bot message with as few Bot API calls as possible."""
+
+from __future__ import annotations
+
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import InaccessibleMessage, InlineKeyboardMarkup, Message
+
+from .metrics import PROMPT_RENDERS, registry
+
+# Telegram only deletes messages younger than 48 hours; editing has no such limit.
+DELETE_WINDOW = timedelta(hours=48)
+
+EDITED = "edited"
+UNCHANGED = "unchanged"
+SENT = "sent"
+FALLBACK = "fallback"
+
+Rendered = tuple[str, InlineKeyboardMarkup | None]
+
+
+class EditTracker:
+    """Remember what was last rendered into each message and edit only on change.
+
+    A prompt edit used to be ``editMessageText`` and, on any error, a
+    ``deleteMessage`` plus ``sendMessage``. Now an edit that would not change
+    the message is skipped, messages that cannot be edited (no text, sent by
+    someone else or inaccessible) get a new message straight away, and a
+    "message is not modified" reply is taken as success. When an edit fails,
+    a message older than :data:`DELETE_WINDOW` is left in place rather than
+    deleted. The last ``max_entries`` renders are kept, keyed by
+    ``(chat_id, message_id)``; :attr:`stats` counts outcomes.
+    """
+
+    def __init__(self, max_entries: int = 10_000) -> None:
+        self.max_entries = max_entries
+        self.stats: Counter[str] = Counter()
+        self._rendered: OrderedDict[tuple[int, int], Rendered] = OrderedDict()
+
+    async def render(
+        self,
+        message: Message | InaccessibleMessage,
+        text: str,
+        keyboard: InlineKeyboardMarkup | None,
+    ) -> str:
+        """Show ``text`` and ``keyboard`` in ``message``; returns the outcome."""
+
+        if not isinstance(message, Message) or not self._editable(message):
+            await self._send(message, text, keyboard)
+            return self._count(SENT)
+        if self._is_current(message, text, keyboard):
+            return self._count(UNCHANGED)
+
+        try:
+            await message.edit_text(text, reply_markup=keyboard)
+        except TelegramBadRequest as error:
+            if "message is not modified" in error.message:
+                self._remember(message.chat.id, message.message_id, text, keyboard)
+                return self._count(UNCHANGED)
+            if datetime.now(timezone.utc) - message.date < DELETE_WINDOW:
+                try:
+                    await message.delete()
+                except TelegramBadRequest:
+                    pass
+            self._forget(message)
+            await self._send(message, text, keyboard)
+            return self._count(FALLBACK)
+        self._remember(message.chat.id, message.message_id, text, keyboard)
+        return self._count(EDITED)
+
+    def clear(self) -> None:
+        self._rendered.clear()
+
+    def __len__(self) -> int:
+        return len(self._rendered)
+
+    # Internals ---------------------------------------------------------------------
+
+    @staticmethod
+    def _editable(message: Message) -> bool:
+        if message.text is None:
+            return False
+        return message.from_user is None or message.from_user.is_bot
+
+    def _is_current(
+        self, message: Message, text: str, keyboard: InlineKeyboardMarkup | None
+    ) -> bool:
+        last = self._rendered.get((message.chat.id, message.message_id))
+        if last is not None:
+            # Cached keyboards are shared instances, so this is usually an identity check.
+            return last[0] == text and last[1] == keyboard
+        # Unknown message (e.g. after a restart): compare with what the update carries.
+        return message.reply_markup == keyboard and message.html_text == text
+
+    async def _send(
+        self,
+        message: Message | InaccessibleMessage,
+        text: str,
+        keyboard: InlineKeyboardMarkup | None,
+    ) -> None:
+        sent = await message.answer(text, reply_markup=keyboard)
+        if isinstance(sent, Message):
+            self._remember(sent.chat.id, sent.message_id, text, keyboard)
+
+    def _remember(
+        self, chat_id: int, message_id: int, text: str, keyboard: InlineKeyboardMarkup | None
+    ) -> None:
+        key = (chat_id, message_id)
+        self._rendered[key] = (text, keyboard)
+        self._rendered.move_to_end(key)
+        if len(self._rendered) > self.max_entries:
+            self._rendered.popitem(last=False)
+
+    def _forget(self, message: Message) -> None:
+        self._rendered.pop((message.chat.id, message.message_id), None)
+
+    def _count(self, outcome: str) -> str:
+        self.stats[outcome] += 1
+        if registry.enabled:
+            registry.counter(
+                PROMPT_RENDERS, "Prompt renders by outcome: edited, unchanged, sent, fallback"
+            ).inc(outcome=outcome)
+        return outcome
+
+
+__all__ = ["DELETE_WINDOW", "EDITED", "EditTracker", "FALLBACK", "SENT", "UNCHANGED"]
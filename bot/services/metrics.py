@@ -0,0 +1,342 @@
+"""In-process metrics registry with a Prometheus text endpoint."""
+
+from __future__ import annotations
+
+import logging
+from bisect import bisect_left
+from functools import wraps
+from time import perf_counter
+from typing import Any, Callable, Iterable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+def _label_key(labels: dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Iterable[tuple[str, str]] = ()) -> str:
+    pairs = [*key, *extra]
+    if not pairs:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(
+            name,
+            value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+        )
+        for name, value in pairs
+    )
+    return "{" + body + "}"
+
+
+class Counter:
+    """Monotonic counter split by labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help = help_text
+        self._values: dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = _label_key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def render(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(key)} {value:g}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Gauge:
+    """Current value split by labels; a label set may be backed by a callback read on render."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help = help_text
+        self._values: dict[LabelKey, float] = {}
+        self._functions: dict[LabelKey, Callable[[], float]] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        self._values[_label_key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = _label_key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def track(self, func: Callable[[], float], **labels: Any) -> None:
+        """Report ``func()`` for this label set at every scrape."""
+
+        self._functions[_label_key(labels)] = func
+
+    def value(self, **labels: Any) -> float:
+        key = _label_key(labels)
+        func = self._functions.get(key)
+        return func() if func is not None else self._values.get(key, 0.0)
+
+    def render(self) -> list[str]:
+        values = dict(self._values)
+        values.update((key, func()) for key, func in self._functions.items())
+        return [
+            f"{self.name}{_format_labels(key)} {value:g}" for key, value in sorted(values.items())
+        ]
+
+
+class Histogram:
+    """Cumulative-bucket histogram split by labels."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: per-bucket (non-cumulative) counts + overflow, sum, count.
+        self._series: dict[LabelKey, list[Any]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def count(self, **labels: Any) -> int:
+        series = self._series.get(_label_key(labels))
+        return series[2] if series else 0
+
+    def render(self) -> list[str]:
+        lines: list[str] = []
+        for key, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', le)])} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {total:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics; recording is a no-op until :meth:`enable` is called.
+
+    Every hot-path helper checks :attr:`enabled` first, so a disabled registry
+    costs one attribute lookup per call.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._metrics: dict[str, Counter | Gauge | Histogram] = {}
+
+    def enable(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+
+    def counter(self, name: str, help_text: str = "") -> Counter:
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = Counter(name, help_text)
+        if not isinstance(metric, Counter):
+            raise TypeError(f"{name} is registered as a {metric.kind}, not a counter")
+        return metric
+
+    def gauge(self, name: str, help_text: str = "") -> Gauge:
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = Gauge(name, help_text)
+        if not isinstance(metric, Gauge):
+            raise TypeError(f"{name} is registered as a {metric.kind}, not a gauge")
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str = "",
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = Histogram(name, help_text, buckets)
+        if not isinstance(metric, Histogram):
+            raise TypeError(f"{name} is registered as a {metric.kind}, not a histogram")
+        return metric
+
+    def reset(self) -> None:
+        self._metrics.clear()
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+
+        lines: list[str] = []
+        for name in sorted(self._metrics):
+            metric = self._metrics[name]
+            if metric.help:
+                lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HANDLER_DURATION = "bot_handler_duration_seconds"
+HANDLER_ERRORS = "bot_handler_errors_total"
+THROTTLED = "bot_throttled_total"
+SERVICE_DURATION = "bot_service_call_duration_seconds"
+SERVICE_ERRORS = "bot_service_call_errors_total"
+INGEST_DEPTH = "bot_ingest_queue_depth"
+INGEST_OLDEST_AGE = "bot_ingest_oldest_age_seconds"
+INGEST_WAIT = "bot_ingest_wait_seconds"
+INGEST_SHED = "bot_ingest_shed_total"
+WEBHOOK_INLINED = "bot_webhook_inlined_total"
+WEBHOOK_INLINE_FALLBACK = "bot_webhook_inline_fallback_total"
+USER_QUEUE_LENGTH = "bot_user_queue_length"
+USER_QUEUE_WAIT = "bot_user_queue_wait_seconds"
+USER_QUEUES_ACTIVE = "bot_user_queues_active"
+USER_QUEUE_MAX = "bot_user_queue_max_length"
+PROMPT_RENDERS = "bot_prompt_renders_total"
+
+
+def observe_service(service: str, method: str, started: float, failed: bool = False) -> None:
+    registry.histogram(SERVICE_DURATION, "Latency of service and port calls").observe(
+        perf_counter() - started,
+        service=service,
+        method=method,
+    )
+    if failed:
+        registry.counter(SERVICE_ERRORS, "Failed service and port calls").inc(
+            service=service,
+            method=method,
+        )
+
+
+def timed(service: str, method: str | None = None) -> Callable[[F], F]:
+    """Decorate a function so its calls are timed while metrics are enabled."""
+
+    def decorator(func: F) -> F:
+        name = method or func.__name__
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not registry.enabled:
+                return func(*args, **kwargs)
+            started = perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                observe_service(service, name, started, failed=True)
+                raise
+            observe_service(service, name, started)
+            return result
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+class TimedProxy:
+    """Wrap an object (e.g. an inventory or pricing port) so every method call is timed.
+
+    Only installed when metrics are enabled; attribute access falls through
+    to the wrapped object, and wrapped methods are cached on first use.
+    """
+
+    def __init__(self, target: Any, service: str) -> None:
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_service", service)
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._target, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+        wrapped = timed(self._service, name)(attr)
+        object.__setattr__(self, name, wrapped)
+        return wrapped
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._target, name, value)
+
+
+async def start_metrics_server(host: str, port: int) -> Any:
+    """Serve ``GET /metrics`` on ``host:port``; returns the aiohttp runner to clean up."""
+
+    from aiohttp import web
+
+    async def handle(_: web.Request) -> web.Response:
+        return web.Response(
+            text=registry.render(),
+            content_type="text/plain",
+            charset="utf-8",
+            headers={"X-Content-Type-Options": "nosniff"},
+        )
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info("Metrics endpoint listening on http://%s:%s/metrics", host, port)
+    return runner
+
+
+__all__ = [
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsRegistry",
+    "TimedProxy",
+    "registry",
+    "timed",
+    "observe_service",
+    "start_metrics_server",
+    "HANDLER_DURATION",
+    "HANDLER_ERRORS",
+    "THROTTLED",
+    "SERVICE_DURATION",
+    "SERVICE_ERRORS",
+    "INGEST_DEPTH",
+    "INGEST_OLDEST_AGE",
+    "INGEST_WAIT",
+    "INGEST_SHED",
+    "WEBHOOK_INLINED",
+    "WEBHOOK_INLINE_FALLBACK",
+    "USER_QUEUE_LENGTH",
+    "USER_QUEUE_WAIT",
+    "USER_QUEUES_ACTIVE",
+    "USER_QUEUE_MAX",
+    "PROMPT_RENDERS",
+]
@@ -0,0 +1,251 @@
+"""Pack/roll size optimisation for multi-room orders."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache, reduce
+from math import ceil, gcd
+from typing import Iterable, Literal, Sequence
+
+from ..utils.formatting import calc_required
+from .inventory_port import Product
+
+Objective = Literal["cost", "waste"]
+
+# Above this many DP states the requirement is pre-filled with the most
+# efficient pack so the inline solve stays within a few milliseconds.
+MAX_STATES = 4000
+
+
+@dataclass(slots=True, frozen=True)
+class Room:
+    """Room to cover: net area and cutting allowance."""
+
+    area_m2: float
+    waste_pct: int = 0
+
+    @property
+    def required_m2(self) -> float:
+        return self.area_m2 * (1 + max(self.waste_pct, 0) / 100) if self.area_m2 > 0 else 0.0
+
+
+@dataclass(slots=True, frozen=True)
+class PackSize:
+    """Available pack or roll size; ``available`` limits how many can be ordered."""
+
+    size_m2: float
+    price: float | None = None
+    available: int | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class PackPlan:
+    """Chosen combination of packs."""
+
+    counts: tuple[tuple[float, int], ...]
+    required_m2: float
+    total_m2: float
+    cost: float | None
+
+    @property
+    def overshoot_m2(self) -> float:
+        return round(self.total_m2 - self.required_m2, 2)
+
+    @property
+    def packs(self) -> int:
+        return sum(count for _, count in self.counts)
+
+    def describe(self) -> str:
+        return " + ".join(f"{count} × {size:g} м²" for size, count in self.counts)
+
+
+def optimize_packs(
+    rooms: Iterable[Room],
+    pack_sizes: Iterable[PackSize],
+    objective: Objective = "cost",
+) -> PackPlan | None:
+    """Return the cheapest (or least-overshoot) pack combination covering all rooms.
+
+    Material is pooled across rooms. Returns ``None`` when the available packs
+    cannot cover the requirement. ``objective="cost"`` falls back to ``"waste"``
+    when any pack has no price. Results are cached by inputs.
+    """
+
+    rooms_key = tuple(room for room in rooms if room.area_m2 > 0)
+    sizes_key = tuple(
+        sorted(
+            (pack for pack in pack_sizes if pack.size_m2 > 0),
+            key=lambda pack: (pack.size_m2, pack.price or 0.0, pack.available or 0),
+        )
+    )
+    if objective == "cost" and any(pack.price is None for pack in sizes_key):
+        objective = "waste"
+    return _solve(rooms_key, sizes_key, objective)
+
+
+def plan_for_product(
+    product: Product,
+    rooms: Sequence[Room],
+    unit_price: float | None = None,
+) -> tuple[float, PackPlan | None]:
+    """Return total m² to order for ``product`` and the pack plan if it has several sizes.
+
+    Products with a single pack step keep using :func:`calc_required` on the
+    pooled requirement; pack prices are derived from the per-m² price.
+    """
+
+    sizes = sorted(set(product.pack_sizes_m2))
+    if len(sizes) < 2:
+        required = sum(room.required_m2 for room in rooms)
+        return calc_required(required, 0, product.pack_step_m2), None
+
+    packs = [
+        PackSize(size_m2=size, price=unit_price * size if unit_price is not None else None)
+        for size in sizes
+    ]
+    plan = optimize_packs(rooms, packs)
+    if plan is None:
+        # No exact plan: round the pooled requirement up to whole packs as before.
+        required = sum(room.required_m2 for room in rooms)
+        return calc_required(required, 0, product.pack_step_m2 or max(sizes)), None
+    return plan.total_m2, plan
+
+
+# state[t] = (primary, secondary, counts) for an exact fill of t units.
+_State = tuple[float, float, tuple[int, ...]]
+
+
+@lru_cache(maxsize=1024)
+def _solve(
+    rooms: tuple[Room, ...],
+    packs: tuple[PackSize, ...],
+    objective: Objective,
+) -> PackPlan | None:
+    required = round(sum(room.required_m2 for room in rooms), 6)
+    if required <= 0:
+        return PackPlan(counts=(), required_m2=0.0, total_m2=0.0, cost=0.0 if packs else None)
+    if not packs:
+        return None
+
+    # Work in integer units of the greatest common divisor of all sizes (in 0.01 m²).
+    cents = [max(1, round(pack.size_m2 * 100)) for pack in packs]
+    unit = reduce(gcd, cents)
+    sizes = [value // unit for value in cents]
+    prices = [pack.price or 0.0 for pack in packs]
+    target = ceil(round(required * 100 / unit, 6))
+    limits = [
+        pack.available if pack.available is not None else target // size + 1
+        for pack, size in zip(packs, sizes, strict=True)
+    ]
+    prefill, target = _prefill(sizes, prices, limits, target, objective)
+
+    # Any optimal cover stays below target + largest pack: dropping a pack would still cover.
+    horizon = max(target, 0) + max(sizes) - 1
+    state = _fill(sizes, prices, limits, horizon, objective)
+    best_total = _best_total(state, target, objective)
+    if best_total is None:
+        return None
+
+    counts = [a + b for a, b in zip(state[best_total][2], prefill, strict=True)]
+    chosen = tuple(
+        (pack.size_m2, count)
+        for pack, count in sorted(
+            zip(packs, counts, strict=True), key=lambda item: -item[0].size_m2
+        )
+        if count
+    )
+    total_m2 = round(sum(size * count for size, count in chosen), 2)
+    cost = None
+    if all(pack.price is not None for pack in packs):
+        cost = round(
+            sum((pack.price or 0.0) * count for pack, count in zip(packs, counts, strict=True)), 2
+        )
+    return PackPlan(counts=chosen, required_m2=round(required, 2), total_m2=total_m2, cost=cost)
+
+
+def _prefill(
+    sizes: list[int],
+    prices: list[float],
+    limits: list[int],
+    target: int,
+    objective: Objective,
+) -> tuple[list[int], int]:
+    """Cover most of a large target with the most efficient pack; updates ``limits``."""
+
+    prefill = [0] * len(sizes)
+    if target <= MAX_STATES:
+        return prefill, target
+    best = min(
+        range(len(sizes)),
+        key=lambda i: (prices[i] / sizes[i], -sizes[i]) if objective == "cost" else -sizes[i],
+    )
+    count = min(limits[best], (target - MAX_STATES // 2) // sizes[best])
+    prefill[best] = count
+    limits[best] -= count
+    return prefill, target - count * sizes[best]
+
+
+def _fill(
+    sizes: list[int],
+    prices: list[float],
+    limits: list[int],
+    horizon: int,
+    objective: Objective,
+) -> list[_State | None]:
+    """Best way to fill exactly ``t`` units, for every ``t`` up to ``horizon``."""
+
+    state: list[_State | None] = [None] * (horizon + 1)
+    state[0] = (0.0, 0.0, tuple([0] * len(sizes)))
+    for index, (size, price, limit) in enumerate(zip(sizes, prices, limits, strict=True)):
+        # Binary splitting turns the bounded item into O(log limit) 0/1 items.
+        chunk = 1
+        remaining = limit
+        while remaining > 0:
+            take = min(chunk, remaining)
+            remaining -= take
+            chunk *= 2
+            if take * size <= horizon:
+                _add_chunk(state, index, take, take * size, take * price, objective)
+    return state
+
+
+def _add_chunk(
+    state: list[_State | None],
+    index: int,
+    take: int,
+    weight: int,
+    added_cost: float,
+    objective: Objective,
+) -> None:
+    for total in range(len(state) - 1, weight - 1, -1):
+        previous = state[total - weight]
+        if previous is None:
+            continue
+        counts = list(previous[2])
+        counts[index] += take
+        packs_used = previous[0 if objective == "waste" else 1] + take
+        cost = previous[1 if objective == "waste" else 0] + added_cost
+        candidate = (
+            (packs_used, cost, tuple(counts))
+            if objective == "waste"
+            else (cost, packs_used, tuple(counts))
+        )
+        current = state[total]
+        if current is None or candidate[:2] < current[:2]:
+            state[total] = candidate
+
+
+def _best_total(state: list[_State | None], target: int, objective: Objective) -> int | None:
+    best_total: int | None = None
+    best_key: tuple[float, ...] | None = None
+    for total in range(max(target, 0), len(state)):
+        entry = state[total]
+        if entry is None:
+            continue
+        key = (total, entry[0], entry[1]) if objective == "waste" else (entry[0], total, entry[1])
+        if best_key is None or key < best_key:
+            best_key, best_total = key, total
+    return best_total
+
+
+__all__ = ["Room", "PackSize", "PackPlan", "optimize_packs", "plan_for_product"]
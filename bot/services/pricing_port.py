@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
 from datetime import date
-from typing import Protocol
+from typing import Iterable, Protocol, Sequence
 
 from pydantic import BaseModel, Field
 
@@ -16,6 +18,44 @@ class Promo(BaseModel):
     description: str
     valid_until: date | None = None
     skus: list[str] = Field(default_factory=list)
+    discount_pct: float | None = None
+    min_m2: float | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class PriceIndex:
+    """SKUs of one category sorted by price for range queries with bisection."""
+
+    category: str
+    prices: tuple[float, ...] = ()
+    skus: tuple[str, ...] = ()
+
+    @classmethod
+    def build(cls, category: str, prices: dict[str, float | None]) -> "PriceIndex":
+        pairs = sorted((value, sku) for sku, value in prices.items() if value is not None)
+        return cls(
+            category=category,
+            prices=tuple(value for value, _ in pairs),
+            skus=tuple(sku for _, sku in pairs),
+        )
+
+    def under(self, max_price: float) -> list[str]:
+        """Return SKUs priced at or below ``max_price``, cheapest first."""
+
+        return list(self.skus[: bisect_right(self.prices, max_price)])
+
+    def between(self, min_price: float, max_price: float) -> list[str]:
+        """Return SKUs priced within ``[min_price, max_price]``, cheapest first."""
+
+        start = bisect_left(self.prices, min_price)
+        end = bisect_right(self.prices, max_price)
+        return list(self.skus[start:end])
+
+    def count_under(self, max_price: float) -> int:
+        return bisect_right(self.prices, max_price)
+
+    def cheapest(self) -> float | None:
+        return self.prices[0] if self.prices else None
 
 
 class PricingPort(Protocol):
@@ -24,9 +64,18 @@ class PricingPort(Protocol):
     def price(self, sku: str) -> float | None:
         """Return price for the requested SKU if available."""
 
-    def promos(self) -> list[Promo]:
+    def price_many(self, skus: Iterable[str]) -> dict[str, float | None]:
+        """Return prices for several SKUs in one call (one round trip for remote sources)."""
+
+    def price_index(self, category: str, skus: Sequence[str]) -> PriceIndex:
+        """Return a price-sorted index over the given SKUs of a category."""
+
+    def promos(self) -> Sequence[Promo]:
         """Return active promo entries."""
 
+    def promos_for(self, skus: Iterable[str]) -> dict[str, list[Promo]]:
+        """Return active promos keyed by SKU (SKUs without promos are omitted)."""
+
 
-__all__ = ["PricingPort", "Promo"]
+__all__ = ["PricingPort", "PriceIndex", "Promo"]
 
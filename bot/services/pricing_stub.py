@@ -5,9 +5,10 @@ from __future__ import annotations
 import json
 from datetime import date, datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Sequence
 
-from .pricing_port import PricingPort, Promo
+from .pricing_port import PriceIndex, PricingPort, Promo
+from .promo_index import PromoIndex
 
 
 class PricingStub(PricingPort):
@@ -16,21 +17,22 @@ class PricingStub(PricingPort):
     def __init__(self, data_path: Path | None = None):
         self.data_path = data_path
         self._price_map: dict[str, float] = {}
-        self._promos: list[Promo] = []
+        self._promos = PromoIndex()
+        self._indexes: dict[str, tuple[int, PriceIndex]] = {}
         self.reload()
 
     def reload(self) -> None:
         """Reload stub data from disk or fall back to defaults."""
 
         self._price_map.clear()
-        self._promos.clear()
+        self._indexes.clear()
 
         if self.data_path and self.data_path.exists():
             content = json.loads(self.data_path.read_text(encoding="utf-8"))
             prices = content.get("prices", {})
             promos = content.get("promos", [])
             self._price_map.update({sku: float(value) for sku, value in prices.items()})
-            self._promos.extend(self._parse_promos(promos))
+            self._promos.replace(self._parse_promos(promos))
             return
 
         # Default demo data -------------------------------------------------------
@@ -42,31 +44,52 @@ class PricingStub(PricingPort):
             "LN-TK-201": 890.0,
             "LVT-FF-301": 1620.0,
         }
-        self._promos = [
-            Promo(
-                code="WELCOME-2025",
-                title="-5% при заказе ковровой плитки от 100 м²",
-                description="Скидка распространяется на серии RusCarpetTiles. "
-                "Действует для дизайнеров и корпоративных клиентов.",
-                valid_until=date(date.today().year, 12, 31),
-                skus=["CT-RCT-101", "CT-RCT-104"],
-            ),
-            Promo(
-                code="SAMPLE-PACK",
-                title="Комплект образцов FineFloor",
-                description="При заказе покрытия FineFloor отправим набор образцов бесплатно.",
-                valid_until=None,
-                skus=["LVT-FF-301"],
-            ),
-        ]
+        self._promos.replace(
+            [
+                Promo(
+                    code="WELCOME-2025",
+                    title="-5% при заказе ковровой плитки от 100 м²",
+                    description="Скидка распространяется на серии RusCarpetTiles. "
+                    "Действует для дизайнеров и корпоративных клиентов.",
+                    valid_until=date(date.today().year, 12, 31),
+                    skus=["CT-RCT-101", "CT-RCT-104"],
+                    discount_pct=5.0,
+                    min_m2=100.0,
+                ),
+                Promo(
+                    code="SAMPLE-PACK",
+                    title="Комплект образцов FineFloor",
+                    description="При заказе покрытия FineFloor отправим набор образцов бесплатно.",
+                    valid_until=None,
+                    skus=["LVT-FF-301"],
+                ),
+            ]
+        )
 
     # PricingPort implementation ----------------------------------------------------
 
     def price(self, sku: str) -> float | None:
         return self._price_map.get(sku)
 
-    def promos(self) -> list[Promo]:
-        return list(self._promos)
+    def price_many(self, skus: Iterable[str]) -> dict[str, float | None]:
+        get = self._price_map.get
+        return {sku: get(sku) for sku in skus}
+
+    def price_index(self, category: str, skus: Sequence[str]) -> PriceIndex:
+        # Cached per category; rebuilt when the SKU set or the price data changes.
+        fingerprint = hash(tuple(skus))
+        cached = self._indexes.get(category)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        index = PriceIndex.build(category, self.price_many(skus))
+        self._indexes[category] = (fingerprint, index)
+        return index
+
+    def promos(self) -> Sequence[Promo]:
+        return self._promos.active()
+
+    def promos_for(self, skus: Iterable[str]) -> dict[str, list[Promo]]:
+        return self._promos.promos_for(skus)
 
     # Helpers -----------------------------------------------------------------------
 
@@ -87,6 +110,8 @@ class PricingStub(PricingPort):
                     description=item.get("description", ""),
                     valid_until=valid_until,
                     skus=list(item.get("skus", [])),
+                    discount_pct=item.get("discount_pct"),
+                    min_m2=item.get("min_m2"),
                 )
             )
         return parsed
@@ -0,0 +1,176 @@
+"""On-demand CPU sampling and allocation profiling inside the running bot."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, field
+from types import FrameType
+
+MAX_DURATION_S = 120.0
+DEFAULT_INTERVAL_S = 0.005
+_MAX_DEPTH = 128
+
+
+@dataclass(slots=True)
+class ProfileReport:
+    """Outcome of a profiling session."""
+
+    duration_s: float
+    samples: int = 0
+    collapsed: str = ""
+    allocations: list[str] = field(default_factory=list)
+    growth: list[str] = field(default_factory=list)
+
+    def allocations_text(self) -> str:
+        rows = ["Top allocations (live, by size):", *self.allocations]
+        if self.growth:
+            rows += ["", "Top growth during the session:", *self.growth]
+        return "\n".join(rows) + "\n"
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profiling session is already running."""
+
+
+class SamplingProfiler:
+    """Sample the stacks of all Python threads from a background thread.
+
+    Produces "collapsed" stacks (``thread;outer;...;inner count``) that
+    flamegraph.pl, speedscope and inferno read directly. The event loop keeps
+    serving updates while sampling, so FSM and selection state stay intact.
+    """
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL_S) -> None:
+        self.interval = interval
+        self.samples = 0
+        self._stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> str:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return self.collapsed()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = _collapse(frame)
+                if stack:
+                    self._stacks[f"{names.get(ident, ident)};{stack}"] += 1
+            self.samples += 1
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    filename = os.path.basename(code.co_filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+def _collapse(frame: FrameType | None) -> str:
+    labels: list[str] = []
+    while frame is not None and len(labels) < _MAX_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+_lock = asyncio.Lock()
+
+
+def is_running() -> bool:
+    return _lock.locked()
+
+
+async def run_profile(
+    seconds: float,
+    cpu: bool = True,
+    memory: bool = False,
+    top: int = 25,
+    interval: float = DEFAULT_INTERVAL_S,
+) -> ProfileReport:
+    """Profile the running process for ``seconds`` without blocking the event loop.
+
+    Raises :class:`ProfilerBusyError` if another session is active.
+    """
+
+    if _lock.locked():
+        raise ProfilerBusyError("profiling session already running")
+
+    async with _lock:
+        seconds = min(max(seconds, 1.0), MAX_DURATION_S)
+        report = ProfileReport(duration_s=seconds)
+        profiler = SamplingProfiler(interval) if cpu else None
+
+        started_tracing = False
+        baseline = None
+        if memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(10)
+                started_tracing = True
+            baseline = tracemalloc.take_snapshot()
+
+        if profiler is not None:
+            profiler.start()
+        started = time.monotonic()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            report.duration_s = round(time.monotonic() - started, 2)
+            if profiler is not None:
+                report.collapsed = profiler.stop()
+                report.samples = profiler.samples
+            if memory:
+                snapshot = tracemalloc.take_snapshot()
+                if started_tracing:
+                    tracemalloc.stop()
+                report.allocations, report.growth = _allocation_tables(snapshot, baseline, top)
+        return report
+
+
+def _allocation_tables(
+    snapshot: tracemalloc.Snapshot,
+    baseline: tracemalloc.Snapshot | None,
+    top: int,
+) -> tuple[list[str], list[str]]:
+    ignore = (
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    )
+    snapshot = snapshot.filter_traces(ignore)
+    allocations = [str(stat) for stat in snapshot.statistics("lineno")[:top]]
+    growth: list[str] = []
+    if baseline is not None:
+        diff = snapshot.compare_to(baseline.filter_traces(ignore), "lineno")
+        growth = [str(stat) for stat in diff[:top] if stat.size_diff > 0]
+    return allocations, growth
+
+
+__all__ = [
+    "ProfileReport",
+    "ProfilerBusyError",
+    "SamplingProfiler",
+    "run_profile",
+    "is_running",
+    "MAX_DURATION_S",
+]
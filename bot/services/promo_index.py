@@ -0,0 +1,115 @@
+"""Reverse SKU → promo index with expiry-aware scheduling."""
+
+from __future__ import annotations
+
+import heapq
+from datetime import date
+from typing import Callable, Iterable
+
+from .pricing_port import Promo
+
+
+class PromoIndex:
+    """Keep active promos indexed by SKU and drop them once ``valid_until`` passes.
+
+    Expiry dates live in a min-heap, so each query only compares the earliest
+    expiry with today's date; promos are removed lazily the first time they are
+    looked up after their last valid day. Promos without SKUs apply to the whole
+    assortment and are only listed by :meth:`active`.
+    """
+
+    def __init__(
+        self,
+        promos: Iterable[Promo] = (),
+        today: Callable[[], date] = date.today,
+    ) -> None:
+        self._today = today
+        self._by_code: dict[str, Promo] = {}
+        self._by_sku: dict[str, list[Promo]] = {}
+        self._expiry: list[tuple[date, int, str]] = []
+        self._sequence = 0
+        self._active: tuple[Promo, ...] | None = None
+        self.replace(promos)
+
+    # Mutation ----------------------------------------------------------------------
+
+    def replace(self, promos: Iterable[Promo]) -> None:
+        """Rebuild the index from scratch."""
+
+        self._by_code.clear()
+        self._by_sku.clear()
+        self._expiry.clear()
+        self._active = None
+        for promo in promos:
+            self.add(promo)
+
+    def add(self, promo: Promo) -> None:
+        """Insert or replace a promo (matched by code)."""
+
+        if promo.code in self._by_code:
+            self.remove(promo.code)
+        if promo.valid_until is not None and promo.valid_until < self._today():
+            return
+
+        self._by_code[promo.code] = promo
+        for sku in promo.skus:
+            self._by_sku.setdefault(sku, []).append(promo)
+        if promo.valid_until is not None:
+            self._sequence += 1
+            heapq.heappush(self._expiry, (promo.valid_until, self._sequence, promo.code))
+        self._active = None
+
+    def remove(self, code: str) -> Promo | None:
+        """Remove a promo by code; stale heap entries are skipped on expiry."""
+
+        promo = self._by_code.pop(code, None)
+        if promo is None:
+            return None
+        for sku in promo.skus:
+            bucket = self._by_sku.get(sku)
+            if not bucket:
+                continue
+            bucket[:] = [item for item in bucket if item.code != code]
+            if not bucket:
+                del self._by_sku[sku]
+        self._active = None
+        return promo
+
+    def expire(self, today: date | None = None) -> list[Promo]:
+        """Drop promos whose last valid day is before ``today``; return the removed ones."""
+
+        current = today or self._today()
+        removed: list[Promo] = []
+        while self._expiry and self._expiry[0][0] < current:
+            valid_until, _, code = heapq.heappop(self._expiry)
+            promo = self._by_code.get(code)
+            # Skip entries left behind by remove()/add() of the same code.
+            if promo is None or promo.valid_until != valid_until:
+                continue
+            self.remove(code)
+            removed.append(promo)
+        return removed
+
+    # Queries -----------------------------------------------------------------------
+
+    def active(self) -> tuple[Promo, ...]:
+        """Return all active promos; the tuple is shared until the index changes."""
+
+        self.expire()
+        if self._active is None:
+            self._active = tuple(self._by_code.values())
+        return self._active
+
+    def promos_for(self, skus: Iterable[str]) -> dict[str, list[Promo]]:
+        """Return active promos for each SKU that has any."""
+
+        self.expire()
+        result: dict[str, list[Promo]] = {}
+        for sku in skus:
+            bucket = self._by_sku.get(sku)
+            if bucket:
+                result[sku] = list(bucket)
+        return result
+
+
+__all__ = ["PromoIndex"]
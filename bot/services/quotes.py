@@ -0,0 +1,242 @@
+"""Priced quotes (сметы) for user selections."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date
+from math import ceil
+from typing import Iterable, Sequence
+
+from .export import SelectionLine
+from .pricing_port import PricingPort, Promo
+from .selection_store import SelectionStore
+
+# (minimum total m² across the selection, discount %) — the best matching tier applies.
+DEFAULT_VOLUME_TIERS: tuple[tuple[float, float], ...] = (
+    (100.0, 3.0),
+    (300.0, 5.0),
+    (1000.0, 8.0),
+)
+
+
+@dataclass(slots=True)
+class QuoteLine:
+    """Priced line of a quote."""
+
+    sku: str
+    name: str
+    category: str
+    brand: str
+    required_m2: float
+    billed_m2: float
+    packs: int | None
+    pack_step: float | None
+    unit_price: float | None
+    discount_pct: float = 0.0
+    promo_codes: list[str] = field(default_factory=list)
+    amount: float | None = None
+
+
+@dataclass(slots=True)
+class Quote:
+    """Priced draft for a whole selection."""
+
+    lines: list[QuoteLine] = field(default_factory=list)
+    total_m2: float = 0.0
+    tier_discount_pct: float = 0.0
+    subtotal: float = 0.0
+    discount: float = 0.0
+    total: float = 0.0
+    version: int = 0
+
+    @property
+    def missing_prices(self) -> list[str]:
+        return [line.sku for line in self.lines if line.unit_price is None]
+
+    def as_text(self) -> str:
+        """Render a short plain-text summary for chat messages."""
+
+        if not self.lines:
+            return "Подборка пуста."
+
+        rows = ["Смета (черновик):"]
+        for line in self.lines:
+            packs = f", {line.packs} уп." if line.packs else ""
+            if line.amount is None:
+                rows.append(
+                    f"- {line.name} ({line.sku}): {line.billed_m2:.2f} м²{packs} — цена по запросу"
+                )
+                continue
+            discount = f", скидка {line.discount_pct:g}%" if line.discount_pct else ""
+            rows.append(
+                f"- {line.name} ({line.sku}): {line.billed_m2:.2f} м²{packs} × "
+                f"{format_money(line.unit_price)}{discount} = {format_money(line.amount)}"
+            )
+        rows.append(f"Итого: {self.total_m2:.2f} м², {format_money(self.total)}")
+        if self.discount:
+            rows.append(f"Скидка: {format_money(self.discount)}")
+        if self.missing_prices:
+            rows.append("Часть позиций без цены — менеджер уточнит.")
+        return "\n".join(rows)
+
+
+class QuoteEngine:
+    """Compute pack counts, prices, volume tiers and promos for a selection.
+
+    All SKUs of a selection are priced with one ``price_many`` and one
+    ``promos_for`` call. Results are cached per user and keyed by the
+    selection version, so repeated exports and manager requests reuse the
+    same quote until the selection changes. Quotes of the last
+    ``max_entries`` users are kept.
+    """
+
+    def __init__(
+        self,
+        pricing: PricingPort,
+        selection_store: SelectionStore,
+        volume_tiers: Sequence[tuple[float, float]] = DEFAULT_VOLUME_TIERS,
+        max_entries: int = 1024,
+    ) -> None:
+        self.pricing = pricing
+        self.selection_store = selection_store
+        self.volume_tiers = sorted(volume_tiers)
+        self.max_entries = max_entries
+        self._cache: OrderedDict[int, tuple[tuple[int, date], Quote]] = OrderedDict()
+
+    def quote(self, user_id: int) -> Quote:
+        """Return the (cached) quote for the user's current selection."""
+
+        version = self.selection_store.version(user_id)
+        # Promos expire by date, so the day is part of the cache key.
+        key = (version, date.today())
+        cached = self._cache.get(user_id)
+        if cached is not None and cached[0] == key:
+            self._cache.move_to_end(user_id)
+            return cached[1]
+
+        quote = self.quote_lines(self.selection_store.to_lines(user_id))
+        quote.version = version
+        self._cache[user_id] = (key, quote)
+        self._cache.move_to_end(user_id)
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return quote
+
+    def quote_sku(self, user_id: int, sku: str) -> Quote | None:
+        """The user's quote cut down to the ``sku`` line; ``None`` if it is not selected.
+
+        The line keeps the discount of the whole selection's volume tier, so it
+        matches the «Смета» sheet.
+        """
+
+        quote = self.quote(user_id)
+        lines = [line for line in quote.lines if line.sku == sku]
+        if not lines:
+            return None
+        part = Quote(
+            lines=lines,
+            total_m2=round(sum(line.required_m2 for line in lines), 2),
+            tier_discount_pct=quote.tier_discount_pct,
+            version=quote.version,
+        )
+        _add_totals(part)
+        return part
+
+    def quote_lines(self, items: Iterable[SelectionLine]) -> Quote:
+        """Price arbitrary selection lines without caching."""
+
+        items_list = list(items)
+        skus = [item.sku for item in items_list]
+        prices = self.pricing.price_many(skus)
+        promos = self.pricing.promos_for(skus)
+
+        quote = Quote()
+        quote.total_m2 = round(sum(item.total_m2 for item in items_list), 2)
+        quote.tier_discount_pct = self._tier_discount(quote.total_m2)
+
+        for item in items_list:
+            line = _price_line(
+                item,
+                prices.get(item.sku),
+                promos.get(item.sku, []),
+                quote.tier_discount_pct,
+            )
+            quote.lines.append(line)
+        _add_totals(quote)
+        return quote
+
+    def invalidate(self, user_id: int | None = None) -> None:
+        if user_id is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(user_id, None)
+
+    def _tier_discount(self, total_m2: float) -> float:
+        discount = 0.0
+        for threshold, pct in self.volume_tiers:
+            if total_m2 >= threshold:
+                discount = pct
+        return discount
+
+
+def _add_totals(quote: Quote) -> None:
+    subtotal = discount = 0.0
+    for line in quote.lines:
+        if line.amount is not None and line.unit_price is not None:
+            gross = line.billed_m2 * line.unit_price
+            subtotal += gross
+            discount += gross - line.amount
+    quote.subtotal = round(subtotal, 2)
+    quote.discount = round(discount, 2)
+    quote.total = round(quote.subtotal - quote.discount, 2)
+
+
+def _price_line(
+    item: SelectionLine,
+    unit_price: float | None,
+    promos: list[Promo],
+    tier_discount_pct: float,
+) -> QuoteLine:
+    packs: int | None = None
+    billed = item.total_m2
+    if item.pack_step and item.pack_step > 0:
+        # Guard against float noise: 112.0 / 4.0 must stay 28 packs.
+        packs = ceil(round(item.total_m2 / item.pack_step, 6))
+        billed = round(packs * item.pack_step, 2)
+
+    # Discounts do not stack: the best of the volume tier and applicable promos wins.
+    discount_pct = tier_discount_pct
+    codes: list[str] = []
+    for promo in promos:
+        codes.append(promo.code)
+        if promo.discount_pct and billed >= (promo.min_m2 or 0):
+            discount_pct = max(discount_pct, promo.discount_pct)
+
+    amount = None
+    if unit_price is not None:
+        amount = round(billed * unit_price * (1 - discount_pct / 100), 2)
+
+    return QuoteLine(
+        sku=item.sku,
+        name=item.name,
+        category=item.category,
+        brand=item.brand,
+        required_m2=item.total_m2,
+        billed_m2=billed,
+        packs=packs,
+        pack_step=item.pack_step,
+        unit_price=unit_price,
+        discount_pct=discount_pct if unit_price is not None else 0.0,
+        promo_codes=codes,
+        amount=amount,
+    )
+
+
+def format_money(value: float | None) -> str:
+    if value is None:
+        return "—"
+    return f"{value:,.0f}".replace(",", " ") + " ₽"
+
+
+__all__ = ["Quote", "QuoteLine", "QuoteEngine", "DEFAULT_VOLUME_TIERS", "format_money"]
@@ -0,0 +1,392 @@
+"""Scored recommendation engine used by the picker wizard."""
+
+from __future__ import annotations
+
+import heapq
+import re
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Any, Iterable
+
+from .inventory_port import InventoryPort, Product
+from .pricing_port import PriceIndex, PricingPort
+
+# Relative importance of each wizard answer in the final score.
+WEIGHTS: dict[str, float] = {
+    "application_area": 3.0,
+    "usage_class": 2.0,
+    "design": 1.5,
+    "budget": 2.0,
+}
+
+# Constraints are dropped in this order when strict matching returns too few products.
+RELAX_ORDER: tuple[str, ...] = ("design", "usage_class", "budget", "application_area")
+
+RELAX_LABELS: dict[str, str] = {
+    "application_area": "объект",
+    "usage_class": "класс",
+    "design": "цвет/рисунок",
+    "budget": "бюджет",
+}
+
+MATCH_THRESHOLD = 0.6
+DEFAULT_CATEGORY = "Ковровая плитка"
+
+_STOPWORDS = frozenset({"для", "и", "в", "на", "с", "по", "или", "под"})
+_SYNONYMS: dict[str, str] = {
+    "отель": "гостиница",
+    "гостиничный": "гостиница",
+    "дом": "квартира",
+    "спальня": "квартира",
+    "больница": "мед",
+    "клиника": "мед",
+    "садик": "сад",
+    "дерево": "дуб",
+}
+_TOKEN_RE = re.compile(r"\w+")
+
+
+@dataclass(slots=True)
+class Recommendation:
+    """Ranked product returned by the engine."""
+
+    product: Product
+    score: float
+    price: float | None
+
+
+@dataclass(slots=True)
+class RecommendationResult:
+    """Top-N products together with the constraints that had to be relaxed."""
+
+    items: list[Recommendation] = field(default_factory=list)
+    category: str = DEFAULT_CATEGORY
+    relaxed: tuple[str, ...] = ()
+
+
+@dataclass(slots=True)
+class _Vocabulary:
+    """Distinct attribute values (or value tuples) of a category mapped to integer codes."""
+
+    values: list[Any] = field(default_factory=list)
+    codes: dict[Any, int] = field(default_factory=dict)
+
+    def code(self, value: Any) -> int:
+        existing = self.codes.get(value)
+        if existing is not None:
+            return existing
+        self.codes[value] = len(self.values)
+        self.values.append(value)
+        return self.codes[value]
+
+
+@dataclass(slots=True)
+class _CategoryColumns:
+    """Column-oriented view of a category used for a single scoring pass.
+
+    Multi-valued attributes are stored as codes of distinct value tuples, and
+    products sharing the same (application areas, class, colour/pattern) codes
+    share one signature, so fuzzy matching runs once per distinct value and the
+    per-SKU pass is reduced to table lookups.
+    """
+
+    products: list[Product]
+    skus: list[str]
+    use_vocab: _Vocabulary
+    class_vocab: _Vocabulary
+    design_vocab: _Vocabulary
+    use_sets: _Vocabulary
+    design_sets: _Vocabulary
+    signatures: list[tuple[int, int, int]]
+    signature_codes: list[int]
+
+
+class Recommender:
+    """Rank catalogue products against free-text wizard answers.
+
+    Every product gets a weighted score across application area, usage class,
+    colour/pattern and budget. Attribute values are encoded into integer columns
+    once per category, so a query scores each distinct value a single time and
+    then walks the columns with table lookups only.
+    """
+
+    def __init__(
+        self,
+        inventory: InventoryPort,
+        pricing: PricingPort,
+        *,
+        min_results: int = 3,
+    ) -> None:
+        self.inventory = inventory
+        self.pricing = pricing
+        self.min_results = min_results
+        self._columns: dict[str, _CategoryColumns] = {}
+
+    def reset(self) -> None:
+        """Drop precomputed columns (call after the inventory reloads)."""
+
+        self._columns.clear()
+
+    def price_index(self, category: str) -> PriceIndex:
+        """Return the price-sorted index over all SKUs of ``category``."""
+
+        return self.pricing.price_index(category, self._category_columns(category).skus)
+
+    def resolve_category(self, material_type: str | None) -> str:
+        """Map a free-text material answer onto the closest catalogue category."""
+
+        names = [descriptor.name for descriptor in self.inventory.categories()]
+        if not material_type or not names:
+            return DEFAULT_CATEGORY
+
+        best_name, best_score = DEFAULT_CATEGORY, 0.0
+        for name in names:
+            score = text_similarity(material_type, name)
+            if score > best_score:
+                best_name, best_score = name, score
+        return best_name if best_score >= MATCH_THRESHOLD else DEFAULT_CATEGORY
+
+    def recommend(self, answers: dict[str, Any], limit: int = 6) -> RecommendationResult:
+        """Return the best ``limit`` products for the wizard answers."""
+
+        category = self.resolve_category(answers.get("material_type"))
+        columns = self._category_columns(category)
+        result = RecommendationResult(category=category)
+        if not columns.products:
+            return result
+
+        budget = answers.get("budget")
+        budget = float(budget) if budget else None
+        queries = {
+            "application_area": _clean(answers.get("application_area")),
+            "usage_class": _clean(answers.get("usage_class")),
+            "design": _clean(answers.get("design_preferences")),
+        }
+        active = [name for name, query in queries.items() if query]
+        if budget:
+            active.append("budget")
+
+        bits = {name: 1 << index for index, name in enumerate(WEIGHTS)}
+        use_scores, use_masks = _set_tables(
+            _score_table(queries["application_area"], columns.use_vocab),
+            columns.use_sets,
+            WEIGHTS["application_area"],
+            bits["application_area"],
+        )
+        class_scores, class_masks = _set_tables(
+            _score_table(queries["usage_class"], columns.class_vocab),
+            columns.class_vocab,
+            WEIGHTS["usage_class"],
+            bits["usage_class"],
+        )
+        design_scores, design_masks = _set_tables(
+            _score_table(queries["design"], columns.design_vocab),
+            columns.design_sets,
+            WEIGHTS["design"],
+            bits["design"],
+        )
+
+        # Attribute part of the score, once per distinct signature.
+        signature_scores = [
+            use_scores[u] + class_scores[c] + design_scores[d] for u, c, d in columns.signatures
+        ]
+        signature_masks = [
+            use_masks[u] | class_masks[c] | design_masks[d] for u, c, d in columns.signatures
+        ]
+
+        # Per-SKU pass: table lookups plus the budget component.
+        prices = self._prices(columns.skus)
+        codes = columns.signature_codes
+        if budget:
+            w_budget = WEIGHTS["budget"]
+            bit_budget = bits["budget"]
+            budget_scores = _budget_scores(prices, budget)
+            scores = [
+                signature_scores[code] + w_budget * part
+                for code, part in zip(codes, budget_scores, strict=True)
+            ]
+            # Unpriced products rank lower but still count as within budget.
+            masks = [
+                signature_masks[code] | (bit_budget if part >= 1.0 or price is None else 0)
+                for code, part, price in zip(codes, budget_scores, prices, strict=True)
+            ]
+        else:
+            scores = [signature_scores[code] for code in codes]
+            masks = [signature_masks[code] for code in codes]
+
+        required = 0
+        for name in active:
+            required |= bits[name]
+
+        dropped: list[str] = []
+        candidates = _matching(masks, required)
+        for name in RELAX_ORDER:
+            if len(candidates) >= self.min_results or not required:
+                break
+            if not required & bits[name]:
+                continue
+            required &= ~bits[name]
+            dropped.append(name)
+            candidates = _matching(masks, required)
+
+        # nlargest is stable, so ties keep catalogue order and the ranking is deterministic.
+        top = heapq.nlargest(limit, candidates, key=scores.__getitem__)
+        result.items = [
+            Recommendation(
+                product=columns.products[i],
+                score=round(scores[i], 4),
+                price=prices[i],
+            )
+            for i in top
+        ]
+        result.relaxed = tuple(dropped)
+        return result
+
+    # Helpers ---------------------------------------------------------------------
+
+    def _prices(self, skus: list[str]) -> list[float | None]:
+        prices = self.pricing.price_many(skus)
+        return [prices.get(sku) for sku in skus]
+
+    def _category_columns(self, category: str) -> _CategoryColumns:
+        columns = self._columns.get(category)
+        if columns is None:
+            columns = _build_columns(self.inventory.search(category, {}))
+            self._columns[category] = columns
+        return columns
+
+
+def text_similarity(query: str, value: str) -> float:
+    """Fuzzy similarity in ``[0, 1]`` between a free-text answer and an attribute value.
+
+    Tolerates word forms («офис»/«для офиса»), typos and extra words.
+    """
+
+    return _phrase_similarity(_tokens(query), _tokens(value))
+
+
+def _build_columns(products: list[Product]) -> _CategoryColumns:
+    use_vocab, class_vocab, design_vocab = _Vocabulary(), _Vocabulary(), _Vocabulary()
+    use_sets, design_sets, signatures = _Vocabulary(), _Vocabulary(), _Vocabulary()
+    signature_codes: list[int] = []
+    for product in products:
+        use_set = use_sets.code(tuple(use_vocab.code(item) for item in product.use))
+        design_set = design_sets.code(
+            tuple(
+                design_vocab.code(item)
+                for item in (product.color, product.pattern)
+                if item is not None
+            )
+        )
+        class_code = class_vocab.code(product.usage_class)
+        signature_codes.append(signatures.code((use_set, class_code, design_set)))
+    return _CategoryColumns(
+        products=products,
+        skus=[product.sku for product in products],
+        use_vocab=use_vocab,
+        class_vocab=class_vocab,
+        design_vocab=design_vocab,
+        use_sets=use_sets,
+        design_sets=design_sets,
+        signatures=signatures.values,
+        signature_codes=signature_codes,
+    )
+
+
+def _score_table(query: str, vocab: _Vocabulary) -> list[float]:
+    if not query:
+        return [0.0] * len(vocab.values)
+    return [text_similarity(query, value) if value else 0.0 for value in vocab.values]
+
+
+def _set_tables(
+    value_scores: list[float],
+    sets: _Vocabulary,
+    weight: float,
+    bit: int,
+) -> tuple[list[float], list[int]]:
+    """Weighted score and match bit for every distinct value (or value tuple)."""
+
+    scores: list[float] = []
+    masks: list[int] = []
+    for index, item in enumerate(sets.values):
+        if isinstance(item, tuple):
+            best = max((value_scores[code] for code in item), default=0.0)
+        else:
+            best = value_scores[index]
+        scores.append(weight * best)
+        masks.append(bit if best >= MATCH_THRESHOLD else 0)
+    return scores, masks
+
+
+def _matching(masks: list[int], required: int) -> list[int]:
+    return [index for index, mask in enumerate(masks) if mask & required == required]
+
+
+def _budget_scores(prices: list[float | None], budget: float) -> list[float]:
+    """1.0 within budget, linear decay to zero at 150% of it, 0.5 for unknown prices."""
+
+    return [_budget_score(price, budget) for price in prices]
+
+
+def _budget_score(price: float | None, budget: float) -> float:
+    if price is None:
+        return 0.5
+    if price <= budget:
+        return 1.0
+    return max(0.0, (budget * 1.5 - price) / (budget * 0.5))
+
+
+def _clean(value: Any) -> str:
+    return str(value).strip() if value else ""
+
+
+@lru_cache(maxsize=4096)
+def _tokens(text: str) -> tuple[str, ...]:
+    normalized = text.lower().replace("ё", "е")
+    tokens = []
+    for token in _TOKEN_RE.findall(normalized):
+        if token in _STOPWORDS:
+            continue
+        tokens.append(_SYNONYMS.get(token, token))
+    return tuple(tokens)
+
+
+def _phrase_similarity(query: Iterable[str], value: Iterable[str]) -> float:
+    query_tokens = tuple(query)
+    value_tokens = tuple(value)
+    if not query_tokens or not value_tokens:
+        return 0.0
+    best = [max(_token_similarity(q, v) for v in value_tokens) for q in query_tokens]
+    # Blend best and mean so that extra words lower the score without zeroing it.
+    return 0.5 * max(best) + 0.5 * sum(best) / len(best)
+
+
+@lru_cache(maxsize=16384)
+def _token_similarity(left: str, right: str) -> float:
+    if left == right:
+        return 1.0
+    shortest = min(len(left), len(right))
+    if shortest >= 3:
+        prefix = 0
+        for a, b in zip(left, right, strict=False):
+            if a != b:
+                break
+            prefix += 1
+        # Same stem with a different Russian ending: «офис»/«офиса», «школа»/«школы».
+        if prefix >= max(3, shortest - 2):
+            return 0.95
+    ratio = SequenceMatcher(None, left, right).ratio()
+    return ratio if ratio >= 0.75 else 0.0
+
+
+__all__ = [
+    "Recommender",
+    "Recommendation",
+    "RecommendationResult",
+    "text_similarity",
+    "WEIGHTS",
+    "RELAX_ORDER",
+    "RELAX_LABELS",
+]
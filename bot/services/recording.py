@@ -0,0 +1,184 @@
+"""Anonymised recording of incoming updates to a gzip JSONL log."""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import hmac
+import json
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+# Objects whose ``id`` identifies a person or chat.
+IDENTITY_KEYS = frozenset({"from_user", "user", "chat", "sender_chat", "forward_from"})
+NAME_KEYS = frozenset({"first_name", "last_name", "title"})
+DROP_KEYS = frozenset({"username", "bio", "vcard", "user_id"})
+FREE_TEXT_KEYS = frozenset({"text", "caption", "query", "phone_number", "email"})
+# Short numeric answers (areas, room sizes, budgets) are kept; long digit runs look like phones.
+NUMERIC_TEXT = re.compile(r"^[\d\s.,xXхХ×*+\-=/()мmM²]{1,40}$")
+PHONE_DIGITS = 7
+_LETTER = re.compile(r"[^\W\d_]")
+_DIGIT = re.compile(r"\d")
+
+
+@dataclass(slots=True)
+class RecordedUpdate:
+    """One log entry: wall-clock receive time and the anonymised update payload."""
+
+    ts: float
+    update: dict[str, Any]
+
+
+class Anonymiser:
+    """Replace user data in an update dump while keeping it replayable.
+
+    User and chat ids map to stable pseudonyms (keyed HMAC, sign preserved) so
+    per-user ordering and FSM state survive. Names are replaced, usernames
+    dropped, and free text is masked character by character unless it is a
+    known button label or a short numeric answer, so message entities and
+    handler input sizes stay valid.
+    """
+
+    def __init__(self, salt: bytes, keep_texts: Iterable[str] = ()) -> None:
+        self.salt = salt
+        self.keep_texts = set(keep_texts)
+        self._ids: dict[int, int] = {}
+
+    def pseudonym(self, value: int) -> int:
+        cached = self._ids.get(value)
+        if cached is None:
+            digest = hmac.new(self.salt, str(abs(value)).encode(), hashlib.sha256).digest()
+            cached = 10**9 + int.from_bytes(digest[:6], "big") % 10**12
+            cached = -cached if value < 0 else cached
+            self._ids[value] = cached
+        return cached
+
+    def text(self, value: str) -> str:
+        if value in self.keep_texts or value.startswith("/"):
+            return value
+        if NUMERIC_TEXT.match(value) and len(_DIGIT.findall(value)) < PHONE_DIGITS:
+            return value
+        return _DIGIT.sub("0", _LETTER.sub("x", value))
+
+    def __call__(self, payload: Any, key: str | None = None) -> Any:
+        if isinstance(payload, dict):
+            result: dict[str, Any] = {}
+            for name, value in payload.items():
+                if name in DROP_KEYS:
+                    continue
+                if name in NAME_KEYS and isinstance(value, str):
+                    result[name] = "User"
+                elif name in FREE_TEXT_KEYS and isinstance(value, str):
+                    result[name] = self.text(value)
+                elif name == "id" and key in IDENTITY_KEYS and isinstance(value, int):
+                    result[name] = self.pseudonym(value)
+                else:
+                    result[name] = self(value, name)
+            return result
+        if isinstance(payload, list):
+            return [self(item, key) for item in payload]
+        return payload
+
+
+class UpdateRecorder:
+    """Buffer anonymised updates and append them to a gzip JSONL log.
+
+    Each flush appends a new gzip member, so the file stays valid after a crash
+    (only the unflushed buffer is lost) and readers see one continuous stream.
+    """
+
+    def __init__(self) -> None:
+        self.path: Path | None = None
+        self.flush_every = 100
+        self.flush_interval = 5.0
+        self._anonymise = Anonymiser(os.urandom(16))
+        self._buffer: list[str] = []
+        self._last_flush = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def configure(
+        self,
+        path: Path | None,
+        salt: str | None = None,
+        keep_texts: Iterable[str] = (),
+        flush_every: int | None = None,
+    ) -> None:
+        """Start recording to ``path`` (``None`` disables recording).
+
+        Without a ``salt`` pseudonyms are random per process and cannot be
+        joined across restarts.
+        """
+
+        self.flush()
+        self.path = path
+        key = salt.encode() if salt else os.urandom(16)
+        self._anonymise = Anonymiser(key, keep_texts)
+        if flush_every is not None:
+            self.flush_every = max(1, flush_every)
+
+    def add_known_texts(self, texts: Iterable[str]) -> None:
+        self._anonymise.keep_texts.update(texts)
+
+    def record(self, update: dict[str, Any], ts: float | None = None) -> None:
+        if self.path is None:
+            return
+        entry = {
+            "ts": round(ts if ts is not None else time.time(), 4),
+            "update": self._anonymise(update),
+        }
+        self._buffer.append(json.dumps(entry, ensure_ascii=False, separators=(",", ":")))
+        if (
+            len(self._buffer) >= self.flush_every
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._buffer or self.path is None:
+            self._buffer.clear()
+            return
+        lines, self._buffer = self._buffer, []
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with gzip.open(self.path, "at", encoding="utf-8") as handle:
+                handle.write("\n".join(lines) + "\n")
+        except OSError:
+            logger.exception("Failed to append %d recorded updates to %s", len(lines), self.path)
+
+    def close(self) -> None:
+        self.flush()
+
+
+recorder = UpdateRecorder()
+
+
+def read_log(path: Path) -> Iterator[RecordedUpdate]:
+    """Yield entries of a recording, skipping a truncated trailing line."""
+
+    with gzip.open(path, "rt", encoding="utf-8") as handle:
+        try:
+            for line in handle:
+                if not line.strip():
+                    continue
+                try:
+                    raw = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Skipping malformed line in %s", path)
+                    continue
+                yield RecordedUpdate(ts=float(raw["ts"]), update=raw["update"])
+        except EOFError:
+            logger.warning("Recording %s ends with an incomplete gzip member", path)
+
+
+__all__ = ["Anonymiser", "RecordedUpdate", "UpdateRecorder", "read_log", "recorder"]
@@ -0,0 +1,108 @@
+"""Texts of the menu sections that are the same for every user, built once."""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Hashable, Mapping, Sequence
+
+from .pricing_port import Promo
+
+HELP_SECTIONS = (
+    ("pick", "🧭 Подбор"),
+    ("catalog", "🛍 Каталог"),
+    ("delivery", "🚚 Доставка"),
+    ("payment", "💳 Оплата"),
+    ("promos", "🎯 Акции"),
+    ("samples", "📦 Образцы"),
+    ("manager", "👤 Менеджер"),
+    ("contacts", "📞 Контакты"),
+)
+
+
+def help_text(labels: Mapping[str, str]) -> str:
+    lines = ["Доступные разделы:"]
+    lines.extend(labels.get(key, default) for key, default in HELP_SECTIONS)
+    return "\n".join(lines)
+
+
+def contacts_text(company: Mapping[str, Any]) -> str:
+    return "\n".join(
+        [
+            f"{company.get('brand', 'Lgpol / В.В.К.')}",
+            f"Телефон: {company.get('phone', '')}",
+            f"Email: {company.get('email', '')}",
+            f"Адрес: {company.get('address', '')}",
+            f"График: {company.get('hours', '')}",
+            f"Сайт: {company.get('site', '')}",
+        ]
+    )
+
+
+def promos_text(promos: Sequence[Promo]) -> str:
+    if not promos:
+        return "Пока нет активных акций. Мы сообщим, когда появятся новинки."
+    lines = ["🎯 Актуальные акции:"]
+    for promo in promos:
+        until = f"до {promo.valid_until.strftime('%d.%m.%Y')}" if promo.valid_until else "без срока"
+        lines.append(f"• {promo.title} ({until})\n  {promo.description}")
+    return "\n".join(lines)
+
+
+class ResponseCache:
+    """Rendered section texts, rebuilt only when their inputs change.
+
+    Like :class:`~bot.keyboards.cache.KeyboardCache`, entries are keyed by
+    their inputs and :meth:`sync` drops everything when the text library
+    version changes. The promo text is keyed by the identity of the active
+    promo tuple, which :class:`~bot.services.promo_index.PromoIndex` shares
+    until the set of active promos changes.
+    """
+
+    def __init__(self) -> None:
+        self.version: Hashable = None
+        self.hits = 0
+        self.misses = 0
+        self._texts: dict[Hashable, str] = {}
+        self._promos: tuple[Sequence[Promo], str] | None = None
+
+    def sync(self, version: Hashable) -> None:
+        if version != self.version:
+            self.clear()
+            self.version = version
+
+    def clear(self) -> None:
+        self._texts.clear()
+        self._promos = None
+
+    # Responses --------------------------------------------------------------------
+
+    def help(self, labels: Mapping[str, str]) -> str:
+        return self._get(("help", *labels.items()), lambda: help_text(labels))
+
+    def contacts(self, company: Mapping[str, Any]) -> str:
+        """Contacts block; ``company`` is text library content, covered by :meth:`sync`."""
+
+        return self._get("contacts", lambda: contacts_text(company))
+
+    def promos(self, promos: Sequence[Promo]) -> str:
+        cached = self._promos
+        if cached is not None and cached[0] is promos:
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        text = promos_text(promos)
+        self._promos = (promos, text)
+        return text
+
+    # Internal helpers -------------------------------------------------------------
+
+    def _get(self, key: Hashable, build: Callable[[], str]) -> str:
+        text = self._texts.get(key)
+        if text is not None:
+            self.hits += 1
+            return text
+        self.misses += 1
+        text = self._texts[key] = build()
+        return text
+
+
+__all__ = ["ResponseCache", "contacts_text", "help_text", "promos_text"]
@@ -39,13 +39,24 @@ class SelectionEntry:
 
 
 class SelectionStore:
-    """In-memory selection storage with optional autosave to disk."""
-
-    def __init__(self, tmp_dir: Path, autosave: bool = True):
+    """In-memory selection storage with optional autosave to disk.
+
+    ``partition=(index, count)`` loads only users with ``user_id % count ==
+    index``; webhook workers use it because each user is routed to one worker.
+    """
+
+    def __init__(
+        self,
+        tmp_dir: Path,
+        autosave: bool = True,
+        partition: tuple[int, int] | None = None,
+    ):
         self.tmp_dir = tmp_dir
         self.autosave = autosave
+        self.partition = partition
         self.tmp_dir.mkdir(parents=True, exist_ok=True)
         self._data: dict[int, list[SelectionEntry]] = {}
+        self._versions: dict[int, int] = {}
         self._load_existing()
 
     # Public API -----------------------------------------------------------------
@@ -59,6 +70,7 @@ class SelectionStore:
         entries = [item for item in entries if item.sku != entry.sku]
         entries.append(entry)
         self._data[user_id] = entries
+        self._touch(user_id)
         self._persist(user_id)
 
     def remove(self, user_id: int, sku: str) -> bool:
@@ -67,18 +79,28 @@ class SelectionStore:
         if len(new_entries) == len(entries):
             return False
         self._data[user_id] = new_entries
+        self._touch(user_id)
         self._persist(user_id)
         return True
 
     def clear(self, user_id: int) -> None:
         self._data.pop(user_id, None)
+        self._touch(user_id)
         self._persist(user_id)
 
     def to_lines(self, user_id: int) -> list[SelectionLine]:
         return [entry.to_line() for entry in self.list(user_id)]
 
+    def version(self, user_id: int) -> int:
+        """Return a counter that changes whenever the user's selection changes."""
+
+        return self._versions.get(user_id, 0)
+
     # Internal helpers -----------------------------------------------------------
 
+    def _touch(self, user_id: int) -> None:
+        self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
     def _persist(self, user_id: int) -> None:
         if not self.autosave:
             return
@@ -97,6 +119,8 @@ class SelectionStore:
                 user_id = int(path.stem.split("_")[1])
             except (IndexError, ValueError):
                 continue
+            if self.partition and user_id % self.partition[1] != self.partition[0]:
+                continue
             raw_entries = json.loads(path.read_text(encoding="utf-8"))
             entries: list[SelectionEntry] = []
             for item in raw_entries:
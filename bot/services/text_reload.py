@@ -0,0 +1,68 @@
+"""Hot reload of the text library (styles, FAQ, delivery, contacts) without a restart."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+
+from .recording import recorder
+from .text_templates import content_stamp, load_text_library, set_text_library
+
+if TYPE_CHECKING:
+    from ..context import AppContext
+
+logger = logging.getLogger(__name__)
+
+
+async def reload_texts(context: AppContext) -> bool:
+    """Read the content files again and swap the new library into ``context``.
+
+    Reading, parsing and template compilation run in a worker thread; the
+    swap is a single attribute assignment on the event loop, so a handler
+    sees either the old library or the new one. Caches derived from texts
+    follow the library version (pre-rendered responses) or live on the
+    library itself (compiled templates, menu routing table), so nothing is
+    cleared globally. Renamed menu labels keep routing to their buttons.
+    Returns ``False`` if the content version did not change; loading errors
+    propagate and leave the current library in place.
+    """
+
+    current = context.text_library
+    library = await asyncio.to_thread(load_text_library, current.data_dir)
+    if library.version == current.version:
+        return False
+    library.keep_routes(current)
+    context.text_library = library
+    set_text_library(library)
+    if recorder.enabled:
+        recorder.add_known_texts(library.reply_button_texts())
+    logger.info("Text library reloaded: version %s -> %s", current.version, library.version)
+    return True
+
+
+async def watch_texts(context: AppContext, interval: float) -> None:
+    """Reload the texts whenever a content file changes; runs until cancelled.
+
+    Files are checked by modification time and size every ``interval``
+    seconds, off the event loop. A broken file is reported once and retried
+    only after it changes again.
+    """
+
+    data_dir = context.text_library.data_dir
+    stamp = await asyncio.to_thread(content_stamp, data_dir)
+    while True:
+        await asyncio.sleep(interval)
+        current = await asyncio.to_thread(content_stamp, data_dir)
+        if current == stamp:
+            continue
+        stamp = current
+        try:
+            await reload_texts(context)
+        except Exception:
+            logger.exception(
+                "Text library reload failed; keeping version %s", context.text_library.version
+            )
+
+
+__all__ = ["reload_texts", "watch_texts"]
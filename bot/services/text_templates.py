@@ -2,19 +2,49 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
-from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Sequence
 
 import yaml
-from jinja2 import Environment, StrictUndefined
+from jinja2 import Environment, StrictUndefined, Template
 
 from .inventory_port import Product
+from .metrics import timed
+from .tracing import traced
+from .pricing_port import Promo
+
+# Files whose content makes up a library version.
+CONTENT_FILES = ("styles.yaml", "company.json", "delivery.md", "faq.md")
+
+PRODUCT_CARD_TEMPLATE = """
+<b>{{ product.category }}</b> • {{ product.brand }} • {{ product.name }}
+Страна: {{ product.country|fallback }}
+Класс: {{ product.usage_class|fallback }}
+Состав: {{ product.composition|fallback(product.fiber|fallback) }}
+Свойства: {{ product.props|join(", ") if product.props else "—" }}
+Цвет / рисунок: {{ product.color|fallback }} / {{ product.pattern|fallback }}
+Рекомендуем: {{ product.use|join(", ") if product.use else "—" }}
+{% if required_m2 %}
+Расчёт: {{ "%.2f"|format(required_m2) }} м²
+{% endif %}
+{% if price %}
+Ориентир по цене: <b>{{ "%.0f"|format(price) }} ₽/м²</b>
+{% endif %}
+{% for promo in promos %}
+🎯 {{ promo.title }}
+{% endfor %}
+"""
 
 
 class TextLibrary:
-    """Load styles, copy, and templates from the data directory."""
+    """Load styles, copy, and templates from the data directory.
+
+    An instance is a snapshot of one content :attr:`version`: a reload builds
+    a new library rather than changing this one, so caches kept on it
+    (compiled templates, the menu routing table) go away with it.
+    """
 
     def __init__(self, data_dir: Path):
         self.data_dir = data_dir
@@ -22,10 +52,16 @@ class TextLibrary:
         self.company = self._load_json("company.json")
         self.delivery = self._load_text("delivery.md")
         self.faq = self._load_text("faq.md")
+        self.version = self._content_version()
 
         self.env = Environment(undefined=StrictUndefined, trim_blocks=True, lstrip_blocks=True)
         self.env.globals.update({"company": self.company})
         self.env.filters["fallback"] = lambda value, default="—": value if value else default
+        self._templates: dict[str, Template] = {}
+        self._routes: dict[str, str] = {}
+        self._routes_source: tuple[tuple[str, str], ...] | None = None
+        # Labels of earlier versions still on users' reply keyboards; see keep_routes.
+        self._retired_routes: dict[str, str] = {}
 
     # Loading helpers -------------------------------------------------------------
 
@@ -47,6 +83,30 @@ class TextLibrary:
             return ""
         return path.read_text(encoding="utf-8")
 
+    def _content_version(self) -> str:
+        digest = hashlib.sha1()
+        for filename in CONTENT_FILES:
+            path = self.data_dir / filename
+            if path.exists():
+                digest.update(path.read_bytes())
+        return digest.hexdigest()[:12]
+
+    # Templates -------------------------------------------------------------------
+
+    def template(self, source: str) -> Template:
+        """Compiled template for ``source``; each distinct source is compiled once."""
+
+        compiled = self._templates.get(source)
+        if compiled is None:
+            compiled = self._templates[source] = self.env.from_string(source)
+        return compiled
+
+    def compile_templates(self) -> int:
+        """Compile the templates named in styles ahead of the first render."""
+
+        self.template(self.styles.get("product_card_template", PRODUCT_CARD_TEMPLATE))
+        return len(self._templates)
+
     # Style accessors -------------------------------------------------------------
 
     def greeting(self) -> str:
@@ -55,6 +115,50 @@ class TextLibrary:
     def menu_labels(self) -> dict[str, str]:
         return self.styles.get("menu_labels", {})
 
+    def menu_route(self, text: str | None) -> str | None:
+        """Menu key whose label is exactly ``text`` (surrounding spaces aside).
+
+        Labels of earlier library versions still route while users may have
+        their old reply keyboard; see :meth:`keep_routes`.
+        """
+
+        return self._route_table().get((text or "").strip())
+
+    def keep_routes(self, previous: TextLibrary) -> None:
+        """Keep routing the labels ``previous`` used that this version renamed.
+
+        A user's reply keyboard changes only when the bot sends a new one, so
+        after a relabel the old texts keep arriving. They route to the same key
+        for as long as the key exists; a current label always takes precedence.
+        """
+
+        labels = self.menu_labels()
+        current = {label.strip() for label in labels.values() if label}
+        self._retired_routes = {
+            label: key
+            for label, key in previous._route_table().items()
+            if key in labels and label not in current
+        }
+        self._routes_source = None
+
+    def _route_table(self) -> dict[str, str]:
+        labels = self.menu_labels()
+        source = tuple(labels.items())
+        if source != self._routes_source:
+            # Rebuilt only if the labels change (tools patch them in place).
+            current = {label.strip(): key for key, label in source if label and label.strip()}
+            self._routes = {**self._retired_routes, **current}
+            self._routes_source = source
+        return self._routes
+
+    def reply_button_texts(self) -> set[str]:
+        """Texts users send by pressing reply-keyboard buttons (safe to record verbatim)."""
+
+        texts = set(self.menu_labels().values())
+        for options in self.picker_options().values():
+            texts.update(options)
+        return texts
+
     def picker_questions(self) -> dict[str, str]:
         return self.styles.get("picker_questions", {})
 
@@ -70,36 +174,69 @@ class TextLibrary:
     def manager_prompts(self) -> dict[str, str]:
         return self.styles.get("manager_prompts", {})
 
+    @timed("text_library")
+    @traced("text_library.render_product_card")
     def render_product_card(
         self,
         product: Product,
         price: float | None = None,
         required_m2: float | None = None,
+        promos: Sequence[Promo] | None = None,
     ) -> str:
         """Render a textual card describing a product."""
 
-        template = self.env.from_string(
-            self.styles.get(
-                "product_card_template",
-                """
-<b>{{ product.category }}</b> • {{ product.brand }} • {{ product.name }}
-Страна: {{ product.country|fallback }}
-Класс: {{ product.usage_class|fallback }}
-Состав: {{ product.composition|fallback(product.fiber|fallback) }}
-Свойства: {{ product.props|join(", ") if product.props else "—" }}
-Цвет / рисунок: {{ product.color|fallback }} / {{ product.pattern|fallback }}
-Рекомендуем: {{ product.use|join(", ") if product.use else "—" }}
-{% if required_m2 %}Расчёт: {{ "%.2f"|format(required_m2) }} м²{% endif %}
-{% if price %}Ориентир по цене: <b>{{ "%.0f"|format(price) }} ₽/м²</b>{% endif %}
-""",
-            )
+        template = self.template(self.styles.get("product_card_template", PRODUCT_CARD_TEMPLATE))
+        return template.render(
+            product=product, price=price, required_m2=required_m2, promos=promos or ()
         )
-        return template.render(product=product, price=price, required_m2=required_m2)
 
 
-@lru_cache(maxsize=1)
+def content_stamp(data_dir: Path) -> tuple[tuple[int, int] | None, ...]:
+    """Modification time and size of each content file; cheap change detection."""
+
+    stamp: list[tuple[int, int] | None] = []
+    for filename in CONTENT_FILES:
+        try:
+            stat = (data_dir / filename).stat()
+        except FileNotFoundError:
+            stamp.append(None)
+        else:
+            stamp.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(stamp)
+
+
+_libraries: dict[Path, TextLibrary] = {}
+
+
 def get_text_library(data_dir: Path) -> TextLibrary:
-    return TextLibrary(data_dir=data_dir)
+    """Current library for ``data_dir``, loaded on first use."""
+
+    library = _libraries.get(data_dir)
+    if library is None:
+        library = _libraries[data_dir] = TextLibrary(data_dir=data_dir)
+    return library
+
+
+def load_text_library(data_dir: Path) -> TextLibrary:
+    """Read ``data_dir`` afresh and compile its templates; blocking, so run it in a thread."""
+
+    library = TextLibrary(data_dir=data_dir)
+    library.compile_templates()
+    return library
+
+
+def set_text_library(library: TextLibrary) -> None:
+    """Make ``library`` the one :func:`get_text_library` returns for its directory."""
+
+    _libraries[library.data_dir] = library
 
 
-__all__ = ["TextLibrary", "get_text_library"]
+__all__ = [
+    "CONTENT_FILES",
+    "PRODUCT_CARD_TEMPLATE",
+    "TextLibrary",
+    "content_stamp",
+    "get_text_library",
+    "load_text_library",
+    "set_text_library",
+]
@@ -0,0 +1,200 @@
+"""Lightweight per-update tracing with slow-trace logging."""
+
+from __future__ import annotations
+
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Iterator, TypeVar
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+@dataclass(slots=True)
+class Span:
+    """Timed section of an update; ``parent`` is the index of the enclosing span."""
+
+    name: str
+    parent: int | None
+    start: float
+    end: float | None = None
+    attrs: dict[str, Any] | None = None
+
+
+@dataclass(slots=True)
+class Trace:
+    """All spans recorded while one update was processed."""
+
+    update_id: int | None
+    started_at: float = field(default_factory=time.time)
+    spans: list[Span] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        root = self.spans[0] if self.spans else None
+        if root is None or root.end is None:
+            return 0.0
+        return root.end - root.start
+
+    def as_record(self) -> dict[str, Any]:
+        origin = self.spans[0].start if self.spans else 0.0
+        return {
+            "update_id": self.update_id,
+            "started_at": round(self.started_at, 3),
+            "duration_ms": round(self.duration * 1000, 3),
+            "spans": [
+                {
+                    "name": span.name,
+                    "parent": span.parent,
+                    "start_ms": round((span.start - origin) * 1000, 3),
+                    "duration_ms": round(((span.end or span.start) - span.start) * 1000, 3),
+                    **({"attrs": span.attrs} if span.attrs else {}),
+                }
+                for span in self.spans
+            ],
+        }
+
+
+# (trace, index of the innermost open span) for the current task.
+_current: ContextVar[tuple[Trace, int] | None] = ContextVar("trace_current", default=None)
+
+
+class Tracer:
+    """Sample updates, collect their spans and append slow traces to a JSONL file.
+
+    With ``sample_rate=0`` (the default) :meth:`trace` and :meth:`span` only
+    perform a context-variable lookup.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 0.0,
+        slow_ms: float = 500.0,
+        path: Path | None = None,
+    ) -> None:
+        self.sample_rate = 0.0
+        self.slow_ms = slow_ms
+        self.path = path
+        self.configure(sample_rate=sample_rate)
+        self._random = random.random
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    def configure(
+        self,
+        sample_rate: float | None = None,
+        slow_ms: float | None = None,
+        path: Path | None = None,
+    ) -> None:
+        if sample_rate is not None:
+            self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        if slow_ms is not None:
+            self.slow_ms = slow_ms
+        if path is not None:
+            self.path = path
+
+    @contextmanager
+    def trace(self, update_id: int | None, name: str = "update") -> Iterator[Trace | None]:
+        """Start a trace for an update if it is sampled; yields ``None`` otherwise."""
+
+        if not self.enabled or _current.get() is not None or self._random() >= self.sample_rate:
+            yield None
+            return
+
+        trace = Trace(update_id=update_id)
+        trace.spans.append(Span(name=name, parent=None, start=time.perf_counter()))
+        token = _current.set((trace, 0))
+        try:
+            yield trace
+        finally:
+            trace.spans[0].end = time.perf_counter()
+            _current.reset(token)
+            self._finish(trace)
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[None]:
+        """Record a child span of the innermost open span, if the update is traced."""
+
+        current = _current.get()
+        if current is None:
+            yield
+            return
+
+        trace, parent = current
+        span = Span(name=name, parent=parent, start=time.perf_counter(), attrs=attrs or None)
+        trace.spans.append(span)
+        token = _current.set((trace, len(trace.spans) - 1))
+        try:
+            yield
+        except BaseException as exc:
+            span.attrs = {**(span.attrs or {}), "error": type(exc).__name__}
+            raise
+        finally:
+            span.end = time.perf_counter()
+            _current.reset(token)
+
+    def _finish(self, trace: Trace) -> None:
+        if self.path is None or trace.duration * 1000 < self.slow_ms:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as handle:
+                handle.write(json.dumps(trace.as_record(), ensure_ascii=False) + "\n")
+        except OSError:
+            logger.exception("Failed to write slow trace to %s", self.path)
+
+
+tracer = Tracer()
+
+
+def current_trace() -> Trace | None:
+    current = _current.get()
+    return current[0] if current else None
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Decorate a function so its calls become spans of the current trace."""
+
+    def decorator(func: F) -> F:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _current.get() is None:
+                return func(*args, **kwargs)
+            with tracer.span(name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+class TracedProxy:
+    """Wrap a service port so each method call becomes a ``<service>.<method>`` span."""
+
+    def __init__(self, target: Any, service: str) -> None:
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_service", service)
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._target, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+        wrapped = traced(f"{self._service}.{name}")(attr)
+        object.__setattr__(self, name, wrapped)
+        return wrapped
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._target, name, value)
+
+
+__all__ = ["Span", "Trace", "Tracer", "TracedProxy", "tracer", "traced", "current_trace"]
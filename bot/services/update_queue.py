@@ -0,0 +1,161 @@
+"""Bounded keyed queue: FIFO per key, parallel across keys."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import suppress
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Generic, Hashable, TypeVar
+
+from .metrics import INGEST_DEPTH, INGEST_OLDEST_AGE, INGEST_SHED, INGEST_WAIT, registry
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Reasons returned by :meth:`KeyedQueue.put` when an item is rejected.
+SHED_FULL = "full"
+SHED_KEY_LIMIT = "key_limit"
+SHED_STOPPED = "stopped"
+
+
+@dataclass(slots=True)
+class _Item(Generic[T]):
+    payload: T
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class KeyedQueue(Generic[T]):
+    """Run ``handler`` for queued items, one at a time per key.
+
+    Items with the same key (a user) are handled strictly in order; up to
+    ``concurrency`` different keys are handled in parallel, taking turns so one
+    busy key cannot starve the others. :meth:`put` never waits: once
+    ``maxsize`` items (or ``max_per_key`` for one key) are pending it returns the
+    shed reason and the caller decides how to degrade.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[T], Awaitable[Any]],
+        maxsize: int = 1000,
+        concurrency: int = 32,
+        max_per_key: int | None = None,
+        name: str = "ingest",
+    ) -> None:
+        self.handler = handler
+        self.maxsize = maxsize
+        self.concurrency = max(1, concurrency)
+        self.max_per_key = max_per_key
+        self.name = name
+        self.size = 0
+        self._pending: dict[Hashable, deque[_Item[T]]] = {}
+        self._ready: asyncio.Queue[Hashable] = asyncio.Queue()
+        self._workers: list[asyncio.Task[None]] = []
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._accepting = False
+
+    # Public API -------------------------------------------------------------------
+
+    def put(self, key: Hashable, payload: T) -> str | None:
+        """Enqueue ``payload``; returns ``None`` or the reason it was shed."""
+
+        reason = None
+        items = self._pending.get(key)
+        if not self._accepting:
+            reason = SHED_STOPPED
+        elif self.size >= self.maxsize:
+            reason = SHED_FULL
+        elif items is not None and self.max_per_key and len(items) >= self.max_per_key:
+            reason = SHED_KEY_LIMIT
+        if reason is not None:
+            if registry.enabled:
+                registry.counter(INGEST_SHED, "Updates rejected by the ingest queue").inc(
+                    queue=self.name, reason=reason
+                )
+            return reason
+
+        if items is None:
+            items = self._pending[key] = deque()
+            self._ready.put_nowait(key)
+        items.append(_Item(payload))
+        self.size += 1
+        self._idle.clear()
+        return None
+
+    def busy(self, key: Hashable) -> bool:
+        """Whether ``key`` has items waiting or being handled."""
+
+        return key in self._pending
+
+    def oldest_age(self) -> float:
+        """Seconds the oldest pending item has been waiting."""
+
+        heads = [items[0].enqueued_at for items in self._pending.values() if items]
+        return time.monotonic() - min(heads) if heads else 0.0
+
+    async def start(self) -> None:
+        self._accepting = True
+        self._workers = [
+            asyncio.create_task(self._work(), name=f"{self.name}-worker-{index}")
+            for index in range(self.concurrency)
+        ]
+        if registry.enabled:
+            registry.gauge(INGEST_DEPTH, "Updates waiting in the ingest queue").track(
+                lambda: self.size, queue=self.name
+            )
+            registry.gauge(
+                INGEST_OLDEST_AGE, "Age of the oldest update waiting in the ingest queue"
+            ).track(self.oldest_age, queue=self.name)
+
+    async def join(self) -> None:
+        """Wait until every accepted item has been handled."""
+
+        await self._idle.wait()
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Stop accepting, let pending items drain for ``timeout`` seconds, then cancel."""
+
+        self._accepting = False
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self.join(), timeout)
+        if self.size:
+            logger.warning("Dropping %d queued updates on shutdown", self.size)
+        for worker in self._workers:
+            worker.cancel()
+        for worker in self._workers:
+            with suppress(asyncio.CancelledError):
+                await worker
+        self._workers = []
+
+    # Internal helpers -------------------------------------------------------------
+
+    async def _work(self) -> None:
+        while True:
+            key = await self._ready.get()
+            items = self._pending[key]
+            item = items.popleft()
+            self.size -= 1
+            if registry.enabled:
+                registry.histogram(INGEST_WAIT, "Time updates spent in the ingest queue").observe(
+                    time.monotonic() - item.enqueued_at, queue=self.name
+                )
+            try:
+                await self.handler(item.payload)
+            except Exception:
+                logger.exception("Queued %s item failed", self.name)
+            finally:
+                if items:
+                    # Back of the line, so other keys get their turn.
+                    self._ready.put_nowait(key)
+                else:
+                    del self._pending[key]
+                    if not self._pending:
+                        self._idle.set()
+
+
+__all__ = ["KeyedQueue", "SHED_FULL", "SHED_KEY_LIMIT", "SHED_STOPPED"]
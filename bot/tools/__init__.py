@@ -0,0 +1 @@
+"""Command-line tools for diagnosing and benchmarking the bot."""
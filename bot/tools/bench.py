@@ -0,0 +1,497 @@
+"""Microbenchmarks for service hot paths with JSON regression baselines.
+
+Usage::
+
+    python -m bot.tools.bench --save benchmarks/baseline.json
+    python -m bot.tools.bench --compare benchmarks/baseline.json --threshold 0.25
+
+``--compare`` exits with status 1 when any benchmark's median time per call
+exceeds its baseline by more than the threshold. Each result also reports the
+bytes allocated per call (tracemalloc peak), which is informational only.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import weakref
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator, Sequence
+
+from ..config import BASE_DIR
+from .gen_catalog import write_catalog
+
+DEFAULT_BASELINE = BASE_DIR / "benchmarks" / "baseline.json"
+CATALOG_SIZES = (1_000, 10_000)
+SELECTION_SIZES = (5, 50, 200)
+QUICK_CATALOG_SIZES = (200,)
+QUICK_SELECTION_SIZES = (5,)
+
+
+@dataclass(slots=True)
+class Benchmark:
+    """Named callable measured per call; ``setup`` builds it outside the timing."""
+
+    name: str
+    setup: Callable[[], Callable[[], Any]]
+
+
+@dataclass(slots=True)
+class BenchResult:
+    name: str
+    median_us: float
+    min_us: float
+    calls: int
+    alloc_bytes: float = 0.0
+
+
+@dataclass(slots=True)
+class Regression:
+    name: str
+    baseline_us: float
+    current_us: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current_us / self.baseline_us if self.baseline_us else float("inf")
+
+
+def measure(
+    func: Callable[[], Any],
+    repeats: int = 5,
+    target_s: float = 0.1,
+) -> tuple[float, float, int]:
+    """Return (median, min) seconds per call and the calls per repeat."""
+
+    func()  # warm caches and lazy imports
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= target_s / 5 or number >= 1_000_000:
+            break
+        number *= 2 if elapsed == 0 else max(2, min(10, int(target_s / 5 / elapsed) + 1))
+
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - started) / number)
+    return statistics.median(timings), min(timings), number
+
+
+def measure_alloc(func: Callable[[], Any], calls: int = 10) -> float:
+    """Return the median bytes a call allocates at its peak, via tracemalloc.
+
+    Memory the call keeps alive (a cache filling up) counts as well, so warm
+    caches before measuring steady-state behaviour.
+    """
+
+    func()
+    owner = not tracemalloc.is_tracing()
+    if owner:
+        tracemalloc.start()
+    try:
+        samples = []
+        for _ in range(calls):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            func()
+            samples.append(tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        if owner:
+            tracemalloc.stop()
+    return float(statistics.median(samples))
+
+
+# Benchmarks ------------------------------------------------------------------------
+
+
+def build_benchmarks(
+    workdir: Path,
+    catalog_sizes: Sequence[int] = CATALOG_SIZES,
+    selection_sizes: Sequence[int] = SELECTION_SIZES,
+) -> list[Benchmark]:
+    from ..callbacks import Action, decode_callback, encode_callback
+    from ..keyboards.cache import KeyboardCache
+    from ..keyboards.catalog import (
+        categories_keyboard,
+        filter_keyboard,
+        product_actions_keyboard,
+        selection_manage_keyboard,
+    )
+    from ..keyboards.common import build_main_menu
+    from ..services.export import selection_to_workbook
+    from ..services.inventory_stub import InventoryStub
+    from ..services.selection_store import SelectionStore
+    from ..services.text_templates import get_text_library
+
+    library = get_text_library(BASE_DIR / "data")
+    benchmarks: list[Benchmark] = []
+
+    for size in catalog_sizes:
+        catalog_path = workdir / f"catalog_{size}.json"
+        write_catalog(catalog_path, size, seed=0)
+        inventory = InventoryStub(catalog_path)
+        benchmarks += _inventory_benchmarks(inventory, size)
+
+    bundled = InventoryStub(BASE_DIR / "data" / "catalog.json")
+    categories = bundled.ids.categories
+    tag = bundled.ids.tag
+    products = [product for name in categories for product in bundled.search(name, {})]
+    product = products[0]
+    labels = library.menu_labels()
+    use_id = bundled.ids.filters.id("Область применения")
+    option_map = bundled.ids.facets[(product.category, "Область применения")]
+    option_keys = [bundled.ids.options.get(option_id) for option_id in option_map]
+    shown = [item.sku for item in products[:6]]
+    quote_data = encode_callback(Action.SELECTION_QUOTE, product.sku)
+
+    def results_uncached() -> Any:
+        # Keyboards behind one "show results" update: the product cards' actions.
+        return [product_actions_keyboard(sku) for sku in shown]
+
+    def results_cached() -> Callable[[], Any]:
+        cache = KeyboardCache()
+        return lambda: [cache.product_actions(sku) for sku in shown]
+
+    def cached(build: Callable[[KeyboardCache], Any]) -> Callable[[], Callable[[], Any]]:
+        def setup() -> Callable[[], Any]:
+            cache = KeyboardCache()
+            return lambda: build(cache)
+
+        return setup
+
+    benchmarks += [
+        Benchmark(
+            "text.render_product_card",
+            lambda: lambda: library.render_product_card(product, price=1450.0, required_m2=126.0),
+        ),
+        Benchmark(
+            "catalog.option_ids",
+            lambda: lambda: [
+                bundled.ids.options.get(bundled.ids.options.id(key)) for key in option_keys
+            ],
+        ),
+        Benchmark("keyboards.build_main_menu", lambda: lambda: build_main_menu(labels)),
+        Benchmark("keyboards.categories", lambda: lambda: categories_keyboard(categories, tag)),
+        Benchmark(
+            "keyboards.filter",
+            lambda: lambda: filter_keyboard(use_id, option_map, tag),
+        ),
+        Benchmark(
+            "keyboards.product_actions", lambda: lambda: product_actions_keyboard(product.sku)
+        ),
+        Benchmark("keyboards.selection_manage", lambda: selection_manage_keyboard),
+        Benchmark("keyboards.cached.main_menu", cached(lambda cache: cache.main_menu(labels))),
+        Benchmark(
+            "keyboards.cached.categories", cached(lambda cache: cache.categories(categories, tag))
+        ),
+        Benchmark(
+            "keyboards.cached.filter",
+            cached(lambda cache: cache.filter(use_id, option_map, tag)),
+        ),
+        Benchmark(
+            "keyboards.cached.product_actions",
+            cached(lambda cache: cache.product_actions(product.sku)),
+        ),
+        Benchmark(
+            "keyboards.cached.selection_manage",
+            cached(lambda cache: cache.static(selection_manage_keyboard)),
+        ),
+        Benchmark("keyboards.results_update", lambda: results_uncached),
+        Benchmark("keyboards.cached.results_update", results_cached),
+        Benchmark(
+            "callbacks.encode",
+            lambda: lambda: encode_callback(Action.CATALOG_FILTER, tag, len(bundled.ids.options)),
+        ),
+        Benchmark("callbacks.decode", lambda: lambda: decode_callback(quote_data)),
+        Benchmark(
+            "callbacks.decode.legacy",
+            lambda: lambda: f"selection:quote:{product.sku}".split(":")[2],
+        ),
+    ]
+    benchmarks += _dispatch_benchmarks(quote_data, f"selection:quote:{product.sku}")
+
+    for size in selection_sizes:
+        entries = [
+            _selection_entry(products[index % len(products)], index) for index in range(size)
+        ]
+        lines = [entry.to_line() for entry in entries]
+        store_dir = workdir / f"selection_{size}"
+
+        def add(entries: list[Any] = entries, store_dir: Path = store_dir) -> Callable[[], Any]:
+            store = SelectionStore(store_dir / "memory", autosave=False)
+            for entry in entries[:-1]:
+                store.add(1, entry)
+            return lambda: store.add(1, entries[-1])
+
+        def persist(
+            entries: list[Any] = entries,
+            store_dir: Path = store_dir,
+        ) -> Callable[[], Any]:
+            store = SelectionStore(store_dir / "disk", autosave=True)
+            for entry in entries:
+                store.add(1, entry)
+            return lambda: store._persist(1)
+
+        benchmarks += [
+            Benchmark(
+                f"export.selection_to_workbook[{size}]",
+                lambda lines=lines: lambda: selection_to_workbook(lines, customer={"Имя": "Тест"}),
+            ),
+            Benchmark(f"selection_store.add[{size}]", add),
+            Benchmark(f"selection_store._persist[{size}]", persist),
+        ]
+    return benchmarks
+
+
+def _inventory_benchmarks(inventory: Any, size: int) -> list[Benchmark]:
+    # The largest category is the worst case for a linear scan.
+    category = max(inventory.categories(), key=lambda item: len(inventory.search(item.name, {})))
+    filters = _typical_filters(inventory, category.name)
+
+    def search() -> Any:
+        return inventory.search(category.name, filters)
+
+    def filter_options() -> Any:
+        return [inventory.filter_options(category.name, name) for name in category.filters]
+
+    return [
+        Benchmark(f"inventory.search[{size}]", lambda: search),
+        Benchmark(f"inventory.filter_options[{size}]", lambda: filter_options),
+    ]
+
+
+# Callback prefixes in the order the string-matching routers used to try them.
+LEGACY_CALLBACK_PREFIXES = (
+    "catalog:category:",
+    "catalog:filter:",
+    "catalog:skip:",
+    "catalog:filters:back",
+    "catalog:back",
+    "selection:add:",
+    "selection:clear",
+    "selection:export",
+    "selection:send",
+    "selection:samples:",
+    "selection:passport:",
+    "selection:quote:",
+)
+
+
+def _dispatch_benchmarks(data: str, legacy_data: str) -> list[Benchmark]:
+    """Route one ``selection:quote`` press through the action table and the old prefix chain."""
+
+    from aiogram import F, Router
+    from aiogram.types import CallbackQuery, User
+
+    from ..callbacks import Action, CallbackRouter
+
+    async def handler(callback: CallbackQuery) -> None:
+        return None
+
+    def router_setup(router: Router, callback_data: str) -> Callable[[], Callable[[], Any]]:
+        def setup() -> Callable[[], Any]:
+            event = CallbackQuery(
+                id="1",
+                from_user=User(id=1, is_bot=False, first_name="Bench"),
+                chat_instance="1",
+                data=callback_data,
+            )
+            loop = asyncio.new_event_loop()
+
+            def run() -> Any:
+                return loop.run_until_complete(router.callback_query.trigger(event))
+
+            weakref.finalize(run, loop.close)
+            return run
+
+        return setup
+
+    legacy = Router(name="bench-legacy")
+    for prefix in LEGACY_CALLBACK_PREFIXES:
+        legacy.callback_query.register(handler, F.data.startswith(prefix))
+    table = CallbackRouter(name="bench-table")
+    for action in Action:
+        table.action(action)(handler)
+    return [
+        Benchmark("callbacks.dispatch.legacy", router_setup(legacy, legacy_data)),
+        Benchmark("callbacks.dispatch", router_setup(table, data)),
+    ]
+
+
+def _typical_filters(inventory: Any, category: str) -> dict[str, str]:
+    from ..services.inventory_stub import FILTER_KEY_MAP
+
+    descriptor = next(item for item in inventory.categories() if item.name == category)
+    sample = inventory.search(category, {})[0]
+    filters: dict[str, str] = {}
+    for name in descriptor.filters[:2]:
+        value = getattr(sample, FILTER_KEY_MAP.get(name, name), None)
+        if isinstance(value, list):
+            value = value[0] if value else None
+        if value is not None:
+            filters[name] = str(value)
+    return filters
+
+
+def _selection_entry(product: Any, index: int) -> Any:
+    from ..services.selection_store import SelectionEntry
+
+    return SelectionEntry(
+        sku=f"{product.sku}-{index}",
+        name=product.name,
+        category=product.category,
+        brand=product.brand,
+        area_m2=40.0 + index % 50,
+        waste_pct=7,
+        total_m2=round((40.0 + index % 50) * 1.07, 2),
+        pack_step=product.pack_step_m2,
+    )
+
+
+# Running and comparing -------------------------------------------------------------
+
+
+def run_benchmarks(
+    benchmarks: Sequence[Benchmark],
+    name_filter: str | None = None,
+    repeats: int = 5,
+    target_s: float = 0.1,
+    alloc: bool = True,
+) -> Iterator[BenchResult]:
+    for benchmark in benchmarks:
+        if name_filter and name_filter not in benchmark.name:
+            continue
+        func = benchmark.setup()
+        median, best, calls = measure(func, repeats=repeats, target_s=target_s)
+        # Measured after the timing runs: tracemalloc would slow them down several times.
+        alloc_bytes = measure_alloc(func) if alloc else 0.0
+        yield BenchResult(benchmark.name, median * 1e6, best * 1e6, calls, alloc_bytes)
+
+
+def to_baseline(results: Sequence[BenchResult]) -> dict[str, Any]:
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": {result.name: asdict(result) for result in results},
+    }
+
+
+def compare(
+    results: Sequence[BenchResult],
+    baseline: dict[str, Any],
+    threshold: float,
+) -> list[Regression]:
+    """Return benchmarks whose median is slower than baseline × (1 + threshold).
+
+    Benchmarks missing from either side are ignored, so adding or retiring a
+    benchmark does not break the comparison.
+    """
+
+    stored = baseline.get("results", {})
+    regressions = []
+    for result in results:
+        previous = stored.get(result.name)
+        if not previous:
+            continue
+        limit = previous["median_us"] * (1 + threshold)
+        if result.median_us > limit:
+            regressions.append(Regression(result.name, previous["median_us"], result.median_us))
+    return regressions
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark service hot paths.")
+    parser.add_argument(
+        "--save",
+        type=Path,
+        nargs="?",
+        const=DEFAULT_BASELINE,
+        help=f"write results as a JSON baseline (default {DEFAULT_BASELINE.relative_to(BASE_DIR)})",
+    )
+    parser.add_argument(
+        "--compare",
+        type=Path,
+        nargs="?",
+        const=DEFAULT_BASELINE,
+        help="compare with a JSON baseline",
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=0.25, help="allowed slowdown (0.25 = 25%%)"
+    )
+    parser.add_argument("--filter", default=None, help="only run benchmarks containing this text")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="small sizes for smoke runs")
+    args = parser.parse_args(argv)
+
+    catalog_sizes = QUICK_CATALOG_SIZES if args.quick else CATALOG_SIZES
+    selection_sizes = QUICK_SELECTION_SIZES if args.quick else SELECTION_SIZES
+    baseline = None
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+
+    results: list[BenchResult] = []
+    with tempfile.TemporaryDirectory(prefix="lgpol-bench-") as tmp:
+        benchmarks = build_benchmarks(Path(tmp), catalog_sizes, selection_sizes)
+        print(f"{'benchmark':<42} {'median µs':>12} {'min µs':>12} {'alloc B':>10} {'vs base':>8}")
+        for result in run_benchmarks(benchmarks, args.filter, repeats=args.repeats):
+            results.append(result)
+            delta = ""
+            previous = (baseline or {}).get("results", {}).get(result.name)
+            if previous:
+                delta = f"{result.median_us / previous['median_us']:.2f}x"
+            print(
+                f"{result.name:<42} {result.median_us:>12.2f} {result.min_us:>12.2f} "
+                f"{result.alloc_bytes:>10.0f} {delta:>8}"
+            )
+
+    if args.save is not None:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps(to_baseline(results), indent=2) + "\n", encoding="utf-8")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        for item in regressions:
+            print(
+                f"REGRESSION {item.name}: {item.baseline_us:.2f} → {item.current_us:.2f} µs "
+                f"({item.ratio:.2f}x)",
+                file=sys.stderr,
+            )
+        if regressions:
+            return 1
+    return 0
+
+
+__all__ = [
+    "Benchmark",
+    "BenchResult",
+    "Regression",
+    "build_benchmarks",
+    "compare",
+    "measure",
+    "measure_alloc",
+    "run_benchmarks",
+    "to_baseline",
+    "main",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,300 @@
+"""Fake Telegram Bot API server for offline end-to-end and performance runs.
+
+Implements the subset of methods the bot uses with configurable latency,
+``429 Too Many Requests`` injection and per-method request accounting.
+Point the bot at it with ``BOT_API_URL``::
+
+    python -m bot.tools.fake_telegram --port 8081 --latency-ms 40 --flood-every 50
+    BOT_API_URL=http://127.0.0.1:8081 BOT_TOKEN=1:fake python -m bot.main
+
+Updates for long polling are queued with :meth:`FakeTelegram.push_update`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+from collections import Counter, defaultdict
+from itertools import count
+from typing import Any, Sequence
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+BOT_ID = 1
+BOT_PROFILE = {"id": BOT_ID, "is_bot": True, "first_name": "Lgpol", "username": "lgpol_fake_bot"}
+# Longest getUpdates wait the fake honours, whatever the client asks for.
+MAX_POLL_TIMEOUT_S = 30.0
+
+
+class FakeTelegram:
+    """aiohttp application answering Bot API calls like Telegram, without a network.
+
+    ``latency`` (± ``jitter``) delays every answer except long polling, and
+    ``handshake`` additionally delays the first request on each new
+    connection, standing in for TLS setup. With ``flood_every=N`` every N-th
+    call is refused with 429 and ``retry_after``. :attr:`calls` counts requests
+    per method, refused ones included; :attr:`flooded` counts the refusals.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        handshake: float = 0.0,
+        flood_every: int = 0,
+        retry_after: int = 1,
+        seed: int | None = None,
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.handshake = handshake
+        self.flood_every = flood_every
+        self.retry_after = retry_after
+        self.calls: Counter[str] = Counter()
+        self.flooded: Counter[str] = Counter()
+        self.sent: dict[int, list[dict[str, Any]]] = defaultdict(list)
+        self.uploaded_bytes = 0
+        self.webhook_url = ""
+        self.peers: set[Any] = set()
+        self._updates: list[dict[str, Any]] = []
+        self._update_ids = count(1)
+        self._message_ids = count(1_000)
+        self._requests = 0
+        self._new_updates = asyncio.Event()
+        self._random = random.Random(seed)
+        self._runner: web.AppRunner | None = None
+        self.handlers = {
+            "getme": self._get_me,
+            "sendmessage": self._send_message,
+            "editmessagetext": self._edit_message_text,
+            "deletemessage": self._ok,
+            "senddocument": self._send_document,
+            "answercallbackquery": self._ok,
+            "getupdates": self._get_updates,
+            "setwebhook": self._set_webhook,
+            "deletewebhook": self._delete_webhook,
+        }
+
+    # Public API -------------------------------------------------------------------
+
+    @property
+    def connections(self) -> int:
+        return len(self.peers)
+
+    def build_app(self) -> web.Application:
+        app = web.Application(client_max_size=50 * 2**20)
+        app.router.add_route("*", "/bot{token}/{method}", self.handle)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Serve on ``host:port`` (0 picks a free port); returns the base URL."""
+
+        self._runner = web.AppRunner(self.build_app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        return f"http://{host}:{self._runner.addresses[0][1]}"
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def push_update(self, update: dict[str, Any]) -> dict[str, Any]:
+        """Queue an update (Telegram JSON) for ``getUpdates``; assigns ``update_id``."""
+
+        update = {**update, "update_id": update.get("update_id") or next(self._update_ids)}
+        self._updates.append(update)
+        self._new_updates.set()
+        return update
+
+    async def wait_for(self, method: str, calls: int = 1, timeout: float = 10.0) -> None:
+        """Wait until ``method`` has been requested at least ``calls`` times."""
+
+        deadline = time.monotonic() + timeout
+        while self.calls[method] < calls:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{method} called {self.calls[method]} of {calls} times")
+            await asyncio.sleep(0.01)
+
+    def reset(self) -> None:
+        self.calls.clear()
+        self.flooded.clear()
+        self.sent.clear()
+        self.uploaded_bytes = 0
+
+    # Request handling -------------------------------------------------------------
+
+    async def handle(self, request: web.Request) -> web.Response:
+        handler = self.handlers.get(request.match_info["method"].lower())
+        if handler is None:
+            return _error(404, "Not Found: method not found")
+        method = request.match_info["method"]
+        self.calls[method] += 1
+        self._requests += 1
+
+        delay = 0.0
+        peer = request.transport.get_extra_info("peername") if request.transport else None
+        if peer not in self.peers:
+            self.peers.add(peer)
+            delay += self.handshake
+        if self.flood_every and self._requests % self.flood_every == 0:
+            self.flooded[method] += 1
+            return _error(
+                429,
+                f"Too Many Requests: retry after {self.retry_after}",
+                parameters={"retry_after": self.retry_after},
+            )
+
+        params = await _read_params(request)
+        if handler != self._get_updates:
+            delay += self.latency
+            if self.jitter:
+                delay = max(0.0, delay + self._random.uniform(-self.jitter, self.jitter))
+        if delay:
+            await asyncio.sleep(delay)
+        return web.json_response({"ok": True, "result": await handler(params)})
+
+    async def _ok(self, params: dict[str, Any]) -> Any:
+        return True
+
+    async def _get_me(self, params: dict[str, Any]) -> Any:
+        return BOT_PROFILE
+
+    async def _send_message(self, params: dict[str, Any]) -> Any:
+        return self._message(params, next(self._message_ids), text=params.get("text"))
+
+    async def _edit_message_text(self, params: dict[str, Any]) -> Any:
+        if "inline_message_id" in params:
+            return True
+        return self._message(params, int(params.get("message_id", 0)), text=params.get("text"))
+
+    async def _send_document(self, params: dict[str, Any]) -> Any:
+        document = params.get("document")
+        if isinstance(document, str) and document.startswith("attach://"):
+            document = params.get(document.removeprefix("attach://"))
+        file_name = "document"
+        if isinstance(document, web.FileField):
+            file_name = document.filename or file_name
+            self.uploaded_bytes += len(document.file.read())
+        message = self._message(params, next(self._message_ids), caption=params.get("caption"))
+        file_id = f"doc-{message['message_id']}"
+        message["document"] = {
+            "file_id": file_id,
+            "file_unique_id": file_id,
+            "file_name": file_name,
+        }
+        return message
+
+    async def _get_updates(self, params: dict[str, Any]) -> Any:
+        offset = int(params.get("offset") or 0)
+        self._updates = [update for update in self._updates if update["update_id"] >= offset]
+        if not self._updates:
+            self._new_updates.clear()
+            wait = min(float(params.get("timeout") or 0), MAX_POLL_TIMEOUT_S)
+            if wait:
+                try:
+                    await asyncio.wait_for(self._new_updates.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+        limit = int(params.get("limit") or 100)
+        return self._updates[:limit]
+
+    async def _set_webhook(self, params: dict[str, Any]) -> Any:
+        self.webhook_url = params.get("url", "")
+        if _flag(params.get("drop_pending_updates")):
+            self._updates.clear()
+        return True
+
+    async def _delete_webhook(self, params: dict[str, Any]) -> Any:
+        self.webhook_url = ""
+        if _flag(params.get("drop_pending_updates")):
+            self._updates.clear()
+        return True
+
+    def _message(self, params: dict[str, Any], message_id: int, **content: Any) -> dict[str, Any]:
+        chat_id = int(params.get("chat_id", 0))
+        chat: dict[str, Any] = {"id": chat_id, "type": "private"}
+        if chat_id < 0:
+            chat = {"id": chat_id, "type": "supergroup", "title": "Managers"}
+        message: dict[str, Any] = {
+            "message_id": message_id,
+            "date": int(time.time()),
+            "chat": chat,
+            "from": BOT_PROFILE,
+        }
+        message.update((key, value) for key, value in content.items() if value is not None)
+        markup = params.get("reply_markup")
+        if isinstance(markup, str):
+            markup = json.loads(markup)
+        # Only inline keyboards are part of a Message object.
+        if isinstance(markup, dict) and "inline_keyboard" in markup:
+            message["reply_markup"] = markup
+        self.sent[chat_id].append(message)
+        return message
+
+
+async def _read_params(request: web.Request) -> dict[str, Any]:
+    if request.content_type == "application/json":
+        return dict(await request.json())
+    params: dict[str, Any] = dict(request.query)
+    if request.can_read_body:
+        params.update(await request.post())
+    return params
+
+
+def _flag(value: Any) -> bool:
+    return str(value).lower() in {"1", "true"}
+
+
+def _error(status: int, description: str, **extra: Any) -> web.Response:
+    return web.json_response(
+        {"ok": False, "error_code": status, "description": description, **extra}, status=status
+    )
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    fake = FakeTelegram(
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        flood_every=args.flood_every,
+        retry_after=args.retry_after,
+    )
+    url = await fake.start(args.host, args.port)
+    logger.info("Fake Bot API listening on %s", url)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await fake.stop()
+        for method, calls in sorted(fake.calls.items()):
+            print(f"{method:<22} {calls:>8} calls {fake.flooded[method]:>6} refused")
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run a fake Telegram Bot API server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--flood-every", type=int, default=0, help="refuse every N-th call (429)")
+    parser.add_argument("--retry-after", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+__all__ = ["FakeTelegram", "main"]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
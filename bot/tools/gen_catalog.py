@@ -0,0 +1,563 @@
+"""Seeded synthetic datasets for scale testing.
+
+Generates an ``InventoryStub`` catalog (10k–1M products), a matching
+``PricingStub`` price file and bulk ``selection_<user>.json`` files. The
+bundled ``data/catalog.json`` provides the categories, filters and attribute
+vocabulary; extra values are added to reach realistic cardinalities. Usage::
+
+    python -m bot.tools.gen_catalog --size 100000 --users 5000 --out tmp/dataset-100k
+
+The output directory is a complete data dir (text assets are copied), so it
+can be passed to the bot tools as ``--data-dir``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import shutil
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import date, timedelta
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, Iterator, Sequence
+
+from ..config import BASE_DIR
+
+# Bump when the output for a given (size, seed) changes, so cached datasets are rebuilt.
+GENERATOR_VERSION = 1
+TEXT_ASSETS = ("styles.yaml", "company.json", "delivery.md", "faq.md")
+SOURCE_CATALOG = BASE_DIR / "data" / "catalog.json"
+
+# Target number of distinct values per attribute within a category.
+CARDINALITY: dict[str, int] = {
+    "brand": 60,
+    "country": 14,
+    "use": 24,
+    "props": 16,
+    "color": 48,
+    "pattern": 12,
+    "backing": 8,
+    "fiber": 8,
+    "composition": 4,
+    "pile_type": 4,
+    "pile_height": 4,
+    "fire_cert": 5,
+    "lock": 4,
+    "shape": 4,
+}
+LIST_ATTRIBUTES = {"use": (1, 3), "props": (0, 4)}
+EXTRA_VALUES: dict[str, list[str]] = {
+    "country": [
+        "Германия",
+        "Италия",
+        "Польша",
+        "Китай",
+        "Турция",
+        "Беларусь",
+        "Франция",
+        "Бельгия",
+        "Нидерланды",
+        "Венгрия",
+        "Словения",
+        "США",
+        "Сербия",
+        "Россия",
+    ],
+    "use": [
+        "Для офиса",
+        "Для гостиниц",
+        "Для школы",
+        "Для квартиры",
+        "Для кухни",
+        "Для спальни",
+        "Для детской",
+        "Для ресторана",
+        "Для торговых зон",
+        "Для спортзалов",
+        "Для входных зон",
+        "Для мед. учреждений",
+        "Для лабораторий",
+        "Для коридора",
+        "Для склада",
+        "Для шоурума",
+        "Для кинотеатра",
+        "Для библиотеки",
+        "Для аэропорта",
+        "Для банка",
+        "Для фитнес-клуба",
+        "Для салона красоты",
+        "Для музея",
+        "Для аптеки",
+    ],
+    "props": [
+        "Противоскользящий",
+        "Легко убирается",
+        "Бактерицидный",
+        "Антистатический",
+        "Звукоизоляция",
+        "Износостойкий",
+        "Токопроводящий",
+        "Влагостойкий",
+        "Тёплый пол",
+        "Огнестойкий",
+        "Гипоаллергенный",
+        "УФ-стойкий",
+        "Химстойкий",
+        "Экологичный",
+        "Морозостойкий",
+        "Шумопоглощающий",
+    ],
+    "color": [
+        "Серый",
+        "Антрацит",
+        "Бежевый",
+        "Синий",
+        "Бордовый",
+        "Графит",
+        "Оливковый",
+        "Белый",
+        "Чёрный",
+        "Коричневый",
+        "Терракотовый",
+        "Песочный",
+        "Мятный",
+        "Лазурный",
+        "Изумрудный",
+        "Горчичный",
+        "Слоновая кость",
+        "Шоколадный",
+        "Дымчатый",
+        "Мокко",
+        "Дуб натуральный",
+        "Дуб серый",
+        "Дуб беленый",
+        "Орех",
+        "Венге",
+        "Ясень",
+        "Клён",
+        "Бетон серый",
+        "Мрамор белый",
+        "Сланец",
+        "Пепельный",
+        "Карамельный",
+        "Кремовый",
+        "Индиго",
+        "Бирюзовый",
+        "Лавандовый",
+        "Вишнёвый",
+        "Медный",
+        "Латунный",
+        "Угольный",
+        "Голубой",
+        "Розовый",
+        "Жёлтый",
+        "Оранжевый",
+        "Красный",
+        "Зелёный",
+        "Фиолетовый",
+        "Сизый",
+    ],
+    "pattern": [
+        "Однотонный",
+        "Меланж",
+        "Геометрический",
+        "Орнаментальный",
+        "Линейный",
+        "Винтажный",
+        "Паркет",
+        "Камень",
+        "Бетон",
+        "Абстрактный",
+        "Полосы",
+        "Клетка",
+    ],
+}
+BRAND_PARTS = (
+    [
+        "Nord",
+        "Terra",
+        "Prime",
+        "Soft",
+        "Urban",
+        "Eco",
+        "Grand",
+        "Alpha",
+        "Vita",
+        "Luxe",
+        "Stone",
+        "Wood",
+        "Flex",
+        "Opti",
+        "Mega",
+        "Pro",
+    ],
+    ["floor", "line", "tex", "step", "craft", "form", "base", "tile", "weave", "loom"],
+)
+PRICE_RANGES: dict[str, tuple[float, float]] = {
+    "Ковролин": (650.0, 3200.0),
+    "Ковровая плитка": (900.0, 4200.0),
+    "Линолеум": (450.0, 2200.0),
+    "ПВХ плитка": (800.0, 3800.0),
+}
+
+
+@dataclass(slots=True)
+class DatasetPaths:
+    """Files of a generated dataset."""
+
+    data_dir: Path
+    catalog: Path
+    pricing: Path
+    selections_dir: Path
+
+
+class _Weighted:
+    """Zipf-weighted choice: a few values are common, most are rare."""
+
+    def __init__(self, values: Sequence[str], exponent: float = 1.1) -> None:
+        self.values = list(values)
+        self._cumulative = list(
+            accumulate(1 / (rank + 1) ** exponent for rank in range(len(self.values)))
+        )
+
+    def pick(self, rng: random.Random) -> str:
+        point = rng.random() * self._cumulative[-1]
+        return self.values[bisect_left(self._cumulative, point)]
+
+    def sample(self, rng: random.Random, low: int, high: int) -> list[str]:
+        wanted = rng.randint(low, min(high, len(self.values)))
+        chosen: list[str] = []
+        while len(chosen) < wanted:
+            value = self.pick(rng)
+            if value not in chosen:
+                chosen.append(value)
+        return chosen
+
+
+# Catalog ---------------------------------------------------------------------------
+
+
+def load_source(path: Path = SOURCE_CATALOG) -> dict[str, Any]:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _vocabulary(category: str, products: list[dict[str, Any]]) -> dict[str, _Weighted]:
+    rng = random.Random(f"vocabulary:{category}")
+    attributes = sorted({key for product in products for key in product} & set(CARDINALITY))
+    vocabulary: dict[str, _Weighted] = {}
+    for attribute in attributes:
+        seen = _template_values(products, attribute)
+        target = CARDINALITY[attribute]
+        _add_extras(seen, EXTRA_VALUES.get(attribute, []), target, rng)
+        if attribute == "brand":
+            _add_brands(seen, target, rng)
+        else:
+            _add_numbered(seen, target)
+        vocabulary[attribute] = _Weighted(seen)
+    return vocabulary
+
+
+def _template_values(products: list[dict[str, Any]], attribute: str) -> list[str]:
+    seen: list[str] = []
+    for product in products:
+        raw = product.get(attribute)
+        for value in raw if isinstance(raw, list) else [raw]:
+            if value is not None and value not in seen:
+                seen.append(str(value))
+    return seen
+
+
+def _add_extras(seen: list[str], extras: list[str], target: int, rng: random.Random) -> None:
+    extras = list(extras)
+    rng.shuffle(extras)
+    for value in extras:
+        if len(seen) >= target:
+            break
+        if value not in seen:
+            seen.append(value)
+
+
+def _add_brands(seen: list[str], target: int, rng: random.Random) -> None:
+    while len(seen) < target:
+        name = rng.choice(BRAND_PARTS[0]) + rng.choice(BRAND_PARTS[1]).capitalize()
+        if name not in seen:
+            seen.append(name)
+
+
+def _add_numbered(seen: list[str], target: int) -> None:
+    """Pad with numbered copies of the known values: «Серый 2», «Бежевый 2», ..."""
+
+    suffix = 2
+    base = list(seen)
+    while len(seen) < target and base:
+        seen.append(f"{base[len(seen) % len(base)]} {suffix}")
+        if len(seen) % len(base) == 0:
+            suffix += 1
+
+
+def _category_sizes(source: dict[str, Any], size: int) -> dict[str, int]:
+    names = list(source)
+    sizes = {name: size // len(names) for name in names}
+    for name in names[: size % len(names)]:
+        sizes[name] += 1
+    return sizes
+
+
+def iter_products(
+    category: str,
+    template: dict[str, Any],
+    count: int,
+    seed: int,
+) -> Iterator[dict[str, Any]]:
+    """Yield ``count`` schema-valid product dicts for ``category``."""
+
+    products = template.get("products", [])
+    vocabulary = _vocabulary(category, products)
+    prefix = (products[0]["sku"].split("-")[0] if products else category[:2].upper()) or "SKU"
+    prefix = prefix.replace("-", "")
+    steps = sorted({float(item["pack_step_m2"]) for item in products if item.get("pack_step_m2")})
+    classes = _Weighted(
+        sorted({item.get("class") for item in products if item.get("class")}) or ["Коммерческий"]
+    )
+    rng = random.Random(f"{seed}:{category}")
+    for index in range(count):
+        brand = vocabulary["brand"].pick(rng) if "brand" in vocabulary else "Generic"
+        product: dict[str, Any] = {
+            "sku": f"{prefix}-G{seed}-{index:07d}",
+            "name": f"{category} {brand} {rng.randint(100, 999)}-{index}",
+            "brand": brand,
+            "class": classes.pick(rng),
+        }
+        for attribute, values in vocabulary.items():
+            if attribute == "brand":
+                continue
+            if attribute in LIST_ATTRIBUTES:
+                low, high = LIST_ATTRIBUTES[attribute]
+                product[attribute] = values.sample(rng, low, high)
+            else:
+                product[attribute] = values.pick(rng)
+        if steps:
+            step = rng.choice(steps)
+            product["pack_step_m2"] = step
+            if rng.random() < 0.1:
+                product["pack_sizes_m2"] = sorted({step, round(step * 1.5, 2)})
+        yield product
+
+
+def write_catalog(
+    path: Path,
+    size: int,
+    seed: int = 0,
+    source: dict[str, Any] | None = None,
+) -> int:
+    """Stream a catalog with ``size`` products to ``path``; returns the product count."""
+
+    source = source or load_source()
+    sizes = _category_sizes(source, size)
+    written = 0
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as handle:
+        handle.write("{")
+        for position, (category, template) in enumerate(source.items()):
+            if position:
+                handle.write(",")
+            handle.write(f'\n{json.dumps(category, ensure_ascii=False)}: {{"filters": ')
+            handle.write(json.dumps(template.get("filters", []), ensure_ascii=False))
+            handle.write(', "products": [')
+            products = iter_products(category, template, sizes[category], seed)
+            for index, product in enumerate(products):
+                handle.write(",\n" if index else "\n")
+                handle.write(json.dumps(product, ensure_ascii=False))
+                written += 1
+            handle.write("\n]}")
+        handle.write("\n}\n")
+    return written
+
+
+# Pricing and selections ------------------------------------------------------------
+
+
+def write_pricing(
+    path: Path,
+    catalog_path: Path,
+    seed: int = 0,
+    promos: int = 20,
+    today: date | None = None,
+) -> int:
+    """Write a ``PricingStub`` file with a price for ~97% of SKUs and ``promos`` promos."""
+
+    today = today or date.today()
+    rng = random.Random(f"{seed}:pricing")
+    catalog = json.loads(catalog_path.read_text(encoding="utf-8"))
+    prices: dict[str, float] = {}
+    skus_by_category: dict[str, list[str]] = {}
+    for category, payload in catalog.items():
+        low, high = PRICE_RANGES.get(category, (500.0, 3000.0))
+        brand_factor: dict[str, float] = {}
+        skus = skus_by_category.setdefault(category, [])
+        for product in payload.get("products", []):
+            skus.append(product["sku"])
+            if rng.random() < 0.03:
+                continue  # price on request
+            factor = brand_factor.setdefault(product["brand"], rng.uniform(0.8, 1.25))
+            value = rng.triangular(low, high, low + (high - low) * 0.35) * factor
+            prices[product["sku"]] = round(value / 5) * 5.0
+
+    promo_items = []
+    categories = [name for name, skus in skus_by_category.items() if skus]
+    for number in range(promos if categories else 0):
+        category = rng.choice(categories)
+        pool = skus_by_category[category]
+        expired = rng.random() < 0.2
+        days = rng.randint(-60, -1) if expired else rng.randint(7, 180)
+        valid_until = today + timedelta(days=days)
+        promo_items.append(
+            {
+                "code": f"GEN-{seed}-{number:03d}",
+                "title": f"-{(number % 4 + 1) * 3}% на {category.lower()} из акции {number}",
+                "description": "Синтетическая акция для нагрузочных тестов.",
+                "valid_until": valid_until.isoformat(),
+                "skus": rng.sample(pool, min(len(pool), rng.randint(5, 200))),
+                "discount_pct": float((number % 4 + 1) * 3),
+                "min_m2": float(rng.choice([0, 50, 100, 300])),
+            }
+        )
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps({"prices": prices, "promos": promo_items}, ensure_ascii=False),
+        encoding="utf-8",
+    )
+    return len(prices)
+
+
+def write_selections(
+    directory: Path,
+    catalog_path: Path,
+    users: int,
+    seed: int = 0,
+    first_user_id: int = 10_000,
+    max_items: int = 12,
+) -> int:
+    """Write ``selection_<user>.json`` files in the ``SelectionStore`` format."""
+
+    rng = random.Random(f"{seed}:selections")
+    catalog = json.loads(catalog_path.read_text(encoding="utf-8"))
+    products = [
+        (category, product)
+        for category, payload in catalog.items()
+        for product in payload.get("products", [])
+    ]
+    directory.mkdir(parents=True, exist_ok=True)
+    if not products:
+        return 0
+    for offset in range(users):
+        entries = []
+        picked = rng.sample(products, min(len(products), rng.randint(1, max_items)))
+        for category, product in picked:
+            area = round(rng.uniform(8, 400), 1)
+            waste = rng.choice([3, 5, 7, 10])
+            entries.append(
+                {
+                    "sku": product["sku"],
+                    "name": product["name"],
+                    "category": category,
+                    "brand": product["brand"],
+                    "area_m2": area,
+                    "waste_pct": waste,
+                    "total_m2": round(area * (1 + waste / 100), 2),
+                    "pack_step": product.get("pack_step_m2"),
+                    "notes": None,
+                }
+            )
+        path = directory / f"selection_{first_user_id + offset}.json"
+        path.write_text(json.dumps(entries, ensure_ascii=False, indent=2), encoding="utf-8")
+    return users
+
+
+# Datasets --------------------------------------------------------------------------
+
+
+def write_dataset(
+    out_dir: Path,
+    size: int,
+    seed: int = 0,
+    users: int = 0,
+    promos: int = 20,
+    selections_dir: Path | None = None,
+) -> DatasetPaths:
+    """Write a complete data dir: catalog, pricing, text assets and optional selections."""
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for name in TEXT_ASSETS:
+        source = BASE_DIR / "data" / name
+        if source.exists():
+            shutil.copyfile(source, out_dir / name)
+    paths = DatasetPaths(
+        data_dir=out_dir,
+        catalog=out_dir / "catalog.json",
+        pricing=out_dir / "pricing.json",
+        selections_dir=selections_dir or out_dir / "tmp",
+    )
+    write_catalog(paths.catalog, size, seed)
+    write_pricing(paths.pricing, paths.catalog, seed, promos)
+    if users:
+        write_selections(paths.selections_dir, paths.catalog, users, seed)
+    return paths
+
+
+def ensure_dataset(root: Path, size: int, seed: int = 0, users: int = 0) -> DatasetPaths:
+    """Return a cached dataset under ``root``, generating it on first use."""
+
+    out_dir = root / f"dataset-v{GENERATOR_VERSION}-{size}-s{seed}-u{users}"
+    marker = out_dir / ".complete"
+    if marker.exists():
+        return DatasetPaths(
+            data_dir=out_dir,
+            catalog=out_dir / "catalog.json",
+            pricing=out_dir / "pricing.json",
+            selections_dir=out_dir / "tmp",
+        )
+    paths = write_dataset(out_dir, size, seed, users)
+    marker.write_text("ok\n", encoding="utf-8")
+    return paths
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a seeded synthetic dataset.")
+    parser.add_argument("--size", type=int, default=10_000, help="number of products")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--users", type=int, default=0, help="selection files to generate")
+    parser.add_argument("--promos", type=int, default=20)
+    parser.add_argument("--out", type=Path, required=True, help="output data directory")
+    parser.add_argument("--selections-dir", type=Path, default=None, help="default: <out>/tmp")
+    args = parser.parse_args(argv)
+
+    paths = write_dataset(
+        args.out, args.size, args.seed, args.users, args.promos, args.selections_dir
+    )
+    print(f"catalog:    {paths.catalog}")
+    print(f"pricing:    {paths.pricing}")
+    if args.users:
+        print(f"selections: {paths.selections_dir} ({args.users} users)")
+    return 0
+
+
+__all__ = [
+    "DatasetPaths",
+    "GENERATOR_VERSION",
+    "ensure_dataset",
+    "iter_products",
+    "write_catalog",
+    "write_dataset",
+    "write_pricing",
+    "write_selections",
+    "main",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,469 @@
+"""Load-test the dispatcher with synthetic users walking the real flows.
+
+Updates are fed straight into ``Dispatcher.feed_update``; Bot API calls go to
+:class:`~bot.tools.synthetic.FakeSession` with configurable latency. Usage::
+
+    python -m bot.tools.loadtest --users 2000 --latency-ms 40 --flows catalog,wizard,export
+    python -m bot.tools.loadtest --users 500 --catalog-size 100000 --preload-selections 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field, replace
+from math import ceil
+from pathlib import Path
+from typing import Sequence
+
+from aiogram import Bot, Dispatcher
+from aiogram.client.default import DefaultBotProperties
+from aiogram.enums import ParseMode
+from aiogram.types import Update
+
+from ..config import BASE_DIR, Settings
+from ..context import AppContext, set_app_context
+from .gen_catalog import write_dataset, write_selections
+from .synthetic import TEST_TOKEN, FakeSession, SentMessage, UpdateFactory
+
+FLOWS = ("start", "catalog", "wizard", "selection", "export", "samples")
+ADD_BUTTON = "➕ В подборку"
+EXPORT_BUTTON = "📊 Экспорт XLSX"
+CONSENT_BUTTON = "✅ Согласен"
+SAMPLES_CONFIRM_BUTTON = "Отправить менеджеру"
+NAVIGATION_BUTTONS = {"Пропустить", "⬅️ Назад", "⬅️ В меню"}
+SAMPLES_LABEL = "📦 Образцы"
+FIRST_USER_ID = 10_000
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class LoadConfig:
+    users: int = 500
+    concurrency: int | None = None
+    flows: tuple[str, ...] = FLOWS
+    latency_ms: float = 30.0
+    jitter_ms: float = 10.0
+    think_ms: float = 0.0
+    seed: int = 1
+    data_dir: Path = BASE_DIR / "data"
+    rate_limit: bool = False
+    autosave: bool = True
+    trace_memory: bool = False
+    catalog_size: int | None = None
+    preload_selections: int = 0
+
+
+@dataclass(slots=True)
+class FlowStats:
+    flow: str
+    updates: int
+    errors: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+@dataclass(slots=True)
+class LoadReport:
+    users: int
+    updates: int
+    errors: int
+    wall_s: float
+    throughput: float
+    rss_start_mb: float
+    rss_end_mb: float
+    heap_growth_mb: float | None
+    api_calls: dict[str, int]
+    flows: list[FlowStats] = field(default_factory=list)
+
+    def as_text(self) -> str:
+        width = max([10, *(len(stats.flow) for stats in self.flows)])
+        rows = [
+            f"users={self.users} updates={self.updates} errors={self.errors} "
+            f"wall={self.wall_s:.2f}s throughput={self.throughput:.1f} upd/s",
+            f"rss {self.rss_start_mb:.1f} → {self.rss_end_mb:.1f} MB"
+            + (f", python heap +{self.heap_growth_mb:.1f} MB" if self.heap_growth_mb else ""),
+            "",
+            f"{'flow':<{width}} {'updates':>8} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} "
+            f"{'p99 ms':>9} {'max ms':>9}",
+        ]
+        for stats in self.flows:
+            rows.append(
+                f"{stats.flow:<{width}} {stats.updates:>8} {stats.errors:>7} {stats.p50_ms:>9.2f} "
+                f"{stats.p95_ms:>9.2f} {stats.p99_ms:>9.2f} {stats.max_ms:>9.2f}"
+            )
+        calls = ", ".join(f"{name}={value}" for name, value in sorted(self.api_calls.items()))
+        rows += ["", f"Bot API calls: {calls}"]
+        return "\n".join(rows)
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile; ``0.0`` for an empty sequence."""
+
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def rss_mb() -> float:
+    """Current resident set size (peak RSS where /proc is unavailable)."""
+
+    try:
+        with open("/proc/self/statm", encoding="ascii") as handle:
+            pages = int(handle.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+class LoadHarness:
+    """Own the dispatcher, fake bot and latency samples for one run."""
+
+    def __init__(self, config: LoadConfig, tmp_dir: Path) -> None:
+        # Imported lazily so `--help` does not build the whole application.
+        from ..main import build_app_context, build_dispatcher
+
+        self.config = config
+        self.settings = Settings(
+            bot_token=TEST_TOKEN,
+            manager_chat_id=-1,
+            data_dir=config.data_dir,
+            tmp_dir=tmp_dir,
+            autosave_selection=config.autosave,
+        )
+        self.context: AppContext = build_app_context(self.settings)
+        labels = self.context.text_library.styles.setdefault("menu_labels", {})
+        if not labels.get("samples"):
+            # The samples form is hidden from the menu by default; expose it for the run.
+            labels["samples"] = SAMPLES_LABEL
+        set_app_context(self.context)
+        self.dispatcher: Dispatcher = build_dispatcher(rate_limit=config.rate_limit)
+        self.session = FakeSession(
+            latency=config.latency_ms / 1000,
+            jitter=config.jitter_ms / 1000,
+            seed=config.seed,
+        )
+        self.bot = Bot(
+            token=TEST_TOKEN,
+            session=self.session,
+            default=DefaultBotProperties(parse_mode=ParseMode.HTML),
+        )
+        self.updates = UpdateFactory()
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    async def feed(self, flow: str, update: Update) -> None:
+        started = time.perf_counter()
+        try:
+            await self.dispatcher.feed_update(self.bot, update)
+        except Exception:
+            if not self.errors[flow]:
+                logger.exception("Update failed in flow %s", flow)
+            self.errors[flow] += 1
+        finally:
+            self.samples[flow].append((time.perf_counter() - started) * 1000)
+
+    async def run(self) -> LoadReport:
+        config = self.config
+        users = [VirtualUser(self, FIRST_USER_ID + index) for index in range(config.users)]
+        semaphore = asyncio.Semaphore(config.concurrency or config.users)
+
+        async def run_user(user: VirtualUser) -> None:
+            async with semaphore:
+                await user.run(config.flows)
+
+        gc.collect()
+        rss_start = rss_mb()
+        heap_start = None
+        if config.trace_memory:
+            tracemalloc.start()
+            heap_start = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        await asyncio.gather(*(run_user(user) for user in users))
+        wall = time.perf_counter() - started
+        heap_growth = None
+        if heap_start is not None:
+            heap_growth = (tracemalloc.get_traced_memory()[0] - heap_start) / 2**20
+            tracemalloc.stop()
+
+        return self.report(config.users, wall, rss_start, heap_growth)
+
+    def report(
+        self,
+        users: int,
+        wall: float,
+        rss_start: float,
+        heap_growth: float | None = None,
+    ) -> LoadReport:
+        """Summarise the collected samples; known flows first, other labels sorted."""
+
+        updates = sum(len(values) for values in self.samples.values())
+        labels = [flow for flow in FLOWS if self.samples.get(flow)]
+        labels += sorted(label for label in self.samples if label not in FLOWS)
+        return LoadReport(
+            users=users,
+            updates=updates,
+            errors=sum(self.errors.values()),
+            wall_s=wall,
+            throughput=updates / wall if wall else 0.0,
+            rss_start_mb=rss_start,
+            rss_end_mb=rss_mb(),
+            heap_growth_mb=heap_growth,
+            api_calls=dict(self.session.stats.calls),
+            flows=[
+                FlowStats(
+                    flow=label,
+                    updates=len(self.samples[label]),
+                    errors=self.errors.get(label, 0),
+                    p50_ms=percentile(self.samples[label], 50),
+                    p95_ms=percentile(self.samples[label], 95),
+                    p99_ms=percentile(self.samples[label], 99),
+                    max_ms=max(self.samples[label]),
+                )
+                for label in labels
+            ],
+        )
+
+    async def close(self) -> None:
+        await self.bot.session.close()
+
+
+class VirtualUser:
+    """One synthetic customer pressing the buttons the bot actually rendered."""
+
+    def __init__(self, harness: LoadHarness, user_id: int) -> None:
+        self.harness = harness
+        self.user_id = user_id
+        self.random = random.Random(harness.config.seed * 1_000_003 + user_id)
+        self.labels = harness.context.text_library.menu_labels()
+        self.cards: list[SentMessage] = []
+        self.summary: SentMessage | None = None
+
+    # Primitives --------------------------------------------------------------------
+
+    async def send(self, flow: str, text: str) -> list[SentMessage]:
+        await self._think()
+        self.harness.session.take_inbox(self.user_id)
+        await self.harness.feed(flow, self.harness.updates.message(self.user_id, text))
+        return self._collect()
+
+    async def press(self, flow: str, message: SentMessage, data: str) -> list[SentMessage]:
+        await self._think()
+        self.harness.session.take_inbox(self.user_id)
+        update = self.harness.updates.callback(self.user_id, data, message.message_id)
+        await self.harness.feed(flow, update)
+        return self._collect()
+
+    def _collect(self) -> list[SentMessage]:
+        received = self.harness.session.take_inbox(self.user_id)
+        cards = [message for message in received if _find(message, ADD_BUTTON)]
+        if cards:
+            self.cards = cards
+        for message in received:
+            if _find(message, EXPORT_BUTTON):
+                self.summary = message
+        return received
+
+    async def _think(self) -> None:
+        think = self.harness.config.think_ms
+        if think:
+            await asyncio.sleep(self.random.uniform(0.5, 1.5) * think / 1000)
+
+    # Flows -------------------------------------------------------------------------
+
+    async def run(self, flows: Sequence[str]) -> None:
+        for flow in flows:
+            await getattr(self, f"flow_{flow}")()
+
+    async def flow_start(self) -> None:
+        await self.send("start", "/start")
+
+    async def flow_catalog(self) -> None:
+        received = await self.send("catalog", self.labels.get("catalog", "🛍 Каталог"))
+        for _ in range(12):
+            if any(_find(message, ADD_BUTTON) for message in received):
+                return
+            choice = self._choose_button(received)
+            if choice is None:
+                return
+            message, data = choice
+            received = await self.press("catalog", message, data)
+
+    async def flow_wizard(self) -> None:
+        options = self.harness.context.text_library.picker_options()
+        await self.send("wizard", self.labels.get("pick", "🧭 Подбор"))
+        for key in ("application_area", "material_type", "usage_class", "design_preferences"):
+            values = options.get(key) or ["Любой"]
+            await self.send("wizard", self.random.choice(values))
+        metrics = self.random.choice(["120 7", "40+25 5", "5x8 7", "5x8+3x4 5", "64 10"])
+        await self.send("wizard", metrics)
+        await self.send("wizard", str(self.random.choice([900, 1300, 1800, 2500])))
+
+    async def flow_selection(self) -> None:
+        if not self.cards:
+            await self.flow_catalog()
+        if not self.cards:
+            return
+        card = self.random.choice(self.cards)
+        data = _find(card, ADD_BUTTON)
+        assert data is not None
+        received = await self.press("selection", card, data)
+        if self.summary is None or not any(_find(item, EXPORT_BUTTON) for item in received):
+            await self.send("selection", self.random.choice(["120 7", "40+25 7", "5x8 5"]))
+
+    async def flow_export(self) -> None:
+        if self.summary is None:
+            await self.flow_selection()
+        if self.summary is None:
+            return
+        data = _find(self.summary, EXPORT_BUTTON)
+        assert data is not None
+        await self.press("export", self.summary, data)
+
+    async def flow_samples(self) -> None:
+        await self.send("samples", self.labels.get("samples", SAMPLES_LABEL))
+        for text in (
+            f"User {self.user_id}",
+            "ООО Тест",
+            f"+7900{self.user_id:07d}",
+            f"user{self.user_id}@example.com",
+            "Москва, ул. Тестовая, 1",
+        ):
+            await self.send("samples", text)
+        received = await self.send("samples", "-")
+        for button in (CONSENT_BUTTON, SAMPLES_CONFIRM_BUTTON):
+            target = next((item for item in received if _find(item, button)), None)
+            if target is None:
+                return
+            received = await self.press("samples", target, _find(target, button) or "")
+
+    def _choose_button(self, received: list[SentMessage]) -> tuple[SentMessage, str] | None:
+        keyboards = [message for message in received if message.buttons()]
+        if not keyboards:
+            return None
+        message = keyboards[-1]
+        buttons = message.buttons()
+        options = [data for text, data in buttons if text not in NAVIGATION_BUTTONS]
+        skips = [data for text, data in buttons if text == "Пропустить"]
+        if skips and (not options or self.random.random() < 0.2):
+            return message, skips[0]
+        if not options:
+            return None
+        return message, self.random.choice(options)
+
+
+def _find(message: SentMessage, text: str) -> str | None:
+    for label, data in message.buttons():
+        if label == text:
+            return data
+    return None
+
+
+async def run_load(config: LoadConfig) -> LoadReport:
+    with tempfile.TemporaryDirectory(prefix="lgpol-load-") as tmp:
+        tmp_dir = Path(tmp)
+        if config.catalog_size:
+            dataset = write_dataset(tmp_dir / "data", config.catalog_size, seed=config.seed)
+            config = replace(config, data_dir=dataset.data_dir)
+        if config.preload_selections:
+            # Same ids as the virtual users, so they start with a non-empty selection.
+            write_selections(
+                tmp_dir,
+                config.data_dir / "catalog.json",
+                config.preload_selections,
+                seed=config.seed,
+                first_user_id=FIRST_USER_ID,
+            )
+        harness = LoadHarness(config, tmp_dir)
+        try:
+            return await harness.run()
+        finally:
+            await harness.close()
+
+
+def parse_args(argv: Sequence[str] | None = None) -> tuple[LoadConfig, Path | None]:
+    parser = argparse.ArgumentParser(description="Load-test the dispatcher with synthetic users.")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=None, help="default: all users")
+    parser.add_argument("--flows", default=",".join(FLOWS), help=f"subset of {','.join(FLOWS)}")
+    parser.add_argument("--latency-ms", type=float, default=30.0, help="fake Bot API latency")
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--think-ms", type=float, default=0.0, help="pause between user actions")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--data-dir", type=Path, default=BASE_DIR / "data")
+    parser.add_argument("--rate-limit", action="store_true", help="keep RateLimitMiddleware on")
+    parser.add_argument("--no-autosave", action="store_true", help="disable selection autosave")
+    parser.add_argument(
+        "--catalog-size", type=int, default=None, help="use a generated catalog of N products"
+    )
+    parser.add_argument(
+        "--preload-selections", type=int, default=0, help="users with a saved selection at start"
+    )
+    parser.add_argument("--trace-memory", action="store_true", help="measure heap via tracemalloc")
+    parser.add_argument("--json", type=Path, default=None, help="also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    flows = tuple(flow.strip() for flow in args.flows.split(",") if flow.strip())
+    unknown = set(flows) - set(FLOWS)
+    if unknown:
+        parser.error(f"unknown flows: {', '.join(sorted(unknown))}")
+    config = LoadConfig(
+        users=args.users,
+        concurrency=args.concurrency,
+        flows=flows,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        think_ms=args.think_ms,
+        seed=args.seed,
+        data_dir=args.data_dir,
+        rate_limit=args.rate_limit,
+        autosave=not args.no_autosave,
+        trace_memory=args.trace_memory,
+        catalog_size=args.catalog_size,
+        preload_selections=args.preload_selections,
+    )
+    return config, args.json
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    config, json_path = parse_args(argv)
+    report = asyncio.run(run_load(config))
+    print(report.as_text())
+    if json_path is not None:
+        json_path.write_text(json.dumps(asdict(report), indent=2, ensure_ascii=False))
+    return 1 if report.errors else 0
+
+
+__all__ = [
+    "FLOWS",
+    "LoadConfig",
+    "LoadReport",
+    "FlowStats",
+    "LoadHarness",
+    "VirtualUser",
+    "percentile",
+    "rss_mb",
+    "run_load",
+    "main",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,213 @@
+"""Replay a recorded update log against the current build.
+
+Updates recorded by ``RECORD_UPDATES=1`` are fed into ``Dispatcher.feed_update``
+with the fake Bot API session, keeping each user's updates in order. Usage::
+
+    python -m bot.tools.replay tmp/updates.jsonl.gz --speed 1   # recorded timing
+    python -m bot.tools.replay tmp/updates.jsonl.gz --speed 0   # as fast as possible
+
+Comparing the reports of two releases on the same log shows real-traffic
+performance differences, including bursts on the catalog and export paths.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Any, Sequence
+
+from aiogram.types import Update
+
+from ..callbacks import decode_callback
+from ..config import BASE_DIR
+from ..services.recording import read_log
+from .loadtest import LoadConfig, LoadHarness, LoadReport, rss_mb
+
+
+@dataclass(slots=True)
+class ReplayConfig:
+    path: Path
+    speed: float = 0.0
+    concurrency: int | None = None
+    limit: int | None = None
+    latency_ms: float = 30.0
+    jitter_ms: float = 10.0
+    seed: int = 1
+    data_dir: Path = BASE_DIR / "data"
+    rate_limit: bool = False
+
+
+@dataclass(slots=True)
+class ReplayedUpdate:
+    offset_s: float
+    user_key: int
+    update: Update
+
+
+def load_updates(path: Path, limit: int | None = None) -> list[ReplayedUpdate]:
+    """Parse a recording into updates with offsets from the first entry."""
+
+    replayed: list[ReplayedUpdate] = []
+    origin: float | None = None
+    for entry in islice(read_log(path), limit):
+        origin = entry.ts if origin is None else origin
+        update = Update.model_validate(entry.update)
+        replayed.append(ReplayedUpdate(max(0.0, entry.ts - origin), _user_key(update), update))
+    return replayed
+
+
+def update_label(update: Update, menu_labels: dict[str, str]) -> str:
+    """Group updates for the report: menu button, command or callback prefix."""
+
+    if update.callback_query is not None:
+        data = update.callback_query.data or ""
+        payload = decode_callback(data)
+        if payload is not None:
+            return "cb:" + payload.action.name.lower()
+        return "cb:" + ":".join(data.split(":")[:2])
+    if update.message is not None:
+        text = update.message.text or ""
+        if text.startswith("/"):
+            return "cmd:" + text.split()[0].split("@")[0]
+        for key, label in menu_labels.items():
+            if text == label:
+                return f"menu:{key}"
+        return "message:text" if text else "message:other"
+    return f"update:{update.event_type}"
+
+
+def _user_key(update: Update) -> int:
+    event = update.event
+    user = getattr(event, "from_user", None)
+    if user is not None:
+        return user.id
+    chat = getattr(event, "chat", None)
+    return chat.id if chat is not None else -update.update_id
+
+
+class Replayer:
+    """Feed recorded updates through a :class:`LoadHarness`, one task per user."""
+
+    def __init__(self, config: ReplayConfig, harness: LoadHarness) -> None:
+        self.config = config
+        self.harness = harness
+        self.max_lag_s = 0.0
+
+    async def run(self, updates: Sequence[ReplayedUpdate]) -> LoadReport:
+        per_user: dict[int, list[ReplayedUpdate]] = defaultdict(list)
+        for item in updates:
+            per_user[item.user_key].append(item)
+        menu_labels = self.harness.context.text_library.menu_labels()
+        paced = self.config.speed > 0
+        semaphore = asyncio.Semaphore(
+            (None if paced else self.config.concurrency) or max(1, len(per_user))
+        )
+        loop = asyncio.get_running_loop()
+
+        async def run_user(items: list[ReplayedUpdate]) -> None:
+            async with semaphore:
+                for item in items:
+                    if paced:
+                        due = started + item.offset_s / self.config.speed
+                        delay = due - loop.time()
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+                        else:
+                            self.max_lag_s = max(self.max_lag_s, -delay)
+                    await self.harness.feed(update_label(item.update, menu_labels), item.update)
+
+        gc.collect()
+        rss_start = rss_mb()
+        started = loop.time()
+        wall_started = time.perf_counter()
+        await asyncio.gather(*(run_user(items) for items in per_user.values()))
+        wall = time.perf_counter() - wall_started
+        return self.harness.report(len(per_user), wall, rss_start)
+
+
+async def replay(config: ReplayConfig) -> tuple[LoadReport, float]:
+    """Replay the log; returns the report and the worst lag behind the recorded timing."""
+
+    updates = load_updates(config.path, config.limit)
+    with tempfile.TemporaryDirectory(prefix="lgpol-replay-") as tmp:
+        harness = LoadHarness(
+            LoadConfig(
+                users=0,
+                latency_ms=config.latency_ms,
+                jitter_ms=config.jitter_ms,
+                seed=config.seed,
+                data_dir=config.data_dir,
+                rate_limit=config.rate_limit,
+            ),
+            Path(tmp),
+        )
+        try:
+            replayer = Replayer(config, harness)
+            report = await replayer.run(updates)
+            return report, replayer.max_lag_s
+        finally:
+            await harness.close()
+
+
+def parse_args(argv: Sequence[str] | None = None) -> tuple[ReplayConfig, Path | None]:
+    parser = argparse.ArgumentParser(description="Replay a recorded update log.")
+    parser.add_argument("path", type=Path, help="recording (gzip JSONL)")
+    parser.add_argument(
+        "--speed", type=float, default=0.0, help="1 = recorded timing, 2 = twice as fast, 0 = ASAP"
+    )
+    parser.add_argument("--concurrency", type=int, default=None, help="users at once (ASAP mode)")
+    parser.add_argument("--limit", type=int, default=None, help="replay only the first N updates")
+    parser.add_argument("--latency-ms", type=float, default=30.0, help="fake Bot API latency")
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--data-dir", type=Path, default=BASE_DIR / "data")
+    parser.add_argument("--rate-limit", action="store_true", help="keep RateLimitMiddleware on")
+    parser.add_argument("--json", type=Path, default=None, help="also write the report as JSON")
+    args = parser.parse_args(argv)
+    config = ReplayConfig(
+        path=args.path,
+        speed=max(args.speed, 0.0),
+        concurrency=args.concurrency,
+        limit=args.limit,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        seed=args.seed,
+        data_dir=args.data_dir,
+        rate_limit=args.rate_limit,
+    )
+    return config, args.json
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    config, json_path = parse_args(argv)
+    report, max_lag = asyncio.run(replay(config))
+    print(report.as_text())
+    if config.speed:
+        print(f"max lag behind recorded timing: {max_lag * 1000:.1f} ms")
+    if json_path is not None:
+        payload: dict[str, Any] = {**asdict(report), "max_lag_s": max_lag}
+        json_path.write_text(json.dumps(payload, indent=2, ensure_ascii=False))
+    return 1 if report.errors else 0
+
+
+__all__ = [
+    "ReplayConfig",
+    "ReplayedUpdate",
+    "Replayer",
+    "load_updates",
+    "replay",
+    "update_label",
+    "main",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
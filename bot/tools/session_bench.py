@@ -0,0 +1,169 @@
+"""Compare aiogram's default Bot API session with the tuned one on a local fake Bot API.
+
+Sends bursts of concurrent ``sendMessage`` calls to
+:class:`~bot.tools.fake_telegram.FakeTelegram` on localhost and reports requests
+per second, tail latency and how many TCP connections each session opened.
+Usage::
+
+    python -m bot.tools.session_bench --bursts 4 --burst-size 300 --gap-s 20 --handshake-ms 150
+
+Localhost has no DNS or TLS, so ``--handshake-ms`` delays the first request on
+every new connection the way a TLS handshake to Telegram would. The gap between
+bursts is what separates the sessions: when it is longer than a session's
+keep-alive (15 s for aiogram's default), every burst starts by reconnecting.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Sequence
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.session.base import BaseSession
+from aiogram.client.telegram import TelegramAPIServer
+
+from ..config import Settings
+from ..services.http_session import build_session
+from .fake_telegram import FakeTelegram
+from .loadtest import percentile
+from .synthetic import TEST_TOKEN
+
+
+@dataclass(slots=True)
+class SessionResult:
+    session: str
+    requests: int
+    errors: int
+    wall_s: float
+    rps: float
+    connections: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+async def measure_session(
+    name: str,
+    session: BaseSession,
+    bursts: int,
+    burst_size: int,
+    gap_s: float,
+    latency_ms: float,
+    handshake_ms: float = 0.0,
+) -> SessionResult:
+    fake = FakeTelegram(latency=latency_ms / 1000, handshake=handshake_ms / 1000)
+    session.api = TelegramAPIServer.from_base(await fake.start())
+    bot = Bot(token=TEST_TOKEN, session=session)
+    samples: list[float] = []
+    errors = 0
+
+    async def send(chat_id: int) -> None:
+        nonlocal errors
+        started = time.perf_counter()
+        try:
+            await bot.send_message(chat_id, "ping")
+        except Exception:
+            errors += 1
+        samples.append((time.perf_counter() - started) * 1000)
+
+    try:
+        started = time.perf_counter()
+        for burst in range(bursts):
+            if burst:
+                await asyncio.sleep(gap_s)
+            await asyncio.gather(*(send(chat_id) for chat_id in range(1, burst_size + 1)))
+        # Idle gaps are part of the traffic shape, not of the throughput.
+        wall = time.perf_counter() - started - gap_s * (bursts - 1)
+    finally:
+        await bot.session.close()
+        await fake.stop()
+    return SessionResult(
+        session=name,
+        requests=len(samples),
+        errors=errors,
+        wall_s=wall,
+        rps=len(samples) / wall if wall else 0.0,
+        connections=fake.connections,
+        p50_ms=percentile(samples, 50),
+        p95_ms=percentile(samples, 95),
+        p99_ms=percentile(samples, 99),
+    )
+
+
+async def compare_sessions(
+    settings: Settings,
+    bursts: int,
+    burst_size: int,
+    gap_s: float,
+    latency_ms: float,
+    handshake_ms: float = 0.0,
+) -> list[SessionResult]:
+    shape = (bursts, burst_size, gap_s, latency_ms, handshake_ms)
+    return [
+        await measure_session("default", AiohttpSession(), *shape),
+        await measure_session("tuned", build_session(settings), *shape),
+    ]
+
+
+def format_results(results: Sequence[SessionResult]) -> str:
+    rows = [
+        f"{'session':<8} {'requests':>8} {'errors':>6} {'req/s':>8} {'conns':>6} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    ]
+    for result in results:
+        rows.append(
+            f"{result.session:<8} {result.requests:>8} {result.errors:>6} {result.rps:>8.1f} "
+            f"{result.connections:>6} {result.p50_ms:>8.2f} {result.p95_ms:>8.2f} "
+            f"{result.p99_ms:>8.2f}"
+        )
+    return "\n".join(rows)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark Bot API session settings.")
+    parser.add_argument("--bursts", type=int, default=4)
+    parser.add_argument("--burst-size", type=int, default=300, help="concurrent calls per burst")
+    parser.add_argument("--gap-s", type=float, default=20.0, help="pause between bursts")
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="stub server latency")
+    parser.add_argument(
+        "--handshake-ms", type=float, default=150.0, help="extra delay on a new connection"
+    )
+    parser.add_argument("--pool-size", type=int, default=None, help="override BOT_API_POOL_SIZE")
+    parser.add_argument("--keepalive-s", type=float, default=None)
+    parser.add_argument("--json", type=Path, default=None, help="also write results as JSON")
+    args = parser.parse_args(argv)
+
+    overrides: dict[str, Any] = {}
+    if args.pool_size is not None:
+        overrides["bot_api_pool_size"] = args.pool_size
+    if args.keepalive_s is not None:
+        overrides["bot_api_keepalive_s"] = args.keepalive_s
+    settings = Settings(bot_token=TEST_TOKEN, manager_chat_id=-1, **overrides)
+    results = asyncio.run(
+        compare_sessions(
+            settings, args.bursts, args.burst_size, args.gap_s, args.latency_ms, args.handshake_ms
+        )
+    )
+    print(format_results(results))
+    if args.json is not None:
+        args.json.write_text(json.dumps([asdict(item) for item in results], indent=2))
+    return 1 if any(item.errors for item in results) else 0
+
+
+__all__ = [
+    "SessionResult",
+    "compare_sessions",
+    "format_results",
+    "measure_session",
+    "main",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
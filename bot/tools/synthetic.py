@@ -0,0 +1,203 @@
+"""Synthetic Telegram traffic: a fake Bot API session and update factories."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from itertools import count
+from typing import Any, AsyncGenerator
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import TelegramMethod
+from aiogram.types import (
+    CallbackQuery,
+    Chat,
+    InlineKeyboardMarkup,
+    InputFile,
+    Message,
+    Update,
+    User,
+)
+
+BOT_USER = User(id=1, is_bot=True, first_name="Lgpol")
+TEST_TOKEN = "123456:LOAD-TEST"
+
+
+@dataclass(slots=True)
+class SentMessage:
+    """Message the bot sent (or edited) in a chat."""
+
+    message_id: int
+    method: str
+    text: str | None
+    markup: InlineKeyboardMarkup | None
+
+    def buttons(self) -> list[tuple[str, str]]:
+        """Return ``(text, callback_data)`` of all inline buttons."""
+
+        if self.markup is None:
+            return []
+        return [
+            (button.text, button.callback_data)
+            for row in self.markup.inline_keyboard
+            for button in row
+            if button.callback_data
+        ]
+
+
+@dataclass(slots=True)
+class SessionStats:
+    calls: Counter[str] = field(default_factory=Counter)
+    uploaded_bytes: int = 0
+
+
+class FakeSession(BaseSession):
+    """Bot API session that never touches the network.
+
+    Every call waits ``latency`` seconds (± ``jitter``) and returns a plausible
+    result. Messages sent to each chat are kept in an inbox so synthetic users
+    can "press" the inline buttons the bot actually rendered.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        serialize: bool = True,
+        seed: int | None = None,
+    ) -> None:
+        super().__init__()
+        self.latency = latency
+        self.jitter = jitter
+        self.serialize = serialize
+        self.stats = SessionStats()
+        self.inbox: dict[int, list[SentMessage]] = defaultdict(list)
+        self._message_ids = count(1_000)
+        self._random = random.Random(seed)
+
+    async def make_request(
+        self,
+        bot: Bot,
+        method: TelegramMethod[Any],
+        timeout: int | None = None,
+    ) -> Any:
+        name = type(method).__name__
+        self.stats.calls[name] += 1
+        if self.serialize:
+            self._serialize(bot, method)
+        delay = self.latency
+        if self.jitter:
+            delay = max(0.0, delay + self._random.uniform(-self.jitter, self.jitter))
+        if delay:
+            await asyncio.sleep(delay)
+        return self._result(bot, method, name)
+
+    async def stream_content(  # pragma: no cover - downloads are not simulated
+        self,
+        url: str,
+        headers: dict[str, Any] | None = None,
+        timeout: int = 30,
+        chunk_size: int = 65536,
+        raise_for_status: bool = True,
+    ) -> AsyncGenerator[bytes, None]:
+        yield b""
+
+    async def close(self) -> None:
+        return None
+
+    def take_inbox(self, chat_id: int) -> list[SentMessage]:
+        return self.inbox.pop(chat_id, [])
+
+    def _serialize(self, bot: Bot, method: TelegramMethod[Any]) -> None:
+        # Mirrors the work AiohttpSession.build_form_data does before sending.
+        files: dict[str, InputFile] = {}
+        for value in method.model_dump(warnings=False).values():
+            self.prepare_value(value, bot=bot, files=files)
+        for input_file in files.values():
+            data = getattr(input_file, "data", b"")
+            self.stats.uploaded_bytes += len(data)
+
+    def _result(self, bot: Bot, method: TelegramMethod[Any], name: str) -> Any:
+        chat_id = getattr(method, "chat_id", None)
+        returning = getattr(method, "__returning__", None)
+        if returning is bool or chat_id is None:
+            return True
+        if not isinstance(chat_id, int):
+            chat_id = abs(hash(chat_id)) % 10**9
+
+        message_id = getattr(method, "message_id", None) or next(self._message_ids)
+        text = getattr(method, "text", None) or getattr(method, "caption", None)
+        markup = getattr(method, "reply_markup", None)
+        self.inbox[chat_id].append(
+            SentMessage(
+                message_id=message_id,
+                method=name,
+                text=text,
+                markup=markup if isinstance(markup, InlineKeyboardMarkup) else None,
+            )
+        )
+        return Message(
+            message_id=message_id,
+            date=datetime.now(timezone.utc),
+            chat=Chat(id=chat_id, type="private"),
+            from_user=BOT_USER,
+            text=text,
+        ).as_(bot)
+
+
+class UpdateFactory:
+    """Build ``Update`` objects for synthetic private-chat users."""
+
+    def __init__(self, start_update_id: int = 1) -> None:
+        self._update_ids = count(start_update_id)
+        self._message_ids = count(1)
+
+    @staticmethod
+    def user(user_id: int) -> User:
+        return User(
+            id=user_id,
+            is_bot=False,
+            first_name=f"User{user_id}",
+            username=f"user{user_id}",
+            language_code="ru",
+        )
+
+    def message(self, user_id: int, text: str) -> Update:
+        user = self.user(user_id)
+        return Update(
+            update_id=next(self._update_ids),
+            message=Message(
+                message_id=next(self._message_ids),
+                date=datetime.now(timezone.utc),
+                chat=Chat(id=user_id, type="private"),
+                from_user=user,
+                text=text,
+            ),
+        )
+
+    def callback(self, user_id: int, data: str, message_id: int = 1) -> Update:
+        user = self.user(user_id)
+        update_id = next(self._update_ids)
+        return Update(
+            update_id=update_id,
+            callback_query=CallbackQuery(
+                id=str(update_id),
+                from_user=user,
+                chat_instance=str(user_id),
+                data=data,
+                message=Message(
+                    message_id=message_id,
+                    date=datetime.now(timezone.utc),
+                    chat=Chat(id=user_id, type="private"),
+                    from_user=BOT_USER,
+                    text="",
+                ),
+            ),
+        )
+
+
+__all__ = ["BOT_USER", "TEST_TOKEN", "FakeSession", "SentMessage", "SessionStats", "UpdateFactory"]
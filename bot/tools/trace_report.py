@@ -0,0 +1,124 @@
+"""Summarise slow traces written by :mod:`bot.services.tracing`.
+
+Usage::
+
+    python -m bot.tools.trace_report tmp/traces.jsonl --top 15
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Sequence
+
+
+@dataclass(slots=True)
+class PathStats:
+    """Aggregated timings of one span path (``update > handler > port``)."""
+
+    path: str
+    durations: list[float] = field(default_factory=list)
+    self_total: float = 0.0
+
+    @property
+    def count(self) -> int:
+        return len(self.durations)
+
+    @property
+    def total(self) -> float:
+        return sum(self.durations)
+
+    def percentile(self, pct: float) -> float:
+        ordered = sorted(self.durations)
+        if not ordered:
+            return 0.0
+        index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+
+def read_traces(path: Path) -> Iterator[dict[str, Any]]:
+    with path.open(encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def span_paths(record: dict[str, Any]) -> list[tuple[str, float, float]]:
+    """Return ``(path, duration_ms, self_ms)`` for every span of a trace record."""
+
+    spans = record.get("spans", [])
+    paths: list[str] = []
+    child_time = [0.0] * len(spans)
+    for span in spans:
+        parent = span.get("parent")
+        name = span["name"]
+        paths.append(f"{paths[parent]} > {name}" if parent is not None else name)
+        if parent is not None:
+            child_time[parent] += span["duration_ms"]
+    return [
+        (path, span["duration_ms"], max(span["duration_ms"] - child, 0.0))
+        for path, span, child in zip(paths, spans, child_time)
+    ]
+
+
+def summarise(records: Iterable[dict[str, Any]]) -> tuple[list[PathStats], list[dict[str, Any]]]:
+    stats: dict[str, PathStats] = {}
+    traces: list[dict[str, Any]] = []
+    for record in records:
+        traces.append(record)
+        for path, duration, self_ms in span_paths(record):
+            entry = stats.setdefault(path, PathStats(path))
+            entry.durations.append(duration)
+            entry.self_total += self_ms
+    ordered = sorted(stats.values(), key=lambda item: item.self_total, reverse=True)
+    traces.sort(key=lambda item: item.get("duration_ms", 0.0), reverse=True)
+    return ordered, traces
+
+
+def format_report(stats: Sequence[PathStats], traces: Sequence[dict[str, Any]], top: int) -> str:
+    lines = [f"Traces: {len(traces)}", "", "Slowest span paths (by self time):"]
+    lines.append(f"{'self ms':>10} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}  path")
+    for entry in stats[:top]:
+        lines.append(
+            f"{entry.self_total:10.1f} {entry.count:6d} {entry.percentile(50):9.1f} "
+            f"{entry.percentile(95):9.1f} {max(entry.durations):9.1f}  {entry.path}"
+        )
+
+    lines += ["", "Slowest updates:"]
+    for record in traces[:top]:
+        spans = span_paths(record)
+        worst = max(spans[1:], key=lambda item: item[2], default=None)
+        detail = f" — {worst[0]} ({worst[2]:.1f} ms self)" if worst else ""
+        lines.append(
+            f"{record.get('duration_ms', 0.0):10.1f} ms  update {record.get('update_id')}{detail}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Summarise slow update traces.")
+    parser.add_argument("path", type=Path, nargs="?", default=Path("tmp/traces.jsonl"))
+    parser.add_argument("--top", type=int, default=10, help="rows per section")
+    args = parser.parse_args(argv)
+
+    if not args.path.exists():
+        print(f"No trace file at {args.path}", file=sys.stderr)
+        return 1
+    stats, traces = summarise(read_traces(args.path))
+    print(format_report(stats, traces, args.top))
+    return 0
+
+
+__all__ = ["PathStats", "read_traces", "span_paths", "summarise", "format_report", "main"]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,372 @@
+"""Throughput of the multi-process webhook mode for different worker counts.
+
+Starts :class:`~bot.webhook.WebhookMaster` on a local port with the fake Bot
+API session in every worker and posts Telegram-shaped updates from synthetic
+users walking the catalog down to product cards. Usage::
+
+    python -m bot.tools.webhook_bench --workers 1,2,4 --users 200 --rounds 3
+
+Scaling is bounded by the number of CPU cores; the report prints it next to
+the results. ``--inline`` instead runs the same walks in-process with the
+inline reply window off and on and compares outbound Bot API requests::
+
+    python -m bot.tools.webhook_bench --inline --users 200 --rounds 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Sequence
+
+from aiogram import Bot
+from aiogram.webhook.aiohttp_server import setup_application
+from aiohttp import ClientSession, TCPConnector, web
+
+from ..callbacks import Action, encode_callback
+from ..config import BASE_DIR, Settings
+from ..context import set_app_context
+from ..services.inventory_stub import InventoryStub
+from ..services.text_templates import get_text_library
+from ..webhook import (
+    SECRET_HEADER,
+    WEBHOOK_PATH,
+    IngestRequestHandler,
+    WebhookMaster,
+    WorkerOptions,
+    route_key,
+)
+from .loadtest import percentile
+from .synthetic import TEST_TOKEN, FakeSession, UpdateFactory
+
+SECRET = "webhook-bench"
+
+
+@dataclass(slots=True)
+class ScalingResult:
+    workers: int
+    updates: int
+    errors: int
+    wall_s: float
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+
+
+@dataclass(slots=True)
+class InlineResult:
+    inline_wait_ms: int
+    updates: int
+    errors: int
+    api_calls: int
+    inlined: int
+    fallbacks: int
+    ack_p50_ms: float
+    ack_p95_ms: float
+
+    @property
+    def calls_per_update(self) -> float:
+        return self.api_calls / self.updates if self.updates else 0.0
+
+
+def user_script(factory: UpdateFactory, user_id: int, data_dir: Path) -> list[dict[str, Any]]:
+    """Updates of one catalog walk: menu, category, skip every filter, product cards."""
+
+    inventory = _inventory(data_dir)
+    tag = inventory.ids.tag
+    categories = inventory.categories()
+    category = categories[user_id % len(categories)]
+    label = get_text_library(data_dir).menu_labels().get("catalog", "🛍 Каталог")
+    updates = [
+        factory.message(user_id, "/start"),
+        factory.message(user_id, label),
+        factory.callback(
+            user_id,
+            encode_callback(
+                Action.CATALOG_CATEGORY, tag, inventory.ids.categories.id(category.name)
+            ),
+        ),
+    ]
+    filter_ids = [inventory.ids.filters.id(name) for name in category.filters]
+    updates += [
+        factory.callback(user_id, encode_callback(Action.CATALOG_SKIP, tag, filter_id))
+        for filter_id in filter_ids
+    ]
+    return [update.model_dump(mode="json", by_alias=True, exclude_none=True) for update in updates]
+
+
+_inventories: dict[Path, InventoryStub] = {}
+
+
+def _inventory(data_dir: Path) -> InventoryStub:
+    if data_dir not in _inventories:
+        _inventories[data_dir] = InventoryStub(data_dir / "catalog.json")
+    return _inventories[data_dir]
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+async def measure_workers(
+    workers: int,
+    users: int,
+    rounds: int,
+    latency_ms: float,
+    data_dir: Path,
+    tmp_dir: Path,
+) -> ScalingResult:
+    settings = Settings(
+        bot_token=TEST_TOKEN,
+        manager_chat_id=-1,
+        data_dir=data_dir,
+        tmp_dir=tmp_dir,
+        autosave_selection=False,
+        webhook_secret=SECRET,
+    )
+    master = WebhookMaster(
+        settings,
+        workers,
+        WorkerOptions(
+            background=False,
+            fake_api_latency_ms=latency_ms,
+            log_level=logging.WARNING,
+        ),
+    )
+    port = _free_port()
+    await master.start("127.0.0.1", port)
+    factory = UpdateFactory()
+    scripts = [user_script(factory, 10_000 + index, data_dir) * rounds for index in range(users)]
+    samples: list[float] = []
+    errors = 0
+    url = f"http://127.0.0.1:{port}{WEBHOOK_PATH}"
+    headers = {SECRET_HEADER: SECRET}
+
+    async def run_user(session: ClientSession, script: list[dict[str, Any]]) -> None:
+        nonlocal errors
+        for update in script:
+            started = time.perf_counter()
+            async with session.post(url, json=update, headers=headers) as response:
+                await response.read()
+                if response.status != 200:
+                    errors += 1
+            samples.append((time.perf_counter() - started) * 1000)
+
+    try:
+        async with ClientSession(connector=TCPConnector(limit=users)) as session:
+            # One warm-up walk so imports and template compilation are not measured.
+            await asyncio.gather(*(run_user(session, script[:3]) for script in scripts[:workers]))
+            samples.clear()
+            started = time.perf_counter()
+            await asyncio.gather(*(run_user(session, script) for script in scripts))
+            wall = time.perf_counter() - started
+    finally:
+        await master.stop()
+    return ScalingResult(
+        workers=workers,
+        updates=len(samples),
+        errors=errors,
+        wall_s=wall,
+        throughput=len(samples) / wall if wall else 0.0,
+        p50_ms=percentile(samples, 50),
+        p95_ms=percentile(samples, 95),
+    )
+
+
+async def measure_inline(
+    inline_wait_ms: int,
+    users: int,
+    rounds: int,
+    latency_ms: float,
+    data_dir: Path,
+    tmp_dir: Path,
+) -> InlineResult:
+    """Post catalog walks to an in-process ingest handler and count outbound API calls."""
+
+    from ..main import build_app_context, build_dispatcher
+
+    settings = Settings(
+        bot_token=TEST_TOKEN,
+        manager_chat_id=-1,
+        data_dir=data_dir,
+        tmp_dir=tmp_dir,
+        autosave_selection=False,
+        webhook_secret=SECRET,
+        webhook_inline_wait_ms=inline_wait_ms,
+    )
+    set_app_context(build_app_context(settings))
+    dp = build_dispatcher(rate_limit=False)
+    session = FakeSession(latency=latency_ms / 1000)
+    bot = Bot(token=TEST_TOKEN, session=session)
+    ingest = IngestRequestHandler(dp, bot, settings)
+    app = web.Application()
+    ingest.register(app, WEBHOOK_PATH)
+    setup_application(app, dp, bot=bot)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    port = _free_port()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+
+    factory = UpdateFactory()
+    scripts = [user_script(factory, 10_000 + index, data_dir) * rounds for index in range(users)]
+    samples: list[float] = []
+    errors = 0
+    url = f"http://127.0.0.1:{port}{WEBHOOK_PATH}"
+    headers = {SECRET_HEADER: SECRET}
+
+    async def run_user(client: ClientSession, script: list[dict[str, Any]]) -> None:
+        nonlocal errors
+        for update in script:
+            started = time.perf_counter()
+            async with client.post(url, json=update, headers=headers) as response:
+                await response.read()
+                if response.status != 200:
+                    errors += 1
+            samples.append((time.perf_counter() - started) * 1000)
+            # Like a person, press the next button only after the bot has replied.
+            while ingest.queue.busy(route_key(update)):
+                await asyncio.sleep(0.005)
+
+    try:
+        async with ClientSession(connector=TCPConnector(limit=users)) as client:
+            await asyncio.gather(*(run_user(client, script) for script in scripts))
+        await ingest.queue.join()
+    finally:
+        await runner.cleanup()
+    return InlineResult(
+        inline_wait_ms=inline_wait_ms,
+        updates=len(samples),
+        errors=errors,
+        api_calls=sum(session.stats.calls.values()),
+        inlined=ingest.stats["inlined"],
+        fallbacks=sum(count for reason, count in ingest.stats.items() if reason != "inlined"),
+        ack_p50_ms=percentile(samples, 50),
+        ack_p95_ms=percentile(samples, 95),
+    )
+
+
+async def run_inline(
+    users: int,
+    rounds: int,
+    latency_ms: float,
+    data_dir: Path,
+    inline_wait_ms: int = 50,
+) -> list[InlineResult]:
+    results = []
+    for wait in (0, inline_wait_ms):
+        with tempfile.TemporaryDirectory(prefix="lgpol-webhook-bench-") as tmp:
+            results.append(
+                await measure_inline(wait, users, rounds, latency_ms, data_dir, Path(tmp))
+            )
+    return results
+
+
+async def run_scaling(
+    worker_counts: Sequence[int],
+    users: int,
+    rounds: int,
+    latency_ms: float,
+    data_dir: Path,
+) -> list[ScalingResult]:
+    results = []
+    for workers in worker_counts:
+        with tempfile.TemporaryDirectory(prefix="lgpol-webhook-bench-") as tmp:
+            results.append(
+                await measure_workers(workers, users, rounds, latency_ms, data_dir, Path(tmp))
+            )
+    return results
+
+
+def format_results(results: Sequence[ScalingResult]) -> str:
+    base = results[0].throughput if results and results[0].throughput else None
+    rows = [
+        f"cpu cores: {os.cpu_count()}",
+        f"{'workers':>7} {'updates':>8} {'errors':>7} {'upd/s':>9} {'speedup':>8} "
+        f"{'p50 ms':>9} {'p95 ms':>9}",
+    ]
+    for result in results:
+        speedup = f"{result.throughput / base:.2f}x" if base else "-"
+        rows.append(
+            f"{result.workers:>7} {result.updates:>8} {result.errors:>7} "
+            f"{result.throughput:>9.1f} {speedup:>8} {result.p50_ms:>9.2f} {result.p95_ms:>9.2f}"
+        )
+    return "\n".join(rows)
+
+
+def format_inline(results: Sequence[InlineResult]) -> str:
+    base = results[0].api_calls if results else 0
+    rows = [
+        f"{'inline ms':>9} {'updates':>8} {'api calls':>10} {'calls/upd':>10} {'inlined':>8} "
+        f"{'fallback':>9} {'saved':>7} {'ack p50':>8} {'ack p95':>8}"
+    ]
+    for result in results:
+        saved = f"{1 - result.api_calls / base:.0%}" if base else "-"
+        rows.append(
+            f"{result.inline_wait_ms:>9} {result.updates:>8} {result.api_calls:>10} "
+            f"{result.calls_per_update:>10.2f} {result.inlined:>8} {result.fallbacks:>9} "
+            f"{saved:>7} {result.ack_p50_ms:>8.2f} {result.ack_p95_ms:>8.2f}"
+        )
+    return "\n".join(rows)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark webhook throughput vs workers.")
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=3, help="catalog walks per user")
+    parser.add_argument("--latency-ms", type=float, default=30.0, help="fake Bot API latency")
+    parser.add_argument("--data-dir", type=Path, default=BASE_DIR / "data")
+    parser.add_argument("--json", type=Path, default=None, help="also write results as JSON")
+    parser.add_argument(
+        "--inline",
+        action="store_true",
+        help="compare outbound API calls with the inline reply window off and on",
+    )
+    parser.add_argument("--inline-wait-ms", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    if args.inline:
+        inline = asyncio.run(
+            run_inline(args.users, args.rounds, args.latency_ms, args.data_dir, args.inline_wait_ms)
+        )
+        print(format_inline(inline))
+        if args.json is not None:
+            args.json.write_text(json.dumps([asdict(item) for item in inline], indent=2))
+        return 1 if any(item.errors for item in inline) else 0
+
+    counts = [int(item) for item in args.workers.split(",") if item.strip()]
+    results = asyncio.run(
+        run_scaling(counts, args.users, args.rounds, args.latency_ms, args.data_dir)
+    )
+    print(format_results(results))
+    if args.json is not None:
+        args.json.write_text(json.dumps([asdict(item) for item in results], indent=2))
+    return 1 if any(item.errors for item in results) else 0
+
+
+__all__ = [
+    "InlineResult",
+    "ScalingResult",
+    "format_inline",
+    "format_results",
+    "measure_inline",
+    "measure_workers",
+    "run_inline",
+    "run_scaling",
+    "user_script",
+    "main",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -25,6 +25,22 @@ def calc_required(area_m2: float, waste_pct: int, pack_step: float | None) -> fl
     return round(total, 2)
 
 
+def parse_metrics(text: str, default_waste: int = 5) -> tuple[list[float], int]:
+    """Parse «площадь запас» input; several rooms can be joined with «+» (``"40+25,5 7"``).
+
+    Raises ``ValueError`` when the numbers cannot be recognised.
+    """
+
+    parts = text.replace(",", ".").split()
+    if not parts:
+        raise ValueError("empty metrics")
+    areas = [float(chunk) for chunk in parts[0].replace(";", "+").split("+") if chunk]
+    if not areas:
+        raise ValueError("no area")
+    waste = int(parts[1]) if len(parts) > 1 else default_waste
+    return areas, waste
+
+
 def bulletize(lines: Iterable[str]) -> str:
     """Join iterable lines into a human friendly bullet list."""
 
@@ -32,7 +48,7 @@ def bulletize(lines: Iterable[str]) -> str:
     return "\n".join(f"• {line}" for line in filtered)
 
 
-__all__ = ["calc_required", "bulletize"]
+__all__ = ["calc_required", "parse_metrics", "bulletize"]
 
 
 def mention_html(user: User | None) -> str:
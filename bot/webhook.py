@@ -0,0 +1,553 @@
+"""Webhook serving: one process, or a pre-fork master routing updates to worker processes.
+
+With ``WEBHOOK_WORKERS=N`` (N > 1) the master accepts Telegram's requests on
+``WEBAPP_HOST:WEBAPP_PORT`` and forwards each update over a Unix socket to
+worker ``user_id % N``. A user's updates therefore always reach the same
+worker, so the in-memory FSM storage, rate limiter and selection store stay
+correct without a shared backend; selection files are partitioned the same way.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import secrets
+import shutil
+import signal
+import tempfile
+import time
+from collections import Counter
+from contextlib import suppress
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from aiohttp import ClientError, ClientSession, ClientTimeout, MultipartWriter, UnixConnector, web
+from aiogram import Bot, Dispatcher
+from aiogram.methods import TelegramMethod
+from aiogram.types import Update
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from pydantic import ValidationError
+
+from .config import Settings
+from .middlewares.replies import INLINE_REPLY
+from .services.http_session import build_session
+from .services.metrics import WEBHOOK_INLINE_FALLBACK, WEBHOOK_INLINED, registry
+from .services.update_queue import KeyedQueue
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_PATH = "/"
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+WORKER_START_TIMEOUT_S = 60.0
+# Fields of an update payload that identify who sent it, in order of preference.
+SENDER_FIELDS = ("from", "user", "chat", "voter_chat")
+# Why a method returned by a handler was sent as a normal API call instead of inline.
+INLINE_LATE = "late"
+INLINE_UPLOAD = "upload"
+
+
+@dataclass(slots=True)
+class WorkerOptions:
+    """How workers handle updates; the defaults are the production settings.
+
+    ``background=False`` answers the webhook only after the handler finished,
+    which benchmarks need to measure completion. ``fake_api_latency_ms`` swaps
+    the Bot API session for :class:`~bot.tools.synthetic.FakeSession`.
+    """
+
+    background: bool = True
+    fake_api_latency_ms: float | None = None
+    log_level: int = logging.INFO
+
+
+def route_key(update: dict[str, Any]) -> int:
+    """Return the user (or chat) id an update belongs to; the update id otherwise."""
+
+    for name, event in update.items():
+        if name == "update_id" or not isinstance(event, dict):
+            continue
+        for field in SENDER_FIELDS:
+            owner = event.get(field)
+            if isinstance(owner, dict) and isinstance(owner.get("id"), int):
+                return owner["id"]
+    return int(update.get("update_id", 0))
+
+
+def worker_index(update: dict[str, Any], workers: int) -> int:
+    return abs(route_key(update)) % workers
+
+
+@dataclass(slots=True)
+class _Delivery:
+    """A queued update and, while its request is still open, the slot for an inline reply."""
+
+    update: Update
+    reply: asyncio.Future[list[tuple[str, str]] | None] | None = None
+    # Set once the webhook response is written (or it is certain there is none).
+    written: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+def _method_fields(bot: Bot, method: TelegramMethod[Any]) -> list[tuple[str, str]] | None:
+    """Form fields of ``method`` for a webhook response; ``None`` if it uploads files."""
+
+    files: dict[str, Any] = {}
+    fields = [("method", method.__api_method__)]
+    for key, value in method.model_dump(warnings=False).items():
+        value = bot.session.prepare_value(value, bot=bot, files=files)
+        if value:
+            fields.append((key, value))
+    return None if files else fields
+
+
+def _method_body(fields: list[tuple[str, str]]) -> MultipartWriter:
+    writer = MultipartWriter("form-data", boundary=f"webhookBoundary{secrets.token_urlsafe(16)}")
+    for name, value in fields:
+        writer.append(value).set_content_disposition("form-data", name=name)
+    return writer
+
+
+class IngestRequestHandler:
+    """Validate and enqueue webhook updates, acknowledging before slow handlers finish.
+
+    A :class:`KeyedQueue` keyed by user runs the handlers, so slow exports or
+    manager sends no longer hold Telegram's request open. When the queue is
+    full the ``INGEST_OVERFLOW`` policy applies: ``retry`` answers 503 so
+    Telegram redelivers later, ``drop`` acknowledges and discards the update.
+
+    The request stays open for up to ``WEBHOOK_INLINE_WAIT_MS``: a handler that
+    returns a Bot API method (``return message.answer(...)``) within that window
+    gets it sent as the webhook response body, saving one outbound request.
+    Telegram only executes it once the response is written, so the user's next
+    update is not handled before that. Later results and file uploads fall back
+    to a normal API call.
+    """
+
+    def __init__(self, dp: Dispatcher, bot: Bot, settings: Settings) -> None:
+        self.dp = dp
+        self.bot = bot
+        self.secret = settings.webhook_secret
+        self.overflow = settings.ingest_overflow
+        self.inline_wait = settings.webhook_inline_wait_ms / 1000
+        # "inlined" plus fallback reasons; the same numbers the metrics report.
+        self.stats: Counter[str] = Counter()
+        self.queue: KeyedQueue[_Delivery] = KeyedQueue(
+            self._process,
+            maxsize=settings.ingest_queue_size,
+            concurrency=settings.ingest_concurrency,
+            max_per_key=settings.ingest_max_per_user,
+        )
+
+    def register(self, app: web.Application, path: str) -> None:
+        app.router.add_post(path, self.handle)
+        app.on_startup.append(self._start)
+        app.on_shutdown.append(self._stop)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        if self.secret and request.headers.get(SECRET_HEADER) != self.secret:
+            return web.Response(body="Unauthorized", status=401)
+        try:
+            payload = await request.json()
+            if not isinstance(payload, dict):
+                return web.Response(status=400)
+            update = Update.model_validate(payload, context={"bot": self.bot})
+        except (ValueError, ValidationError):
+            return web.Response(status=400)
+        reply = asyncio.get_running_loop().create_future() if self.inline_wait > 0 else None
+        delivery = _Delivery(update, reply)
+        shed = self.queue.put(route_key(payload), delivery)
+        if shed is not None:
+            logger.warning("Ingest queue shed update %s (%s)", update.update_id, shed)
+            if self.overflow == "retry":
+                return web.Response(status=503, headers={"Retry-After": "1"})
+            return web.json_response({})
+        if reply is None:
+            return web.json_response({})
+        try:
+            return await self._respond(request, reply)
+        finally:
+            delivery.written.set()
+
+    async def _respond(
+        self,
+        request: web.Request,
+        reply: asyncio.Future[list[tuple[str, str]] | None],
+    ) -> web.StreamResponse:
+        try:
+            await asyncio.wait({reply}, timeout=self.inline_wait)
+        finally:
+            # No-op if the handler already answered; otherwise its method goes out as a call.
+            reply.cancel()
+        fields = reply.result() if not reply.cancelled() else None
+        if not fields:
+            return web.json_response({})
+        response = web.Response(body=_method_body(fields))
+        # Written here rather than after returning, so ``written`` is set only once it is sent.
+        await response.prepare(request)
+        await response.write_eof()
+        return response
+
+    async def _process(self, delivery: _Delivery) -> None:
+        try:
+            result = await self.dp.feed_update(
+                self.bot, delivery.update, **{INLINE_REPLY: delivery.reply is not None}
+            )
+            if isinstance(result, TelegramMethod):
+                await self._answer(result, delivery)
+        finally:
+            if delivery.reply is not None and not delivery.reply.done():
+                delivery.reply.set_result(None)
+
+    async def _answer(self, method: TelegramMethod[Any], delivery: _Delivery) -> None:
+        name = type(method).__name__
+        reply = delivery.reply
+        if reply is not None:
+            reason = INLINE_LATE
+            if not reply.done():
+                fields = _method_fields(self.bot, method)
+                if fields is not None:
+                    reply.set_result(fields)
+                    self.stats["inlined"] += 1
+                    if registry.enabled:
+                        registry.counter(
+                            WEBHOOK_INLINED, "Bot API calls sent in the webhook response"
+                        ).inc(method=name)
+                    # Keep the user's key until Telegram has the reply, so it stays in order.
+                    await delivery.written.wait()
+                    return
+                reason = INLINE_UPLOAD
+            self.stats[reason] += 1
+            if registry.enabled:
+                registry.counter(
+                    WEBHOOK_INLINE_FALLBACK, "Returned methods sent as a normal Bot API call"
+                ).inc(method=name, reason=reason)
+        # A plain call, so a failed send reaches the queue's error log.
+        await self.bot(method)
+
+    async def _start(self, _: web.Application) -> None:
+        await self.queue.start()
+
+    async def _stop(self, _: web.Application) -> None:
+        await self.queue.stop()
+
+
+def build_webhook_app(
+    dp: Dispatcher,
+    bot: Bot,
+    settings: Settings,
+    background: bool = True,
+) -> web.Application:
+    """Build the webhook application.
+
+    ``background=True`` acknowledges updates immediately and handles them from
+    the ingest queue; ``False`` answers only after the handler finished.
+    """
+
+    app = web.Application()
+    if background:
+        IngestRequestHandler(dp, bot, settings).register(app, path=WEBHOOK_PATH)
+    else:
+        SimpleRequestHandler(
+            dispatcher=dp,
+            bot=bot,
+            handle_in_background=False,
+            secret_token=settings.webhook_secret,
+        ).register(app, path=WEBHOOK_PATH)
+    setup_application(app, dp, bot=bot)
+    return app
+
+
+async def serve_webhook(dp: Dispatcher, bot: Bot, settings: Settings) -> None:
+    """Serve the dispatcher on ``WEBAPP_HOST:WEBAPP_PORT`` until cancelled."""
+
+    runner = web.AppRunner(build_webhook_app(dp, bot, settings))
+    await runner.setup()
+    site = web.TCPSite(runner, settings.webapp_host or "0.0.0.0", settings.webapp_port or 8080)
+    await site.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+# Workers ---------------------------------------------------------------------------
+
+
+def worker_settings(settings: Settings, index: int) -> Settings:
+    """Give each worker its own metrics port and trace/recording files."""
+
+    trace_path = settings.trace_path or settings.tmp_dir / "traces.jsonl"
+    record_path = settings.record_path or settings.tmp_dir / "updates.jsonl.gz"
+    return settings.model_copy(
+        update={
+            "metrics_port": settings.metrics_port + index,
+            "trace_path": _per_worker(trace_path, index),
+            "record_path": _per_worker(record_path, index),
+        }
+    )
+
+
+def _per_worker(path: Path, index: int) -> Path:
+    stem, dot, suffixes = path.name.partition(".")
+    return path.with_name(f"{stem}-w{index}{dot}{suffixes}")
+
+
+def run_worker(
+    settings: Settings,
+    index: int,
+    workers: int,
+    socket_path: str,
+    options: WorkerOptions,
+) -> None:
+    """Process entry point of a webhook worker."""
+
+    from .main import configure_logging, init_event_loop
+
+    # Ctrl+C reaches the whole process group; the master stops workers with SIGTERM.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    configure_logging()
+    logging.getLogger().setLevel(options.log_level)
+    init_event_loop()
+    settings = worker_settings(settings, index)
+    asyncio.run(_serve_worker(settings, index, workers, socket_path, options))
+
+
+async def _serve_worker(
+    settings: Settings,
+    index: int,
+    workers: int,
+    socket_path: str,
+    options: WorkerOptions,
+) -> None:
+    from aiogram.client.default import DefaultBotProperties
+    from aiogram.client.session.base import BaseSession
+    from aiogram.enums import ParseMode
+
+    from .context import set_app_context
+    from .main import (
+        build_app_context,
+        build_dispatcher,
+        configure_instrumentation,
+        warm_up,
+    )
+    from .services.metrics import registry, start_metrics_server
+    from .services.recording import recorder
+    from .services.text_reload import watch_texts
+
+    configure_instrumentation(settings)
+    if options.fake_api_latency_ms is not None:
+        from .tools.synthetic import FakeSession
+
+        session: BaseSession = FakeSession(
+            latency=options.fake_api_latency_ms / 1000, serialize=False
+        )
+    else:
+        session = build_session(settings)
+    bot = Bot(
+        token=settings.bot_token.get_secret_value(),
+        session=session,
+        default=DefaultBotProperties(parse_mode=ParseMode.HTML),
+    )
+    context = build_app_context(settings, partition=(index, workers))
+    set_app_context(context)
+    dp = build_dispatcher(max_concurrency=settings.update_concurrency)
+    # The master waits for the socket, so no update reaches a cold worker.
+    elapsed = warm_up(context)
+    logger.info("Webhook worker %d/%d warmed up in %.0f ms", index, workers, elapsed * 1000)
+
+    # The master already sees every request; per-worker access logs would only duplicate it.
+    app = build_webhook_app(dp, bot, settings, background=options.background)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.UnixSite(runner, socket_path).start()
+    metrics_runner = None
+    if registry.enabled:
+        metrics_runner = await start_metrics_server(settings.metrics_host, settings.metrics_port)
+    logger.info("Webhook worker %d/%d listening on %s", index, workers, socket_path)
+    # Every worker watches the files itself; /reload only reaches the worker it lands on.
+    watcher = None
+    if settings.texts_watch_interval_s > 0:
+        watcher = asyncio.create_task(watch_texts(context, settings.texts_watch_interval_s))
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, stop.set)
+    try:
+        await stop.wait()
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+        await runner.cleanup()
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
+        recorder.close()
+        await bot.session.close()
+
+
+# Master ----------------------------------------------------------------------------
+
+
+class WebhookMaster:
+    """Accept webhooks on one port and forward each update to its user's worker."""
+
+    def __init__(
+        self,
+        settings: Settings,
+        workers: int,
+        options: WorkerOptions | None = None,
+    ) -> None:
+        self.settings = settings
+        self.workers = max(1, workers)
+        self.options = options or WorkerOptions()
+        self._socket_dir = Path(tempfile.mkdtemp(prefix="lgpol-webhook-"))
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: list[Any] = [None] * self.workers
+        self._sessions: list[ClientSession] = []
+        self._runner: web.AppRunner | None = None
+        self._monitor: asyncio.Task[None] | None = None
+
+    def socket_path(self, index: int) -> str:
+        return str(self._socket_dir / f"worker-{index}.sock")
+
+    async def start(self, host: str, port: int) -> None:
+        for index in range(self.workers):
+            self._spawn(index)
+        await asyncio.gather(*(self._wait_ready(index) for index in range(self.workers)))
+        timeout = ClientTimeout(total=None, sock_read=120)
+        self._sessions = [
+            ClientSession(connector=UnixConnector(path=self.socket_path(index)), timeout=timeout)
+            for index in range(self.workers)
+        ]
+        app = web.Application(client_max_size=2**22)
+        app.router.add_post(WEBHOOK_PATH, self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        self._monitor = asyncio.create_task(self._watch_workers())
+        logger.info("Webhook master on %s:%d with %d workers", host, port, self.workers)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        secret = self.settings.webhook_secret
+        if secret and request.headers.get(SECRET_HEADER) != secret:
+            return web.Response(body="Unauthorized", status=401)
+        body = await request.read()
+        try:
+            update = await request.json()
+        except ValueError:
+            return web.Response(status=400)
+        if not isinstance(update, dict):
+            return web.Response(status=400)
+        index = worker_index(update, self.workers)
+        headers = {"Content-Type": "application/json"}
+        if secret:
+            headers[SECRET_HEADER] = secret
+        try:
+            async with self._sessions[index].post(
+                f"http://worker{WEBHOOK_PATH}", data=body, headers=headers
+            ) as response:
+                payload = await response.read()
+                content_type = response.headers.get("Content-Type", "application/json")
+                return web.Response(
+                    body=payload, status=response.status, headers={"Content-Type": content_type}
+                )
+        except ClientError:
+            # Telegram retries non-2xx responses, so the update is not lost while a worker restarts.
+            logger.warning("Worker %d unavailable, asking Telegram to retry", index)
+            return web.Response(status=503)
+
+    async def stop(self) -> None:
+        if self._monitor is not None:
+            self._monitor.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._monitor
+        if self._runner is not None:
+            await self._runner.cleanup()
+        for session in self._sessions:
+            await session.close()
+        for process in self._processes:
+            if process is not None and process.is_alive():
+                process.terminate()
+        for process in self._processes:
+            if process is not None:
+                await asyncio.to_thread(process.join, 10)
+                if process.is_alive():
+                    process.kill()
+        shutil.rmtree(self._socket_dir, ignore_errors=True)
+
+    def _spawn(self, index: int) -> None:
+        path = Path(self.socket_path(index))
+        path.unlink(missing_ok=True)
+        process = self._context.Process(
+            target=run_worker,
+            args=(self.settings, index, self.workers, str(path), self.options),
+            name=f"webhook-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        self._processes[index] = process
+
+    async def _wait_ready(self, index: int) -> None:
+        deadline = time.monotonic() + WORKER_START_TIMEOUT_S
+        while True:
+            process = self._processes[index]
+            if not process.is_alive():
+                raise RuntimeError(f"Webhook worker {index} exited with code {process.exitcode}")
+            try:
+                _, writer = await asyncio.open_unix_connection(self.socket_path(index))
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Webhook worker {index} did not start") from None
+                await asyncio.sleep(0.05)
+                continue
+            writer.close()
+            await writer.wait_closed()
+            return
+
+    async def _watch_workers(self) -> None:
+        while True:
+            await asyncio.sleep(1.0)
+            for index, process in enumerate(self._processes):
+                if process.is_alive():
+                    continue
+                logger.error(
+                    "Webhook worker %d exited with code %s, restarting", index, process.exitcode
+                )
+                self._spawn(index)
+                try:
+                    await self._wait_ready(index)
+                except (RuntimeError, TimeoutError):
+                    logger.exception("Webhook worker %d failed to restart", index)
+
+
+async def run_master(settings: Settings) -> None:
+    """Run ``WEBHOOK_WORKERS`` workers behind one port and register the webhook."""
+
+    master = WebhookMaster(settings, settings.webhook_workers)
+    await master.start(settings.webapp_host or "0.0.0.0", settings.webapp_port or 8080)
+    bot = Bot(token=settings.bot_token.get_secret_value(), session=build_session(settings))
+    try:
+        await bot.set_webhook(
+            url=settings.webhook_url or "",
+            secret_token=settings.webhook_secret,
+            drop_pending_updates=True,
+        )
+        await asyncio.Event().wait()
+    finally:
+        await master.stop()
+        await bot.session.close()
+
+
+__all__ = [
+    "WEBHOOK_PATH",
+    "IngestRequestHandler",
+    "WebhookMaster",
+    "WorkerOptions",
+    "build_webhook_app",
+    "route_key",
+    "run_master",
+    "run_worker",
+    "serve_webhook",
+    "worker_index",
+    "worker_settings",
+]
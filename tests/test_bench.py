@@ -0,0 +1,36 @@
+from pathlib import Path
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from bot.tools.bench import BenchResult, build_benchmarks, compare, run_benchmarks, to_baseline
+
+
+def test_compare_flags_only_regressions_past_threshold():
+    baseline = to_baseline(
+        [
+            BenchResult("fast", median_us=10.0, min_us=9.0, calls=100),
+            BenchResult("slow", median_us=10.0, min_us=9.0, calls=100),
+            BenchResult("retired", median_us=1.0, min_us=1.0, calls=100),
+        ]
+    )
+    current = [
+        BenchResult("fast", median_us=11.0, min_us=10.0, calls=100),
+        BenchResult("slow", median_us=14.0, min_us=13.0, calls=100),
+        BenchResult("new", median_us=99.0, min_us=99.0, calls=100),
+    ]
+
+    regressions = compare(current, baseline, threshold=0.25)
+    assert [item.name for item in regressions] == ["slow"]
+    assert round(regressions[0].ratio, 2) == 1.4
+
+
+def test_all_benchmarks_run_on_small_sizes(tmp_path):
+    benchmarks = build_benchmarks(tmp_path, catalog_sizes=(40,), selection_sizes=(3,))
+    results = list(run_benchmarks(benchmarks, repeats=1, target_s=0.001))
+    names = {result.name for result in results}
+    assert "inventory.search[40]" in names
+    assert "selection_store._persist[3]" in names
+    assert all(result.median_us > 0 for result in results)
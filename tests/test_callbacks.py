@@ -0,0 +1,127 @@
+from pathlib import Path
+import asyncio
+import base64
+import json
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import pytest
+from aiogram import Bot
+from aiogram.dispatcher.event.bases import UNHANDLED
+from aiogram.types import CallbackQuery, User
+
+from bot.callbacks import (
+    Action,
+    CallbackPayload,
+    CallbackRouter,
+    decode_callback,
+    encode_callback,
+)
+from bot.config import Settings
+from bot.context import set_app_context
+from bot.keyboards.catalog import product_actions_keyboard
+from bot.main import build_app_context, build_dispatcher
+from bot.services.inventory_stub import InventoryStub
+from bot.tools.synthetic import TEST_TOKEN, FakeSession, UpdateFactory
+
+
+def test_codec_round_trips_and_rejects_foreign_data():
+    data = encode_callback(Action.CATALOG_FILTER, 0xABCDEF, 0xAB12CD34EF)
+    assert decode_callback(data) == CallbackPayload(Action.CATALOG_FILTER, (0xABCDEF, 0xAB12CD34EF))
+    data = encode_callback(Action.SELECTION_ADD, "CR-DBC-210")
+    assert decode_callback(data) == CallbackPayload(Action.SELECTION_ADD, ("CR-DBC-210",))
+    assert len(data) <= 20
+    assert decode_callback(encode_callback(Action.SELECTION_QUOTE, "Ковролин-1")).args == (
+        "Ковролин-1",
+    )
+
+    for foreign in ("consent_yes", "yes", "manager:question", "catalog:back", "", None, "A" * 80):
+        assert decode_callback(foreign) is None
+    # Wrong arity, truncated varints and strings, bad UTF-8, other versions and
+    # unknown actions are rejected.
+    for raw in (
+        b"\x01\x02\x05\x06\x07",
+        b"\x01\x03\x80",
+        b"\x01\x10\x05SKU",
+        b"\x01\x10\x02\xff\xfe",
+        b"\x02\x03\x05",
+        b"\x01\x7f\x05",
+    ):
+        assert decode_callback(base64.urlsafe_b64encode(raw).decode().rstrip("=")) is None
+    with pytest.raises(ValueError):
+        encode_callback(Action.CATALOG_CATEGORY)
+    with pytest.raises(TypeError):
+        encode_callback(Action.SELECTION_ADD, 7)
+    with pytest.raises(ValueError):
+        encode_callback(Action.SELECTION_ADD, "X" * 60)
+
+
+def test_router_dispatches_by_action_and_passes_payload():
+    router = CallbackRouter(name="test-callbacks")
+    seen: list[tuple[str, tuple[int | str, ...]]] = []
+
+    @router.action(Action.SELECTION_ADD)
+    async def add(callback: CallbackQuery, payload: CallbackPayload) -> str:
+        seen.append(("add", payload.args))
+        return "added"
+
+    @router.action(Action.SELECTION_CLEAR, lambda callback: False)
+    async def clear(callback: CallbackQuery) -> str:
+        return "cleared"
+
+    def press(data: str) -> object:
+        event = CallbackQuery(
+            id="1",
+            from_user=User(id=1, is_bot=False, first_name="Test"),
+            chat_instance="1",
+            data=data,
+        )
+        return asyncio.run(router.callback_query.trigger(event))
+
+    assert press(encode_callback(Action.SELECTION_ADD, "SKU-1")) == "added"
+    assert seen == [("add", ("SKU-1",))]
+    assert press(encode_callback(Action.SELECTION_CLEAR)) is UNHANDLED
+    assert press(encode_callback(Action.SELECTION_SEND)) is UNHANDLED
+    assert press("selection:add:SKU-1") is UNHANDLED
+
+
+def test_product_buttons_keep_their_sku_across_catalogue_rebuilds(tmp_path):
+    catalog_path = tmp_path / "catalog.json"
+    catalog = json.loads((BASE_DIR / "data" / "catalog.json").read_text(encoding="utf-8"))
+    catalog_path.write_text(json.dumps(catalog, ensure_ascii=False), encoding="utf-8")
+    inventory = InventoryStub(catalog_path)
+    first, kept = inventory.search("Ковролин", {})[:2]
+    markup = product_actions_keyboard(kept.sku)
+
+    # A restart with the first product removed from the file.
+    catalog["Ковролин"]["products"].remove(
+        next(raw for raw in catalog["Ковролин"]["products"] if raw["sku"] == first.sku)
+    )
+    catalog_path.write_text(json.dumps(catalog, ensure_ascii=False), encoding="utf-8")
+    rebuilt = InventoryStub(catalog_path)
+
+    for row in markup.inline_keyboard:
+        payload = decode_callback(row[0].callback_data)
+        assert payload is not None and payload.args == (kept.sku,)
+        assert rebuilt.get(payload.args[0]) == kept
+
+
+def test_buttons_from_before_the_codec_restart_browsing(tmp_path):
+    settings = Settings(bot_token=TEST_TOKEN, manager_chat_id=-1, tmp_dir=tmp_path)
+    ctx = build_app_context(settings)
+    set_app_context(ctx)
+    dp = build_dispatcher(rate_limit=False)
+    session = FakeSession(serialize=False)
+    bot = Bot(TEST_TOKEN, session=session)
+    updates = UpdateFactory()
+
+    async def press(data: str) -> list[str]:
+        await dp.feed_update(bot, updates.callback(7, data))
+        return [text for sent in session.take_inbox(7) for text, _ in sent.buttons()]
+
+    for data in ("catalog:category:Ковролин", "selection:add:CR-AW-001"):
+        assert asyncio.run(press(data))[:-1] == list(ctx.inventory.ids.categories)
+    assert session.stats.calls["AnswerCallbackQuery"] == 2
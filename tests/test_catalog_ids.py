@@ -0,0 +1,142 @@
+from pathlib import Path
+import asyncio
+import json
+import shutil
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from aiogram import Bot
+
+from bot.callbacks import Action, decode_callback, encode_callback
+from bot.config import Settings
+from bot.context import set_app_context
+from bot.main import build_app_context, build_dispatcher
+from bot.services.catalog_ids import IdTable
+from bot.services.inventory_stub import InventoryStub
+from bot.tools.synthetic import TEST_TOKEN, FakeSession, UpdateFactory
+
+
+def test_id_table_keeps_ids_and_retires_removed_keys():
+    first = IdTable(["a", "b", "c"])
+    second = IdTable(["c", "d", "a"], previous=first)
+
+    assert [second.id(key) for key in "acd"] == [0, 2, 3]
+    assert second.get(1) is None  # "b" left; its ID is not reused
+    assert list(second) == ["c", "d", "a"]
+    assert list(second.items()) == [(2, "c"), (3, "d"), (0, "a")]
+    assert len(second) == 3
+
+
+def _write_catalog(path: Path, colors: dict[str, list[str]]) -> None:
+    catalog = {
+        category: {
+            "filters": ["Цвет"],
+            "products": [
+                {"sku": f"{category}-{color}", "name": color, "brand": "AW", "color": color}
+                for color in values
+            ],
+        }
+        for category, values in colors.items()
+    }
+    path.write_text(json.dumps(catalog, ensure_ascii=False), encoding="utf-8")
+
+
+def test_option_ids_survive_catalog_reload(tmp_path):
+    path = tmp_path / "catalog.json"
+    _write_catalog(path, {"Ковролин": ["Серый", "Синий"], "ПВХ плитка": ["Бежевый"]})
+    inventory = InventoryStub(path)
+    ids = inventory.ids
+    grey = ids.options.id(("Ковролин", "Цвет", "Серый"))
+    blue = ids.options.id(("Ковролин", "Цвет", "Синий"))
+    assert ids.facets[("Ковролин", "Цвет")] == {grey: "Серый", blue: "Синий"}
+    assert inventory.filter_options("Ковролин", "Цвет") == ["Серый", "Синий"]
+
+    _write_catalog(path, {"ПВХ плитка": ["Бежевый"], "Ковролин": ["Зелёный", "Серый"]})
+    inventory.reload()
+    ids = inventory.ids
+
+    assert ids.options.get(grey) == ("Ковролин", "Цвет", "Серый")
+    assert ids.options.get(blue) is None  # a stale button is detected, not misrouted
+    green = ids.options.id(("Ковролин", "Цвет", "Зелёный"))
+    assert green not in (grey, blue)
+    assert ids.facets[("Ковролин", "Цвет")] == {green: "Зелёный", grey: "Серый"}
+    assert list(ids.categories) == ["ПВХ плитка", "Ковролин"]
+    assert ids.categories.id("Ковролин") == 0
+
+
+def test_tags_name_the_numbering_not_just_the_file(tmp_path):
+    path = tmp_path / "catalog.json"
+    _write_catalog(path, {"Ковролин": ["Серый", "Синий"]})
+    running = InventoryStub(path)
+    assert InventoryStub(path).ids.tag == running.ids.tag  # a restart on the same file
+    first_tag = running.ids.tag
+
+    running.reload()  # unchanged file: same numbering, same tag
+    assert running.ids.tag == first_tag
+
+    _write_catalog(path, {"Ковролин": ["Синий"]})
+    running.reload()
+    restarted = InventoryStub(path)
+    assert running.ids.tags == {first_tag, running.ids.tag}
+    # The running process kept "Синий" at 1; a fresh numbering puts it at 0.
+    blue = ("Ковролин", "Цвет", "Синий")
+    assert running.ids.options.id(blue) == 1 and restarted.ids.options.id(blue) == 0
+    assert restarted.ids.tags == {restarted.ids.tag}
+    assert restarted.ids.tag not in running.ids.tags
+
+
+def test_buttons_from_before_a_restart_are_rejected_after_a_removal(tmp_path):
+    data_dir = tmp_path / "data"
+    shutil.copytree(BASE_DIR / "data", data_dir)
+    catalog_path = data_dir / "catalog.json"
+    _write_catalog(catalog_path, {"Ковролин": ["Серый", "Синий"], "ПВХ плитка": ["Бежевый"]})
+    before = InventoryStub(catalog_path)
+    grey = before.ids.options.id(("Ковролин", "Цвет", "Серый"))
+    stale_option = encode_callback(Action.CATALOG_FILTER, before.ids.tag, grey)
+    stale_category = encode_callback(
+        Action.CATALOG_CATEGORY, before.ids.tag, before.ids.categories.id("ПВХ плитка")
+    )
+
+    # Restart after "Серый" was removed: IDs are numbered from scratch.
+    _write_catalog(catalog_path, {"Ковролин": ["Синий"], "ПВХ плитка": ["Бежевый"]})
+    settings = Settings(
+        bot_token=TEST_TOKEN, manager_chat_id=-1, data_dir=data_dir, tmp_dir=tmp_path
+    )
+    ctx = build_app_context(settings)
+    set_app_context(ctx)
+    assert ctx.inventory.ids.options.get(grey) == ("Ковролин", "Цвет", "Синий")
+    dispatcher = build_dispatcher(rate_limit=False)
+    session = FakeSession(serialize=False)
+    bot = Bot(TEST_TOKEN, session=session)
+    updates = UpdateFactory()
+    category_id = ctx.inventory.ids.categories.id("Ковролин")
+    fresh_category = encode_callback(Action.CATALOG_CATEGORY, ctx.inventory.ids.tag, category_id)
+
+    async def press(data: str) -> list:
+        await dispatcher.feed_update(bot, updates.callback(7, data))
+        return session.take_inbox(7)
+
+    async def flow() -> dict:
+        data = await dispatcher.fsm.get_context(bot, chat_id=7, user_id=7).get_data()
+        return data["catalog_flow"]
+
+    async def scenario() -> tuple[list, list, dict, dict]:
+        stale = await press(stale_category)
+        await press(fresh_category)
+        picked = await flow()
+        filtered = await press(stale_option)
+        return stale, filtered, picked, await flow()
+
+    stale, filtered, picked, after = asyncio.run(scenario())
+    for sent in (stale, filtered):
+        assert [message.text for message in sent] == [
+            "Каталог обновился. Выберите категорию заново:"
+        ]
+        payloads = [decode_callback(row[0].callback_data) for row in sent[0].markup.inline_keyboard]
+        assert {payload.args[0] for payload in payloads if payload.args} == {ctx.inventory.ids.tag}
+    assert picked["category"] == "Ковролин"
+    # The stale option press did not apply "Синий" in place of "Серый".
+    assert after == {"filters": {}, "category": None, "step": 0}
@@ -0,0 +1,87 @@
+from pathlib import Path
+import asyncio
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import pytest
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.types import BufferedInputFile
+
+from bot.config import Settings
+from bot.main import start_bot
+from bot.services.http_session import build_session
+from bot.services.text_templates import get_text_library
+from bot.tools.fake_telegram import FakeTelegram
+from bot.tools.synthetic import TEST_TOKEN, UpdateFactory
+
+
+def test_fake_api_answers_methods_and_injects_flood_errors():
+    fake = FakeTelegram(flood_every=4, retry_after=3)
+
+    async def scenario() -> None:
+        url = await fake.start()
+        settings = Settings(bot_token=TEST_TOKEN, manager_chat_id=-1, bot_api_url=url)
+        bot = Bot(TEST_TOKEN, session=build_session(settings))
+        try:
+            sent = await bot.send_message(42, "hi")
+            edited = await bot.edit_message_text("hello", chat_id=42, message_id=sent.message_id)
+            document = await bot.send_document(-1, BufferedInputFile(b"xlsx", "a.xlsx"))
+            with pytest.raises(TelegramRetryAfter) as flood:
+                await bot.delete_message(42, sent.message_id)
+        finally:
+            await bot.session.close()
+            await fake.stop()
+        assert edited.message_id == sent.message_id and edited.text == "hello"
+        assert document.document.file_name == "a.xlsx"
+        assert flood.value.retry_after == 3
+
+    asyncio.run(scenario())
+    assert fake.calls == {
+        "sendMessage": 1,
+        "editMessageText": 1,
+        "sendDocument": 1,
+        "deleteMessage": 1,
+    }
+    assert fake.flooded == {"deleteMessage": 1}
+    assert fake.uploaded_bytes == 4
+
+
+def test_start_bot_runs_end_to_end_against_the_fake_api(tmp_path):
+    fake = FakeTelegram()
+    factory = UpdateFactory()
+    catalog_label = get_text_library(BASE_DIR / "data").menu_labels()["catalog"]
+
+    async def scenario() -> None:
+        settings = Settings(
+            bot_token=TEST_TOKEN,
+            manager_chat_id=-1,
+            tmp_dir=tmp_path,
+            autosave_selection=False,
+            bot_api_url=await fake.start(),
+        )
+        bot_task = asyncio.create_task(start_bot(settings))
+        try:
+            await fake.wait_for("getUpdates")
+            for replies, text in enumerate(("/start", catalog_label), start=1):
+                update = factory.message(10_000, text)
+                fake.push_update(update.model_dump(mode="json", by_alias=True, exclude_none=True))
+                await fake.wait_for("sendMessage", replies)
+                # Let the rate limiter's interval pass, as a person would.
+                await asyncio.sleep(0.7)
+        finally:
+            bot_task.cancel()
+            await asyncio.gather(bot_task, return_exceptions=True)
+            await fake.stop()
+
+    asyncio.run(scenario())
+    # Per flow: one reply to /start, one category menu; nothing else goes out.
+    assert fake.calls["getMe"] == 1
+    assert fake.calls["deleteWebhook"] == 1
+    assert fake.calls["sendMessage"] == 2
+    assert set(fake.calls) == {"getMe", "deleteWebhook", "getUpdates", "sendMessage"}
+    replies = fake.sent[10_000]
+    assert replies[1]["reply_markup"]["inline_keyboard"]
@@ -0,0 +1,43 @@
+from pathlib import Path
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from bot.services.inventory_stub import InventoryStub
+from bot.services.pricing_stub import PricingStub
+from bot.services.selection_store import SelectionStore
+from bot.tools.gen_catalog import ensure_dataset, write_catalog
+
+
+def test_generated_dataset_loads_into_stubs(tmp_path):
+    paths = ensure_dataset(tmp_path, size=400, seed=3, users=5)
+
+    inventory = InventoryStub(paths.catalog)
+    categories = inventory.categories()
+    assert sum(len(inventory.search(item.name, {})) for item in categories) == 400
+    for category in categories:
+        for name in category.filters:
+            assert inventory.filter_options(category.name, name), (category.name, name)
+
+    pricing = PricingStub(paths.pricing)
+    skus = [product.sku for product in inventory.search(categories[0].name, {})]
+    prices = [value for value in pricing.price_many(skus).values() if value is not None]
+    assert len(prices) > len(skus) * 0.9 and min(prices) > 0
+    assert pricing.promos()
+
+    store = SelectionStore(paths.selections_dir)
+    assert all(store.list(10_000 + offset) for offset in range(5))
+    assert (paths.data_dir / "styles.yaml").exists()
+    # A second call reuses the cached dataset.
+    assert ensure_dataset(tmp_path, size=400, seed=3, users=5) == paths
+
+
+def test_catalog_generation_is_seeded(tmp_path):
+    write_catalog(tmp_path / "a.json", 120, seed=1)
+    write_catalog(tmp_path / "b.json", 120, seed=1)
+    write_catalog(tmp_path / "c.json", 120, seed=2)
+
+    assert (tmp_path / "a.json").read_bytes() == (tmp_path / "b.json").read_bytes()
+    assert (tmp_path / "a.json").read_bytes() != (tmp_path / "c.json").read_bytes()
@@ -0,0 +1,44 @@
+from pathlib import Path
+import asyncio
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from bot.config import Settings
+from bot.services.http_session import TunedAiohttpSession, build_session
+from bot.tools.session_bench import measure_session
+
+
+def test_settings_configure_the_session():
+    settings = Settings.model_validate(
+        {
+            "BOT_TOKEN": "1:x",
+            "MANAGER_CHAT_ID": 1,
+            "BOT_API_POOL_SIZE": "8",
+            "BOT_API_KEEPALIVE_S": "45",
+            "BOT_API_PROXIES": "http://proxy-a:3128, http://proxy-b:3128",
+        }
+    )
+    session = build_session(settings)
+    assert session.limit == 8
+    assert session._connector_init["keepalive_timeout"] == 45
+    assert session.proxies == ["http://proxy-a:3128", "http://proxy-b:3128"]
+
+    async def rotate() -> None:
+        first = await session.create_session()
+        second = await session.create_session()
+        assert first is not second
+        assert await session.create_session() is first
+        await session.close()
+
+    asyncio.run(rotate())
+
+
+def test_tuned_session_reuses_its_pool_across_bursts():
+    session = TunedAiohttpSession(limit=5)
+    result = asyncio.run(measure_session("tuned", session, 3, 20, 0.05, latency_ms=5))
+    assert result.errors == 0
+    assert result.requests == 60
+    assert result.connections <= 5
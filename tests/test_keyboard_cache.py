@@ -0,0 +1,48 @@
+from pathlib import Path
+import shutil
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from bot.config import Settings
+from bot.keyboards.cache import KeyboardCache
+from bot.keyboards.common import consent_keyboard
+from bot.main import build_app_context
+from bot.services.catalog_ids import IdTable
+from bot.tools.synthetic import TEST_TOKEN
+
+
+def test_cache_serves_shared_markups_and_rebuilds_on_new_inputs():
+    cache = KeyboardCache()
+    labels = {"catalog": "Каталог", "pick": "Подбор"}
+
+    menu = cache.main_menu(labels)
+    assert cache.main_menu(dict(labels)) is menu
+    assert cache.static(consent_keyboard) is cache.static(consent_keyboard)
+    assert cache.main_menu({**labels, "pick": "🧭 Подбор"}) is not menu
+    carpet = IdTable(["Ковролин"])
+    assert cache.categories(carpet, 1) is not cache.categories(IdTable(["ПВХ"]), 1)
+    assert cache.categories(carpet, 1) is not cache.categories(carpet, 2)
+
+    cache.sync("v1")
+    assert cache.main_menu(labels) is not menu
+
+
+def test_catalog_reload_invalidates_context_keyboards(tmp_path):
+    data_dir = tmp_path / "data"
+    shutil.copytree(BASE_DIR / "data", data_dir)
+    ctx = build_app_context(
+        Settings(bot_token=TEST_TOKEN, manager_chat_id=-1, data_dir=data_dir, tmp_dir=tmp_path)
+    )
+    sku = ctx.inventory.search("Ковролин", {})[0].sku
+
+    markup = ctx.keyboards.product_actions(sku)
+    assert ctx.keyboards.product_actions(sku) is markup
+
+    catalog = data_dir / "catalog.json"
+    catalog.write_text(catalog.read_text(encoding="utf-8") + "\n", encoding="utf-8")
+    ctx.inventory.reload()
+    assert ctx.keyboards.product_actions(sku) is not markup
+    assert ctx.keyboards.product_actions(sku) == markup
@@ -0,0 +1,55 @@
+from pathlib import Path
+import sys
+import time
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import pytest
+
+from bot.services.estimates import parse_order_input
+from bot.services.layout import (
+    MAX_ROOM_RECTS,
+    Rect,
+    RoomPlanTooLargeError,
+    parse_room_plan,
+    roll_layout,
+    tile_layout,
+)
+
+
+def test_parse_room_plan_l_shape():
+    assert parse_room_plan("5x8+3х4 7") == (Rect(5.0, 8.0), Rect(3.0, 4.0))
+    assert parse_room_plan("40+25 7") is None
+
+    areas, waste, rects = parse_order_input("5x8+3x4 7")
+    assert areas == [40.0, 12.0]
+    assert waste == 7
+    assert rects is not None and len(rects) == 2
+
+
+def test_roll_layout_uses_best_orientation():
+    # Two 5.1 m strips across the 8 m side beat 16.2 running metres along it.
+    result = roll_layout((Rect(5.0, 8.0),), 4.0)
+    assert result.material_m2 == 40.8
+    assert result.waste_pct < 5
+
+
+def test_tile_layout_shares_edge_cuts():
+    result = tile_layout((Rect(5.2, 8.0),), 0.5)
+    # 10 × 16 full tiles plus 16 edge cuts of 0.2 m packed two per tile.
+    assert result.pieces == 168
+    assert result.material_m2 == 42.0
+
+
+def test_long_room_plans_are_rejected_or_laid_out_quickly():
+    started = time.perf_counter()
+    with pytest.raises(RoomPlanTooLargeError):
+        parse_order_input("+".join(["3x4"] * 25) + " 5")
+    assert len(parse_room_plan("+".join(["3x4"] * MAX_ROOM_RECTS))) == MAX_ROOM_RECTS
+
+    rects = tuple(Rect(3.0 + index % 3, 4.5) for index in range(25))
+    layout = roll_layout(rects, 4.0)
+    assert layout.material_m2 >= layout.area_m2
+    assert time.perf_counter() - started < 1.0
@@ -0,0 +1,25 @@
+from pathlib import Path
+import asyncio
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from bot.tools.loadtest import FLOWS, LoadConfig, percentile, run_load
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([], 95) == 0.0
+
+
+def test_synthetic_users_walk_all_flows():
+    report = asyncio.run(run_load(LoadConfig(users=3, latency_ms=0, jitter_ms=0, seed=7)))
+
+    assert report.errors == 0
+    assert {stats.flow for stats in report.flows} == set(FLOWS)
+    # One export per user plus one samples workbook per user.
+    assert report.api_calls["SendDocument"] == 6
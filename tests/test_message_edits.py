@@ -0,0 +1,94 @@
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+import asyncio
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import Chat, InlineKeyboardButton, InlineKeyboardMarkup, Message, User
+
+from bot.services.message_edits import EDITED, FALLBACK, SENT, UNCHANGED, EditTracker
+from bot.tools.synthetic import BOT_USER, TEST_TOKEN, FakeSession
+
+KEYBOARD = InlineKeyboardMarkup(
+    inline_keyboard=[[InlineKeyboardButton(text="Серый", callback_data="AQIA")]]
+)
+
+
+class RefusingSession(FakeSession):
+    """Fails every ``editMessageText`` with the given Bot API description."""
+
+    def __init__(self, description: str) -> None:
+        super().__init__(serialize=False)
+        self.description = description
+
+    async def make_request(self, bot, method, timeout=None):
+        if type(method).__name__ == "EditMessageText":
+            self.stats.calls["EditMessageText"] += 1
+            raise TelegramBadRequest(method=method, message=self.description)
+        return await super().make_request(bot, method, timeout)
+
+
+def _prompt(bot: Bot, age: timedelta = timedelta(0)) -> Message:
+    return Message(
+        message_id=10,
+        date=datetime.now(timezone.utc) - age,
+        chat=Chat(id=5, type="private"),
+        from_user=BOT_USER,
+        text="",
+    ).as_(bot)
+
+
+def _foreign(bot: Bot) -> Message:
+    return Message(
+        message_id=11,
+        date=datetime.now(timezone.utc),
+        chat=Chat(id=5, type="private"),
+        from_user=User(id=5, is_bot=False, first_name="Test"),
+        text="Привет",
+    ).as_(bot)
+
+
+def test_tracker_skips_unchanged_edits_and_sends_when_editing_is_impossible():
+    session = FakeSession(serialize=False)
+    bot = Bot(TEST_TOKEN, session=session)
+    tracker = EditTracker()
+
+    async def scenario() -> list[str]:
+        message = _prompt(bot)
+        return [
+            await tracker.render(message, "Цвет?", KEYBOARD),
+            await tracker.render(message, "Цвет?", KEYBOARD),
+            await tracker.render(message, "Размер?", None),
+            await tracker.render(_prompt(bot, timedelta(days=3)), "Цвет?", KEYBOARD),
+            await tracker.render(_foreign(bot), "Цвет?", KEYBOARD),
+        ]
+
+    # Old bot messages are still edited; only other senders' messages get a new one.
+    assert asyncio.run(scenario()) == [EDITED, UNCHANGED, EDITED, EDITED, SENT]
+    assert session.stats.calls == {"EditMessageText": 3, "SendMessage": 1}
+    assert tracker.stats == {EDITED: 3, UNCHANGED: 1, SENT: 1}
+    assert len(tracker) == 2  # the edited prompt and the message sent instead
+
+
+def test_tracker_treats_not_modified_as_done_and_replaces_uneditable_messages():
+    not_modified = RefusingSession("Bad Request: message is not modified")
+    bot = Bot(TEST_TOKEN, session=not_modified)
+    assert asyncio.run(EditTracker().render(_prompt(bot), "Цвет?", KEYBOARD)) == UNCHANGED
+    assert not_modified.stats.calls == {"EditMessageText": 1}
+
+    refused = RefusingSession("Bad Request: message can't be edited")
+    bot = Bot(TEST_TOKEN, session=refused)
+    assert asyncio.run(EditTracker().render(_prompt(bot), "Цвет?", KEYBOARD)) == FALLBACK
+    assert refused.stats.calls == {"EditMessageText": 1, "DeleteMessage": 1, "SendMessage": 1}
+
+    # Too old to delete: the new prompt is sent and the old one left alone.
+    refused = RefusingSession("Bad Request: message can't be edited")
+    bot = Bot(TEST_TOKEN, session=refused)
+    old = _prompt(bot, timedelta(days=3))
+    assert asyncio.run(EditTracker().render(old, "Цвет?", KEYBOARD)) == FALLBACK
+    assert refused.stats.calls == {"EditMessageText": 1, "SendMessage": 1}
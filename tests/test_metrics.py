@@ -0,0 +1,102 @@
+from pathlib import Path
+import asyncio
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import pytest
+
+from bot.middlewares.metrics import HandlerLabelMiddleware, MetricsMiddleware
+from bot.services.metrics import (
+    HANDLER_DURATION,
+    HANDLER_ERRORS,
+    SERVICE_DURATION,
+    MetricsRegistry,
+    TimedProxy,
+    registry,
+)
+
+
+@pytest.fixture()
+def enabled_registry():
+    registry.reset()
+    registry.enable()
+    yield registry
+    registry.enable(False)
+    registry.reset()
+
+
+def test_render_prometheus_text():
+    local = MetricsRegistry()
+    local.counter("requests_total", "Requests").inc(route="a")
+    local.counter("requests_total").inc(2, route="a")
+    local.histogram("latency_seconds", buckets=(0.1, 1.0)).observe(0.5, route="a")
+
+    text = local.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{route="a"} 3' in text
+    assert 'latency_seconds_bucket{route="a",le="0.1"} 0' in text
+    assert 'latency_seconds_bucket{route="a",le="1"} 1' in text
+    assert 'latency_seconds_bucket{route="a",le="+Inf"} 1' in text
+    assert 'latency_seconds_count{route="a"} 1' in text
+
+    with pytest.raises(TypeError):
+        local.histogram("requests_total")
+    with pytest.raises(TypeError):
+        local.gauge("requests_total")
+
+
+class _Handler:
+    def __init__(self, callback):
+        self.callback = callback
+
+
+async def sample_handler():
+    return None
+
+
+def test_middleware_records_handler_latency_and_errors(enabled_registry):
+    outer = MetricsMiddleware("message")
+    inner = HandlerLabelMiddleware()
+
+    async def run(fail: bool):
+        async def final(event, data):
+            if fail:
+                raise RuntimeError("boom")
+
+        async def routed(event, data):
+            data = {**data, "handler": _Handler(sample_handler)}
+            return await inner(final, event, data)
+
+        await outer(routed, object(), {})
+
+    asyncio.run(run(False))
+    with pytest.raises(RuntimeError):
+        asyncio.run(run(True))
+
+    name = "test_metrics.sample_handler"
+    histogram = enabled_registry.histogram(HANDLER_DURATION)
+    assert histogram.count(event="message", handler=name, outcome="ok") == 1
+    assert histogram.count(event="message", handler=name, outcome="error") == 1
+    assert enabled_registry.counter(HANDLER_ERRORS).value(event="message", handler=name) == 1
+
+
+def test_timed_proxy_is_inert_when_disabled():
+    class Port:
+        def price(self, sku):
+            return 10.0
+
+    proxy = TimedProxy(Port(), "pricing")
+    assert proxy.price("A") == 10.0
+    assert registry.histogram(SERVICE_DURATION).count(service="pricing", method="price") == 0
+
+    registry.enable()
+    try:
+        proxy.price("A")
+        histogram = registry.histogram(SERVICE_DURATION)
+        assert histogram.count(service="pricing", method="price") == 1
+    finally:
+        registry.enable(False)
+        registry.reset()
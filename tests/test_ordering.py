@@ -0,0 +1,103 @@
+from pathlib import Path
+import asyncio
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from aiogram import Bot, Dispatcher, Router
+from aiogram.fsm.context import FSMContext
+from aiogram.types import Message
+
+from bot.middlewares.ordering import OrderingMiddleware
+from bot.middlewares.replies import ReplyMiddleware
+from bot.tools.synthetic import TEST_TOKEN, FakeSession, UpdateFactory
+
+
+def _dispatcher(max_concurrency: int) -> tuple[Dispatcher, OrderingMiddleware, list[int]]:
+    running: list[int] = []
+    peak = [0]
+    router = Router()
+
+    @router.message()
+    async def tap(message: Message, state: FSMContext) -> None:
+        running.append(message.from_user.id)
+        peak[0] = max(peak[0], len(running))
+        # Read-modify-write with a pause in between, like the catalog filter steps.
+        taps = (await state.get_data()).get("taps", [])
+        await asyncio.sleep(0.05)
+        await state.update_data(taps=[*taps, message.text])
+        running.remove(message.from_user.id)
+
+    ordering = OrderingMiddleware(max_concurrency)
+    dp = Dispatcher()
+    dp.update.outer_middleware(ordering)
+    dp.include_router(router)
+    return dp, ordering, peak
+
+
+def test_updates_of_one_user_are_serialised_and_users_run_in_parallel():
+    dp, ordering, peak = _dispatcher(max_concurrency=0)
+    bot = Bot(TEST_TOKEN, session=FakeSession())
+    factory = UpdateFactory()
+    updates = [factory.message(user, str(index)) for index in range(4) for user in (1, 2, 3)]
+
+    async def scenario() -> tuple[float, list[str]]:
+        started = asyncio.get_running_loop().time()
+        await asyncio.gather(*(dp.feed_update(bot, update) for update in updates))
+        elapsed = asyncio.get_running_loop().time() - started
+        data = await dp.fsm.get_context(bot, chat_id=1, user_id=1).get_data()
+        return elapsed, data["taps"]
+
+    elapsed, taps = asyncio.run(scenario())
+    assert taps == ["0", "1", "2", "3"]
+    assert peak[0] == 3
+    assert elapsed < 0.05 * 4 * 2
+    assert ordering.max_pending() == 0 and not ordering._slots
+
+
+def test_global_limit_bounds_handlers_in_flight():
+    dp, _, peak = _dispatcher(max_concurrency=2)
+    bot = Bot(TEST_TOKEN, session=FakeSession())
+    factory = UpdateFactory()
+
+    async def scenario() -> None:
+        await asyncio.gather(
+            *(dp.feed_update(bot, factory.message(user, "x")) for user in range(1, 7))
+        )
+
+    asyncio.run(scenario())
+    assert peak[0] == 2
+
+
+class SlowFirstSession(FakeSession):
+    """Takes longer to send the first reply than the ones after it."""
+
+    async def make_request(self, bot, method, timeout=None):
+        if getattr(method, "text", None) == "echo 0":
+            await asyncio.sleep(0.05)
+        return await super().make_request(bot, method, timeout)
+
+
+def test_returned_replies_are_sent_before_the_user_lock_is_released():
+    router = Router()
+
+    @router.message()
+    async def echo(message: Message):
+        return message.answer(f"echo {message.text}")
+
+    dp = Dispatcher()
+    dp.update.outer_middleware(OrderingMiddleware(0))
+    dp.update.outer_middleware(ReplyMiddleware())
+    dp.include_router(router)
+    session = SlowFirstSession()
+    bot = Bot(TEST_TOKEN, session=session)
+    factory = UpdateFactory()
+    updates = [factory.message(1, str(index)) for index in range(3)]
+
+    async def scenario() -> None:
+        await asyncio.gather(*(dp.feed_update(bot, update) for update in updates))
+
+    asyncio.run(scenario())
+    assert [sent.text for sent in session.take_inbox(1)] == ["echo 0", "echo 1", "echo 2"]
@@ -0,0 +1,90 @@
+from itertools import product as cartesian
+from math import ceil
+from pathlib import Path
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from bot.services.pack_optimizer import PackSize, Room, optimize_packs
+
+rooms_strategy = st.lists(
+    st.builds(
+        Room,
+        area_m2=st.floats(min_value=0.5, max_value=40, allow_nan=False).map(lambda v: round(v, 1)),
+        waste_pct=st.integers(min_value=0, max_value=15),
+    ),
+    min_size=1,
+    max_size=3,
+)
+packs_strategy = st.lists(
+    st.builds(
+        PackSize,
+        size_m2=st.sampled_from([1.5, 2.0, 2.2, 2.5, 3.0, 3.5, 4.0, 5.0]),
+        price=st.integers(min_value=500, max_value=9000).map(float),
+        available=st.one_of(st.none(), st.integers(min_value=0, max_value=25)),
+    ),
+    min_size=1,
+    max_size=3,
+    unique_by=lambda pack: pack.size_m2,
+)
+
+
+def _brute_force(rooms, packs, objective):
+    required = sum(room.required_m2 for room in rooms)
+    bounds = [
+        (
+            min(pack.available, ceil(required / pack.size_m2) + 1)
+            if pack.available is not None
+            else ceil(required / pack.size_m2) + 1
+        )
+        for pack in packs
+    ]
+    best = None
+    for counts in cartesian(*(range(bound + 1) for bound in bounds)):
+        total = round(
+            sum(pack.size_m2 * count for pack, count in zip(packs, counts, strict=True)), 2
+        )
+        if round(total * 100) < ceil(round(required * 100, 6)):
+            continue
+        cost = round(sum(pack.price * count for pack, count in zip(packs, counts, strict=True)), 2)
+        key = (cost, total, sum(counts)) if objective == "cost" else (total, sum(counts), cost)
+        if best is None or key < best:
+            best = key
+    return best
+
+
+@settings(max_examples=150, deadline=None)
+@given(rooms=rooms_strategy, packs=packs_strategy, objective=st.sampled_from(["cost", "waste"]))
+def test_optimizer_matches_brute_force(rooms, packs, objective):
+    plan = optimize_packs(rooms, packs, objective)
+    expected = _brute_force(rooms, packs, objective)
+    if expected is None:
+        assert plan is None
+        return
+
+    assert plan is not None
+    key = (
+        (plan.cost, plan.total_m2, plan.packs)
+        if objective == "cost"
+        else (plan.total_m2, plan.packs, plan.cost)
+    )
+    assert key == expected
+    assert plan.total_m2 >= plan.required_m2 - 0.01
+
+
+def test_optimizer_objectives():
+    rooms = [Room(12, 5), Room(6.5, 10)]
+    packs = [PackSize(4.0, price=4000.0), PackSize(2.5, price=2300.0)]
+
+    least_waste = optimize_packs(rooms, packs, "waste")
+    assert least_waste.total_m2 == 20.0
+    assert least_waste.describe() == "5 × 4 м²"
+
+    cheapest = optimize_packs(rooms, packs, "cost")
+    assert cheapest.cost == 18400.0
+    assert cheapest.describe() == "8 × 2.5 м²"
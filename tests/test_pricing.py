@@ -0,0 +1,46 @@
+from pathlib import Path
+from datetime import date
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from bot.services.pricing_port import Promo
+from bot.services.pricing_stub import PricingStub
+from bot.services.promo_index import PromoIndex
+
+
+def test_price_many_and_index():
+    pricing = PricingStub()
+    prices = pricing.price_many(["CR-AW-001", "LN-TK-201", "UNKNOWN"])
+    assert prices == {"CR-AW-001": 1250.0, "LN-TK-201": 890.0, "UNKNOWN": None}
+
+    skus = ["CR-AW-001", "CR-AW-002", "CT-RCT-101", "LN-TK-201", "UNKNOWN"]
+    index = pricing.price_index("demo", skus)
+    assert index.under(1300) == ["LN-TK-201", "CR-AW-001"]
+    assert index.between(1300, 1400) == ["CR-AW-002", "CT-RCT-101"]
+    assert index.count_under(100) == 0
+    assert index.cheapest() == 890.0
+    assert pricing.price_index("demo", skus) is index
+
+
+def test_promo_index_expires_and_indexes_by_sku():
+    today = [date(2025, 6, 1)]
+    index = PromoIndex(
+        [
+            Promo(code="A", title="A", description="", valid_until=date(2025, 6, 10), skus=["X"]),
+            Promo(code="B", title="B", description="", valid_until=None, skus=["X", "Y"]),
+            Promo(code="OLD", title="Old", description="", valid_until=date(2025, 5, 1)),
+        ],
+        today=lambda: today[0],
+    )
+    assert [promo.code for promo in index.active()] == ["A", "B"]
+    assert index.active() is index.active()
+    found = index.promos_for(["X", "Y", "Z"])
+    assert [promo.code for promo in found["X"]] == ["A", "B"]
+    assert "Z" not in found
+
+    today[0] = date(2025, 6, 11)
+    assert [promo.code for promo in index.promos_for(["X"])["X"]] == ["B"]
+    assert [promo.code for promo in index.active()] == ["B"]
@@ -0,0 +1,41 @@
+from pathlib import Path
+import asyncio
+import sys
+import time
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import pytest
+
+from bot.services.profiling import ProfilerBusyError, run_profile
+
+
+def busy_loop(seconds: float) -> None:
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        sum(range(1000))
+
+
+def test_profile_collects_collapsed_stacks_and_allocations():
+    async def scenario():
+        async def work():
+            for _ in range(20):
+                busy_loop(0.02)
+                await asyncio.sleep(0)
+
+        profile = asyncio.create_task(run_profile(1.0, cpu=True, memory=True, interval=0.002))
+        await asyncio.sleep(0)
+        with pytest.raises(ProfilerBusyError):
+            await run_profile(1.0)
+        await work()
+        return await profile
+
+    report = asyncio.run(scenario())
+    assert report.samples > 0
+    lines = report.collapsed.splitlines()
+    assert any("busy_loop (test_profiling.py" in line for line in lines)
+    stack, count = lines[0].rsplit(" ", 1)
+    assert ";" in stack and int(count) > 0
+    assert report.allocations
@@ -0,0 +1,73 @@
+from pathlib import Path
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from openpyxl import load_workbook
+
+from bot.services.export import selection_to_workbook
+from bot.services.pricing_stub import PricingStub
+from bot.services.quotes import QuoteEngine
+from bot.services.selection_store import SelectionEntry, SelectionStore
+
+
+def _entry(sku: str, total_m2: float, pack_step: float | None) -> SelectionEntry:
+    return SelectionEntry(
+        sku=sku,
+        name=sku,
+        category="Ковровая плитка",
+        brand="RCT",
+        area_m2=total_m2,
+        waste_pct=0,
+        total_m2=total_m2,
+        pack_step=pack_step,
+    )
+
+
+def test_quote_prices_packs_and_promos(tmp_path):
+    store = SelectionStore(tmp_path, autosave=False)
+    engine = QuoteEngine(PricingStub(), store, volume_tiers=((1000.0, 8.0),))
+    store.add(1, _entry("CT-RCT-101", 110.0, 5.0))
+    store.add(1, _entry("CR-SK-103", 14.0, 3.5))
+
+    quote = engine.quote(1)
+    first, second = quote.lines
+    assert first.packs == 22 and first.billed_m2 == 110.0
+    assert first.discount_pct == 5.0 and first.promo_codes == ["WELCOME-2025"]
+    assert first.amount == round(110.0 * 1380.0 * 0.95, 2)
+    assert second.packs == 4 and second.unit_price is None and second.amount is None
+    assert quote.missing_prices == ["CR-SK-103"]
+    assert quote.total == first.amount
+
+    assert engine.quote(1) is quote
+    single = engine.quote_sku(1, "CR-SK-103")
+    assert [line.sku for line in single.lines] == ["CR-SK-103"]
+    assert engine.quote_sku(1, "CT-OTHER") is None
+    store.remove(1, "CR-SK-103")
+    assert engine.quote(1) is not quote
+
+    payload = selection_to_workbook(store.to_lines(1), customer={}, quote=engine.quote(1))
+    workbook = load_workbook(payload)
+    assert "Смета" in workbook.sheetnames
+    assert workbook["Смета"]["A2"].value == "CT-RCT-101"
+
+
+def test_sku_quote_uses_the_selection_tier_and_cache_is_bounded(tmp_path):
+    store = SelectionStore(tmp_path, autosave=False)
+    engine = QuoteEngine(PricingStub(), store, volume_tiers=((100.0, 8.0),), max_entries=2)
+    store.add(1, _entry("CT-RCT-101", 60.0, 5.0))
+    store.add(1, _entry("CR-SK-103", 60.0, 3.5))
+
+    quote = engine.quote(1)
+    single = engine.quote_sku(1, "CT-RCT-101")
+    (line,) = single.lines
+    assert line == quote.lines[0]
+    assert line.discount_pct == 8.0 and single.tier_discount_pct == 8.0
+    assert single.total == line.amount
+
+    assert engine.quote(1) is quote
+    for user_id in (2, 3):
+        engine.quote(user_id)
+    assert engine.quote(1) is not quote  # evicted by the two newer users
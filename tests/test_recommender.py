@@ -0,0 +1,66 @@
+from pathlib import Path
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from bot.services.inventory_stub import InventoryStub
+from bot.services.pricing_stub import PricingStub
+from bot.services.recommender import Recommender, text_similarity
+
+
+def _recommender() -> Recommender:
+    inventory = InventoryStub(BASE_DIR / "data" / "catalog.json")
+    return Recommender(inventory, PricingStub())
+
+
+def test_text_similarity_tolerates_word_forms_and_typos():
+    assert text_similarity("Офис", "Для офиса") >= 0.9
+    assert text_similarity("комерческий", "Коммерческий") >= 0.75
+    assert text_similarity("Серый, спокойные тона", "Серый") >= 0.6
+    assert text_similarity("Спортзал", "Для офиса") == 0.0
+
+
+def test_recommendations_are_ranked_and_deterministic():
+    recommender = _recommender()
+    answers = {
+        "application_area": "Офис",
+        "material_type": "ковровая плитка",
+        "usage_class": "Коммерческий",
+        "design_preferences": "серый",
+        "budget": 1500,
+    }
+    first = recommender.recommend(answers, limit=3)
+    second = recommender.recommend(answers, limit=3)
+
+    assert first.category == "Ковровая плитка"
+    assert [item.product.sku for item in first.items] == [item.product.sku for item in second.items]
+    assert first.items[0].product.sku == "CT-RCT-104"
+    scores = [item.score for item in first.items]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_constraints_are_relaxed_when_nothing_matches():
+    recommender = _recommender()
+    result = recommender.recommend(
+        {
+            "application_area": "Отель",
+            "material_type": "Ковролин",
+            "usage_class": "Бытовой",
+            "design_preferences": "Фиолетовый",
+        }
+    )
+    assert result.items
+    assert "design" in result.relaxed
+
+
+def test_unpriced_products_count_as_within_budget():
+    result = _recommender().recommend({"material_type": "Ковролин", "budget": 5000})
+
+    assert result.relaxed == ()
+    prices = [item.price for item in result.items]
+    assert None in prices
+    # Known prices within budget still rank above unknown ones.
+    assert prices[0] is not None
+    assert prices == sorted(prices, key=lambda price: price is None)
@@ -0,0 +1,58 @@
+from pathlib import Path
+import asyncio
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from bot.services.recording import Anonymiser, read_log, recorder
+from bot.tools.loadtest import LoadConfig, run_load
+from bot.tools.replay import ReplayConfig, replay
+
+
+def test_anonymiser_masks_personal_data_and_keeps_replayable_input():
+    anonymise = Anonymiser(b"salt", keep_texts={"🛍 Каталог"})
+    update = {
+        "update_id": 1,
+        "message": {
+            "message_id": 5,
+            "chat": {"id": 42, "type": "private", "first_name": "Иван"},
+            "from_user": {"id": 42, "is_bot": False, "first_name": "Иван", "username": "ivan"},
+            "text": "Иван Петров, +7 916 123-45-67",
+        },
+    }
+    result = anonymise(update)["message"]
+
+    assert result["from_user"]["id"] == result["chat"]["id"] != 42
+    assert result["from_user"]["first_name"] == "User"
+    assert "username" not in result["from_user"]
+    assert result["text"] == "xxxx xxxxxx, +0 000 000-00-00"
+    assert anonymise.text("🛍 Каталог") == "🛍 Каталог"
+    assert anonymise.text("5x8+3x4") == "5x8+3x4"
+    assert anonymise.text("/start") == "/start"
+    assert Anonymiser(b"salt").pseudonym(42) == anonymise.pseudonym(42)
+    assert anonymise.pseudonym(-100) < 0
+
+
+def test_recorded_traffic_replays_without_errors(tmp_path):
+    path = tmp_path / "updates.jsonl.gz"
+    recorder.configure(path, salt="test", flush_every=1)
+    try:
+        asyncio.run(
+            run_load(LoadConfig(users=2, flows=("start", "catalog"), latency_ms=0, jitter_ms=0))
+        )
+    finally:
+        recorder.configure(None)
+
+    entries = list(read_log(path))
+    assert entries
+    senders = {entry.update.get("message", {}).get("from_user", {}).get("id") for entry in entries}
+    assert not senders & {10_000, 10_001}
+
+    report, _ = asyncio.run(replay(ReplayConfig(path=path, latency_ms=0, jitter_ms=0)))
+    assert report.errors == 0
+    assert report.updates == len(entries)
+    assert report.users == 2
+    # Menu buttons are recorded verbatim, so replayed users reach the same handlers.
+    assert "menu:catalog" in {stats.flow for stats in report.flows}
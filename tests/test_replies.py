@@ -0,0 +1,98 @@
+from pathlib import Path
+import asyncio
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import pytest
+from aiogram import Bot, Dispatcher, Router
+from aiogram.exceptions import TelegramNetworkError
+from aiogram.methods import SendMessage
+from aiogram.types import Message
+
+from bot.config import Settings
+from bot.context import set_app_context
+from bot.main import build_app_context, build_dispatcher
+from bot.middlewares.replies import ReplyMiddleware
+from bot.tools.synthetic import TEST_TOKEN, FakeSession, UpdateFactory
+
+
+class FailingSession(FakeSession):
+    async def make_request(self, bot, method, timeout=None):
+        raise TelegramNetworkError(method=method, message="unreachable")
+
+
+def _dispatcher(events: list[str]) -> Dispatcher:
+    router = Router()
+
+    @router.message()
+    async def reply(message: Message):
+        events.append("handled")
+        return message.answer(f"echo {message.text}")
+
+    async def outer(handler, event, data):
+        result = await handler(event, data)
+        events.append("released")
+        return result
+
+    dp = Dispatcher()
+    dp.update.outer_middleware(outer)
+    dp.update.outer_middleware(ReplyMiddleware())
+    dp.include_router(router)
+    return dp
+
+
+def test_returned_reply_is_sent_before_outer_middlewares_return():
+    events: list[str] = []
+    dp = _dispatcher(events)
+    session = FakeSession()
+    bot = Bot(TEST_TOKEN, session=session)
+    update = UpdateFactory().message(10, "hi")
+
+    result = asyncio.run(dp.feed_update(bot, update))
+
+    assert result is None
+    assert events == ["handled", "released"]
+    assert [sent.text for sent in session.take_inbox(10)] == ["echo hi"]
+
+
+def test_inline_reply_updates_get_the_method_back():
+    dp = _dispatcher([])
+    session = FakeSession()
+    bot = Bot(TEST_TOKEN, session=session)
+    update = UpdateFactory().message(10, "hi")
+
+    result = asyncio.run(dp.feed_update(bot, update, inline_reply=True))
+
+    assert isinstance(result, SendMessage) and result.text == "echo hi"
+    assert session.stats.calls["SendMessage"] == 0
+
+
+def test_failed_reply_raises_instead_of_being_swallowed():
+    dp = _dispatcher([])
+    bot = Bot(TEST_TOKEN, session=FailingSession())
+    update = UpdateFactory().message(10, "hi")
+
+    with pytest.raises(TelegramNetworkError):
+        asyncio.run(dp.feed_update(bot, update))
+
+
+def test_menu_button_inside_wizard_is_answered(tmp_path):
+    settings = Settings(bot_token=TEST_TOKEN, manager_chat_id=-1, tmp_dir=tmp_path)
+    ctx = build_app_context(settings)
+    set_app_context(ctx)
+    dp = build_dispatcher(rate_limit=False)
+    session = FakeSession(serialize=False)
+    bot = Bot(TEST_TOKEN, session=session)
+    updates = UpdateFactory()
+    labels = ctx.text_library.menu_labels()
+
+    async def scenario() -> list[str | None]:
+        await dp.feed_update(bot, updates.message(7, labels["pick"]))
+        session.take_inbox(7)
+        await dp.feed_update(bot, updates.message(7, labels["delivery"]))
+        return [sent.text for sent in session.take_inbox(7)]
+
+    assert asyncio.run(scenario()) == [ctx.text_library.delivery]
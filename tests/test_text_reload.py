@@ -0,0 +1,126 @@
+from pathlib import Path
+import asyncio
+import shutil
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import pytest
+import yaml
+from aiogram import Bot
+
+from bot.config import Settings
+from bot.context import set_app_context
+from bot.main import build_app_context, build_dispatcher
+from bot.services.text_reload import reload_texts, watch_texts
+from bot.services.text_templates import get_text_library
+from bot.tools.synthetic import TEST_TOKEN, FakeSession, UpdateFactory
+
+
+def _context(tmp_path):
+    data_dir = tmp_path / "data"
+    shutil.copytree(BASE_DIR / "data", data_dir)
+    settings = Settings(
+        bot_token=TEST_TOKEN, manager_chat_id=-1, data_dir=data_dir, tmp_dir=tmp_path
+    )
+    return build_app_context(settings), data_dir / "styles.yaml"
+
+
+def _relabel(styles_path: Path, key: str, label: str) -> None:
+    styles = yaml.safe_load(styles_path.read_text(encoding="utf-8"))
+    styles["menu_labels"][key] = label
+    styles_path.write_text(yaml.safe_dump(styles, allow_unicode=True), encoding="utf-8")
+
+
+def test_reload_swaps_library_and_invalidates_only_text_caches(tmp_path):
+    ctx, styles_path = _context(tmp_path)
+    old = ctx.text_library
+    labels = old.menu_labels()
+    help_text = ctx.responses.help(labels)
+    sku = ctx.inventory.search("Ковролин", {})[0].sku
+    product_keyboard = ctx.keyboards.product_actions(sku)
+    assert old.menu_route(" 🛍 Каталог ") == "catalog"
+    assert old.menu_route("🛍 каталог") is None
+
+    assert asyncio.run(reload_texts(ctx)) is False
+    assert ctx.text_library is old
+
+    _relabel(styles_path, "catalog", "🛍 Коллекции")
+    assert asyncio.run(reload_texts(ctx)) is True
+    library = ctx.text_library
+    assert library is not old and library.version != old.version
+    assert get_text_library(old.data_dir) is library
+    assert library.menu_route("🛍 Коллекции") == "catalog"
+    # Users keep the old reply keyboard until the bot sends a new one.
+    assert library.menu_route("🛍 Каталог") == "catalog"
+    assert ctx.responses.help(library.menu_labels()) != help_text
+    assert "🛍 Коллекции" in ctx.responses.help(library.menu_labels())
+    # Catalogue-keyed keyboards survive a text reload.
+    assert ctx.keyboards.product_actions(sku) is product_keyboard
+
+    styles_path.write_text("menu_labels: [unclosed", encoding="utf-8")
+    with pytest.raises(yaml.YAMLError):
+        asyncio.run(reload_texts(ctx))
+    assert ctx.text_library is library
+
+
+def test_renamed_labels_keep_routing_until_reused(tmp_path):
+    ctx, styles_path = _context(tmp_path)
+    labels = ctx.text_library.menu_labels()
+
+    _relabel(styles_path, "catalog", "🛍 Коллекции")
+    asyncio.run(reload_texts(ctx))
+    _relabel(styles_path, "catalog", "🛍 Ассортимент")
+    asyncio.run(reload_texts(ctx))
+    library = ctx.text_library
+    assert [library.menu_route(label) for label in (labels["catalog"], "🛍 Коллекции")] == [
+        "catalog",
+        "catalog",
+    ]
+
+    # A current label always wins over a retired one.
+    _relabel(styles_path, "delivery", "🛍 Коллекции")
+    asyncio.run(reload_texts(ctx))
+    assert ctx.text_library.menu_route("🛍 Коллекции") == "delivery"
+    assert ctx.text_library.menu_route(labels["delivery"]) == "delivery"
+    assert ctx.text_library.menu_route(labels["catalog"]) == "catalog"
+
+
+def test_watcher_reloads_changed_files(tmp_path):
+    ctx, styles_path = _context(tmp_path)
+    old_version = ctx.text_library.version
+
+    async def scenario() -> str:
+        watcher = asyncio.create_task(watch_texts(ctx, interval=0.01))
+        await asyncio.sleep(0.05)
+        _relabel(styles_path, "pick", "🧭 Подобрать")
+        for _ in range(200):
+            if ctx.text_library.version != old_version:
+                break
+            await asyncio.sleep(0.01)
+        watcher.cancel()
+        return ctx.text_library.menu_labels()["pick"]
+
+    assert asyncio.run(scenario()) == "🧭 Подобрать"
+
+
+def test_wizard_routes_menu_buttons_relabelled_by_a_reload(tmp_path):
+    ctx, styles_path = _context(tmp_path)
+    set_app_context(ctx)
+    dispatcher = build_dispatcher(rate_limit=False)
+    session = FakeSession(serialize=False)
+    bot = Bot(TEST_TOKEN, session=session)
+    updates = UpdateFactory()
+    _relabel(styles_path, "delivery", "🚚 Как доставляем")
+
+    async def scenario() -> list[str | None]:
+        assert await reload_texts(ctx) is True
+        labels = ctx.text_library.menu_labels()
+        await dispatcher.feed_update(bot, updates.message(7, labels["pick"]))
+        session.take_inbox(7)
+        await dispatcher.feed_update(bot, updates.message(7, "🚚 Как доставляем"))
+        return [sent.text for sent in session.take_inbox(7)]
+
+    assert asyncio.run(scenario()) == [ctx.text_library.delivery]
@@ -0,0 +1,59 @@
+from pathlib import Path
+import asyncio
+import json
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from bot.middlewares.tracing import TracedStorage
+from bot.services.tracing import TracedProxy, Tracer, tracer
+from bot.tools.trace_report import span_paths, summarise
+
+
+def test_unsampled_updates_record_nothing(tmp_path):
+    local = Tracer(sample_rate=0.0, slow_ms=0, path=tmp_path / "traces.jsonl")
+    with local.trace(1) as trace:
+        with local.span("work"):
+            pass
+    assert trace is None
+    assert not (tmp_path / "traces.jsonl").exists()
+
+
+def test_slow_trace_is_written_with_span_tree(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    previous = (tracer.sample_rate, tracer.slow_ms, tracer.path)
+    tracer.configure(sample_rate=1.0, slow_ms=0, path=path)
+
+    class Inventory:
+        def search(self, category):
+            return [category]
+
+    storage = TracedStorage(MemoryStorage())
+    inventory = TracedProxy(Inventory(), "inventory")
+    key = StorageKey(bot_id=1, chat_id=2, user_id=2)
+
+    async def handle():
+        with tracer.trace(42, name="update:message"):
+            with tracer.span("handler:catalog.show"):
+                await storage.update_data(key, {"category": "Ламинат"})
+                inventory.search("Ламинат")
+
+    try:
+        asyncio.run(handle())
+    finally:
+        tracer.sample_rate, tracer.slow_ms, tracer.path = previous
+
+    records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert len(records) == 1
+    paths = [item[0] for item in span_paths(records[0])]
+    assert "update:message > handler:catalog.show > storage.update_data" in paths
+    assert "update:message > handler:catalog.show > inventory.search" in paths
+
+    stats, traces = summarise(records)
+    assert traces[0]["update_id"] == 42
+    assert {entry.path for entry in stats} == set(paths)
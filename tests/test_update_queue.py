@@ -0,0 +1,72 @@
+from pathlib import Path
+import asyncio
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from bot.services.metrics import INGEST_SHED, registry
+from bot.services.update_queue import SHED_FULL, SHED_KEY_LIMIT, KeyedQueue
+
+
+def test_keyed_queue_orders_per_key_and_runs_keys_in_parallel():
+    async def scenario():
+        handled: list[tuple[str, int]] = []
+        running: set[str] = set()
+        overlap = False
+
+        async def handler(item: tuple[str, int]) -> None:
+            nonlocal overlap
+            key, _ = item
+            assert key not in running, "two items of one key ran at once"
+            running.add(key)
+            overlap = overlap or len(running) > 1
+            await asyncio.sleep(0.01)
+            running.discard(key)
+            handled.append(item)
+
+        queue = KeyedQueue(handler, maxsize=100, concurrency=4)
+        await queue.start()
+        for index in range(5):
+            for key in ("a", "b", "c"):
+                assert queue.put(key, (key, index)) is None
+        await queue.join()
+        await queue.stop()
+        return handled, overlap
+
+    handled, overlap = asyncio.run(scenario())
+    assert overlap
+    for key in ("a", "b", "c"):
+        assert [index for item_key, index in handled if item_key == key] == list(range(5))
+
+
+def test_keyed_queue_sheds_when_full_or_key_over_limit():
+    registry.reset()
+    registry.enable()
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def handler(_: int) -> None:
+            await release.wait()
+
+        queue = KeyedQueue(handler, maxsize=3, concurrency=1, max_per_key=2)
+        await queue.start()
+        results = [queue.put("a", 1), queue.put("a", 2), queue.put("a", 3)]
+        results += [queue.put("b", 1), queue.put("c", 1)]
+        depth = queue.size
+        release.set()
+        await queue.stop()
+        return results, depth
+
+    try:
+        results, depth = asyncio.run(scenario())
+    finally:
+        registry.enable(False)
+
+    assert results == [None, None, SHED_KEY_LIMIT, None, SHED_FULL]
+    assert depth == 3
+    assert registry.counter(INGEST_SHED).value(queue="ingest", reason=SHED_FULL) == 1
+    assert "bot_ingest_queue_depth" in registry.render()
+    registry.reset()
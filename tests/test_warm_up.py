@@ -0,0 +1,56 @@
+from pathlib import Path
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from bot.config import Settings
+from bot.main import build_app_context, warm_up
+from bot.services.responses import ResponseCache
+from bot.tools.synthetic import TEST_TOKEN
+
+
+def test_response_cache_reuses_texts_until_inputs_change():
+    cache = ResponseCache()
+    labels = {"catalog": "Каталог"}
+    promos = ()
+
+    assert cache.help(labels) is cache.help(dict(labels))
+    assert "Каталог" in cache.help(labels)
+    assert cache.promos(promos).startswith("Пока нет активных акций")
+    assert cache.promos(promos) is cache.promos(promos)
+    assert (cache.hits, cache.misses) == (4, 2)
+
+    cache.sync("v2")
+    cache.help(labels)
+    assert cache.misses == 3
+
+
+def test_warm_up_leaves_first_requests_nothing_to_build(tmp_path):
+    settings = Settings(
+        bot_token=TEST_TOKEN, manager_chat_id=-1, data_dir=BASE_DIR / "data", tmp_dir=tmp_path
+    )
+    ctx = build_app_context(settings)
+    assert warm_up(ctx, freeze=False) > 0
+    keyboard_misses = ctx.keyboard_cache.misses
+    response_misses = ctx.response_cache.misses
+    compiled = dict(ctx.text_library._templates)
+
+    labels = ctx.text_library.menu_labels()
+    ctx.responses.help(labels)
+    ctx.responses.contacts(ctx.text_library.company)
+    ctx.responses.promos(ctx.pricing.promos())
+    ctx.keyboards.main_menu(labels)
+    ctx.keyboards.categories(ctx.inventory.ids.categories, ctx.inventory.ids.tag)
+    category, filter_name = next(iter(ctx.inventory.ids.facets))
+    ctx.keyboards.filter(
+        ctx.inventory.ids.filters.id(filter_name),
+        ctx.inventory.ids.facets[(category, filter_name)],
+        ctx.inventory.ids.tag,
+    )
+    ctx.text_library.render_product_card(ctx.inventory.search(category, {})[0])
+
+    assert ctx.keyboard_cache.misses == keyboard_misses
+    assert ctx.response_cache.misses == response_misses
+    assert ctx.text_library._templates == compiled
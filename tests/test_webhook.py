@@ -0,0 +1,205 @@
+from pathlib import Path
+import asyncio
+import json
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from aiogram import Bot, Dispatcher, Router
+from aiogram.types import Message
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from bot.config import Settings
+from bot.services.selection_store import SelectionStore
+from bot.tools.synthetic import TEST_TOKEN, FakeSession, UpdateFactory
+from bot.tools.webhook_bench import measure_workers, run_inline
+from bot.webhook import (
+    IngestRequestHandler,
+    WebhookMaster,
+    _Delivery,
+    route_key,
+    worker_index,
+    worker_settings,
+)
+
+
+def test_updates_route_by_sender():
+    message = {"update_id": 7, "message": {"from": {"id": 42}, "chat": {"id": -100}}}
+    callback = {"update_id": 8, "callback_query": {"id": "1", "from": {"id": 42}}}
+    channel_post = {"update_id": 9, "channel_post": {"chat": {"id": -555}}}
+
+    assert route_key(message) == route_key(callback) == 42
+    assert route_key(channel_post) == -555
+    assert route_key({"update_id": 10}) == 10
+    assert worker_index(message, 4) == worker_index(callback, 4) == 2
+
+
+def test_workers_get_own_files_and_selection_partition(tmp_path):
+    settings = Settings(bot_token="1:x", manager_chat_id=1, tmp_dir=tmp_path)
+    worker = worker_settings(settings, 2)
+    assert worker.metrics_port == settings.metrics_port + 2
+    assert worker.trace_path == tmp_path / "traces-w2.jsonl"
+    assert worker.record_path == tmp_path / "updates-w2.jsonl.gz"
+
+    entry = [{"sku": "A", "name": "A", "category": "C", "brand": "B"}]
+    for user_id in (10, 11):
+        (tmp_path / f"selection_{user_id}.json").write_text(json.dumps(entry), encoding="utf-8")
+    store = SelectionStore(tmp_path, partition=(1, 2))
+    assert store.list(11) and not store.list(10)
+
+
+def test_master_forwards_updates_to_workers(tmp_path):
+    data_dir = BASE_DIR / "data"
+    result = asyncio.run(measure_workers(2, 4, 1, 0, data_dir=data_dir, tmp_dir=tmp_path))
+    assert result.errors == 0
+    assert result.updates > 4 * 3
+
+
+def test_master_rejects_bodies_that_are_not_update_objects(tmp_path):
+    settings = Settings(bot_token="123:TEST", manager_chat_id=-1, tmp_dir=tmp_path)
+    master = WebhookMaster(settings, workers=2)
+
+    async def post_all() -> list[int]:
+        app = web.Application()
+        app.router.add_post("/", master.handle)
+        async with TestClient(TestServer(app)) as client:
+            statuses = []
+            for body in ("[]", "1", "null", "{"):
+                response = await client.post("/", data=body)
+                statuses.append(response.status)
+            return statuses
+
+    assert asyncio.run(post_all()) == [400] * 4
+
+
+def test_ingest_handler_acknowledges_before_slow_handlers_finish(tmp_path):
+    handled: list[tuple[int, str]] = []
+    router = Router()
+
+    @router.message()
+    async def slow(message: Message) -> None:
+        await asyncio.sleep(0.3)
+        handled.append((message.from_user.id, message.text))
+
+    dp = Dispatcher()
+    dp.include_router(router)
+    bot = Bot(TEST_TOKEN, session=FakeSession())
+    settings = Settings(bot_token=TEST_TOKEN, manager_chat_id=1, ingest_concurrency=4)
+    ingest = IngestRequestHandler(dp, bot, settings)
+    factory = UpdateFactory()
+    updates = [factory.message(user, text) for text in ("1", "2") for user in (10, 11)]
+
+    async def scenario() -> list[float]:
+        app = web.Application()
+        ingest.register(app, "/")
+        async with TestClient(TestServer(app)) as client:
+            acks = []
+            for update in updates:
+                started = asyncio.get_running_loop().time()
+                payload = update.model_dump(mode="json", by_alias=True, exclude_none=True)
+                response = await client.post("/", json=payload)
+                assert response.status == 200
+                acks.append(asyncio.get_running_loop().time() - started)
+            await ingest.queue.join()
+        return acks
+
+    acks = asyncio.run(scenario())
+    assert max(acks) < 0.1
+    assert [text for user, text in handled if user == 10] == ["1", "2"]
+    assert len(handled) == 4
+
+
+def test_ingest_handler_rejects_bodies_that_are_not_update_objects():
+    bot = Bot(TEST_TOKEN, session=FakeSession())
+    settings = Settings(bot_token=TEST_TOKEN, manager_chat_id=1)
+    ingest = IngestRequestHandler(Dispatcher(), bot, settings)
+
+    async def post_all() -> list[int]:
+        app = web.Application()
+        ingest.register(app, "/")
+        async with TestClient(TestServer(app)) as client:
+            statuses = []
+            for body in ("[]", "1", "null", "{"):
+                response = await client.post("/", data=body)
+                statuses.append(response.status)
+            return statuses
+
+    assert asyncio.run(post_all()) == [400] * 4
+
+
+def test_returned_method_is_sent_in_the_webhook_response():
+    router = Router()
+
+    @router.message()
+    async def reply(message: Message):
+        if message.text == "slow":
+            await asyncio.sleep(0.2)
+        return message.answer(f"echo {message.text}")
+
+    dp = Dispatcher()
+    dp.include_router(router)
+    session = FakeSession()
+    bot = Bot(TEST_TOKEN, session=session)
+    settings = Settings(bot_token=TEST_TOKEN, manager_chat_id=1, webhook_inline_wait_ms=50)
+    ingest = IngestRequestHandler(dp, bot, settings)
+    factory = UpdateFactory()
+
+    async def scenario() -> tuple[str, str]:
+        app = web.Application()
+        ingest.register(app, "/")
+        async with TestClient(TestServer(app)) as client:
+            bodies = []
+            for text in ("fast", "slow"):
+                payload = factory.message(10, text).model_dump(
+                    mode="json", by_alias=True, exclude_none=True
+                )
+                response = await client.post("/", json=payload)
+                assert response.status == 200
+                bodies.append(await response.text())
+            await ingest.queue.join()
+        return bodies[0], bodies[1]
+
+    inlined, late = asyncio.run(scenario())
+    assert 'name="method"' in inlined and "sendMessage" in inlined and "echo fast" in inlined
+    assert late == "{}"
+    assert ingest.stats == {"inlined": 1, "late": 1}
+    assert session.stats.calls["SendMessage"] == 1
+
+
+def test_inlined_reply_holds_the_user_until_the_response_is_written():
+    router = Router()
+
+    @router.message()
+    async def reply(message: Message):
+        return message.answer("echo")
+
+    dp = Dispatcher()
+    dp.include_router(router)
+    bot = Bot(TEST_TOKEN, session=FakeSession())
+    settings = Settings(bot_token=TEST_TOKEN, manager_chat_id=1, webhook_inline_wait_ms=50)
+    ingest = IngestRequestHandler(dp, bot, settings)
+
+    async def scenario() -> tuple[bool, bool]:
+        delivery = _Delivery(
+            UpdateFactory().message(10, "hi"), asyncio.get_running_loop().create_future()
+        )
+        processing = asyncio.create_task(ingest._process(delivery))
+        await asyncio.wait_for(asyncio.shield(delivery.reply), 1)
+        await asyncio.sleep(0.05)
+        held = not processing.done()
+        delivery.written.set()
+        await asyncio.wait_for(processing, 1)
+        return held, bool(delivery.reply.result())
+
+    # The queue keeps the user's key until _process returns, i.e. after the write.
+    assert asyncio.run(scenario()) == (True, True)
+
+
+def test_inline_replies_reduce_outbound_calls():
+    off, on = asyncio.run(run_inline(2, 1, 0, data_dir=BASE_DIR / "data"))
+    assert off.errors == on.errors == 0
+    assert off.inlined == 0 and on.inlined >= 4
+    assert on.api_calls == off.api_calls - on.inlined